@@ -0,0 +1,181 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+
+import fol_solver
+import pl_solver
+from dimacs import open_input
+from limits import Limits, LimitReached
+from proof import derivation
+from result import UNSAT
+
+
+PL_EXTENSIONS = (".cnf", ".dimacs")
+FOL_EXTENSIONS = (".p", ".ax", ".tptp")
+
+
+# "pl" or "fol" by extension, otherwise by the first non-blank line
+# (literals of the FOL format have argument lists)
+def detect(path):
+    base, ext = os.path.splitext(path)
+    if ext in (".gz", ".xz", ".bz2"):
+        ext = os.path.splitext(base)[1]
+
+    if ext in PL_EXTENSIONS:
+        return "pl"
+    if ext in FOL_EXTENSIONS:
+        return "fol"
+
+    with open_input(path) as f:
+        for l in f:
+            if l.strip():
+                return "fol" if "(" in l else "pl"
+    return "pl"
+
+
+# problem specs from directories, globs and JSONL manifests; a manifest line
+# is an object with "path" (relative to the manifest) or inline "clauses",
+# and optionally "id", "logic", "format", "engine", "ordering", "selection",
+# "sos", "preprocess" and the limits
+def problems(sources, defaults):
+    for source in sources:
+        if source.endswith(".jsonl"):
+            root = os.path.dirname(source)
+            with open(source) as f:
+                for lineno, l in enumerate(f, 1):
+                    if not l.strip():
+                        continue
+                    spec = dict(defaults)
+                    spec.update(json.loads(l))
+                    if "path" in spec:
+                        spec["path"] = os.path.join(root, spec["path"])
+                    spec.setdefault("id", spec.get("path", "{}:{}".format(source, lineno)))
+                    yield spec
+            continue
+
+        if os.path.isdir(source):
+            paths = sorted(os.path.join(d, f) for d, _, fs in os.walk(source) for f in fs
+                           if not f.endswith(".jsonl"))
+        else:
+            paths = sorted(glob.glob(source, recursive=True)) or [source]
+
+        for path in paths:
+            spec = dict(defaults)
+            spec.update(id=path, path=path)
+            yield spec
+
+
+def load(spec):
+    logic = spec.get("logic") or detect(spec["path"])
+    fmt = spec.get("format", "auto")
+
+    ordering = spec.get("ordering", "none")
+    selection = spec.get("selection", "none")
+
+    if logic == "fol":
+        solver = fol_solver.Solver(ordering=ordering, selection=selection, sos=spec.get("sos", False),
+                                   preprocess=spec.get("preprocess", False))
+        clauses = [(c, False) for c in spec["clauses"]] if "clauses" in spec else fol_solver.read_input(spec["path"], fmt)
+        printer = fol_solver.Pretty_Proof()
+        for c, goal in clauses:
+            solver.add_clause(c, goal)
+    else:
+        # any ordering means the variable order for propositional problems
+        solver = pl_solver.Solver(engine=spec.get("engine", "resolution"), ordered=ordering != "none", selection=selection,
+                                  preprocess=spec.get("preprocess", False))
+        clauses = spec["clauses"] if "clauses" in spec else pl_solver.read_clauses(spec["path"], fmt)
+        printer = pl_solver.Pretty_Proof()
+        for c in clauses:
+            solver.add_clause(c)
+
+    return logic, solver, printer
+
+
+# runs in the pool workers, which stay alive across problems. The limits
+# cover the search; the proof length comes from the derivation DAG, which is
+# not limited, and the proof steps (--proof) are rendered while the budget
+# lasts, each step as a whole. Once it runs out the result has "proof_limit"
+# instead of "proof".
+def solve(spec):
+    start = time.perf_counter()
+    out = {"id": spec["id"]}
+
+    try:
+        limits = Limits(spec.get("time_limit"), spec.get("memory_limit"), spec.get("max_clauses"))
+        out["logic"], solver, printer = load(spec)
+        result = solver.solve(limits)
+
+        d = result.as_dict()
+        if not spec.get("model"):
+            d.pop("model", None)
+        out.update(d)
+
+        if result.status == UNSAT:
+            proof = solver.proof()
+            out["proof_length"] = len(derivation(proof, printer.deeper_first))
+            if spec.get("proof"):
+                steps = []
+                try:
+                    for step in printer.records(proof):
+                        limits.check_resources()
+                        steps.append(step)
+                    out["proof"] = steps
+                except LimitReached as e:
+                    out["proof_limit"] = e.reason
+    except Exception as e:
+        out.update(status="error", error="{}: {}".format(type(e).__name__, e))
+
+    out["time"] = round(time.perf_counter() - start, 4)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="solve many problems, one JSON result line each")
+    parser.add_argument('sources', nargs="+", help="problem files, directories, globs or .jsonl manifests")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="worker processes, default: one per CPU")
+    parser.add_argument('--time-limit', type=float, metavar="SECONDS", help="per problem")
+    parser.add_argument('--memory-limit', type=float, metavar="MB", help="per problem, RSS of the worker")
+    parser.add_argument('--max-clauses', type=int, metavar="N", help="per problem")
+    parser.add_argument('--engine', choices=["resolution", "cdcl"], default="resolution", help="engine for propositional problems")
+    parser.add_argument('--ordering', choices=["none", "kbo", "lpo"], default="none", help="ordered resolution (propositional problems: by variable number)")
+    parser.add_argument('--selection', choices=["none", "negative"], default="none", help="select the largest negative literal")
+    parser.add_argument('--sos', action="store_true", help="set of support for first order problems")
+    parser.add_argument('--preprocess', action="store_true", help="simplify every problem before the search")
+    parser.add_argument('--proof', action="store_true", help="include the proof steps of UNSAT results")
+    parser.add_argument('--model', action="store_true", help="include the model of SAT results where there is one")
+    parser.add_argument('--max-tasks-per-worker', type=int, metavar="N", help="replace each worker after N problems")
+    args = parser.parse_args()
+
+    defaults = {"engine": args.engine, "ordering": args.ordering, "selection": args.selection, "sos": args.sos,
+                "preprocess": args.preprocess, "proof": args.proof, "model": args.model}
+    for k in ("time_limit", "memory_limit", "max_clauses"):
+        if getattr(args, k) is not None:
+            defaults[k] = getattr(args, k)
+
+    specs = problems(args.sources, defaults)
+    tally = Counter()
+    start = time.perf_counter()
+
+    def report(out):
+        tally[out["status"]] += 1
+        print(json.dumps(out), flush=True)
+
+    if args.jobs <= 1:
+        for spec in specs:
+            report(solve(spec))
+    else:
+        with multiprocessing.get_context("fork").Pool(args.jobs, maxtasksperchild=args.max_tasks_per_worker) as pool:
+            for out in pool.imap_unordered(solve, specs):
+                report(out)
+
+    print("{} problems in {:.2f}s: {}".format(sum(tally.values()), time.perf_counter() - start,
+                                             ", ".join("{} {}".format(n, s) for s, n in sorted(tally.items()))), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import itertools
+import random
+
+
+# Propositional families: lists of clauses over DIMACS style literals.
+
+# n+1 pigeons in n holes, p(i, j) = pigeon i sits in hole j; unsatisfiable
+def pigeonhole(n):
+    p = lambda i, j: i * n + j + 1
+    clauses = [[p(i, j) for j in range(n)] for i in range(n + 1)]
+
+    for j in range(n):
+        for i, k in itertools.combinations(range(n + 1), 2):
+            clauses.append([-p(i, j), -p(k, j)])
+
+    return clauses
+
+
+# uniform random k-SAT, by default at the satisfiability threshold
+THRESHOLD = {3: 4.26, 4: 9.93, 5: 21.12}
+
+def random_ksat(n, k=3, ratio=None, seed=0):
+    rng = random.Random(seed)
+    m = round(n * (ratio or THRESHOLD[k]))
+
+    return [[v if rng.random() < 0.5 else -v for v in rng.sample(range(1, n + 1), k)] for _ in range(m)]
+
+
+def xor(a, b, c):
+    # c <-> a xor b
+    return [[-a, -b, -c], [a, b, -c], [a, -b, c], [-a, b, c]]
+
+
+# the parity of x1..xn computed twice, along the chain in both directions,
+# with the two results required to differ; unsatisfiable
+def parity(n):
+    xs = list(range(1, n + 1))
+    top = n
+    clauses = []
+
+    outs = []
+    for order in (xs, xs[::-1]):
+        acc = order[0]
+        for x in order[1:]:
+            top += 1
+            clauses.extend(xor(acc, x, top))
+            acc = top
+        outs.append(acc)
+
+    clauses.append([outs[0]])
+    clauses.append([-outs[1]])
+    return clauses
+
+
+# Tseitin formula of the circulant graph on n >= 5 vertices with edges to
+# the next two neighbours (degree 4): the edges at each vertex have odd parity
+# at vertex 0 and even parity elsewhere, which no edge assignment satisfies
+def tseitin(n):
+    edges = dict()
+    for v in range(n):
+        for d in (1, 2):
+            edges[frozenset((v, (v + d) % n))] = len(edges) + 1
+
+    clauses = []
+    for v in range(n):
+        incident = [e for pair, e in edges.items() if v in pair]
+        charge = 1 if v == 0 else 0
+
+        # rule out every assignment of the incident edges of the wrong parity
+        for signs in itertools.product((1, -1), repeat=len(incident)):
+            if signs.count(-1) % 2 != charge:
+                clauses.append([-s * e for s, e in zip(signs, incident)])
+
+    return clauses
+
+
+# First order families: TPTP cnf problems as text.
+
+def tptp(clauses):
+    return "".join("cnf(c{}, {}, {}).\n".format(i, role, c) for i, (role, c) in enumerate(clauses, 1))
+
+
+def nest(f, t, n):
+    for _ in range(n):
+        t = "{}({})".format(f, t)
+    return t
+
+
+# p(a) and p(X) -> p(f(X)) refute ~p(f^n(a)) in n + 1 steps
+def nested_chain(n):
+    return tptp([("axiom", "p(a)"),
+                 ("axiom", "~p(X) | p(f(X))"),
+                 ("negated_conjecture", "~p({})".format(nest("f", "a", n)))])
+
+
+# the transitive closure of the chain c0 < c1 < ... < cn contains c0 < cn
+def transitivity(n):
+    return tptp([("axiom", "less(c{}, c{})".format(i, i + 1)) for i in range(n)]
+                + [("axiom", "~less(X, Y) | ~less(Y, Z) | less(X, Z)"),
+                   ("negated_conjecture", "~less(c0, c{})".format(n))])
+
+
+# p(X1, ..., Xn, f(X0, X0), ..., f(Xn-1, Xn-1)) against ~p(Y1, ..., Yn, Y1, ..., Yn):
+# the unifier binds Xi to a term with 2^i leaves (a DAG of size i)
+def deep_unification(n):
+    xs = ["X{}".format(i) for i in range(1, n + 1)]
+    fs = ["f(X{0}, X{0})".format(i) for i in range(n)]
+    ys = ["Y{}".format(i) for i in range(1, n + 1)]
+
+    return tptp([("axiom", "p({})".format(", ".join(xs + fs))),
+                 ("negated_conjecture", "~p({})".format(", ".join(ys + ys)))])
@@ -0,0 +1,219 @@
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks import generators
+from dimacs import write_cnf
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SOLVERS = {
+    "pl": ["pl_solver.py", "--engine", "resolution", "--output", "dimacs"],
+    "pl-ord": ["pl_solver.py", "--engine", "resolution", "--ordered", "--selection", "negative", "--output", "dimacs"],
+    "cdcl": ["pl_solver.py", "--engine", "cdcl", "--output", "dimacs"],
+    "fol": ["fol_solver.py"],
+    "fol-ord": ["fol_solver.py", "--ordering", "kbo", "--selection", "negative"],
+}
+
+# family: (generator, kind, expected status, solvers, sizes per scale)
+FAMILIES = {
+    "pigeonhole": (generators.pigeonhole, "cnf", "UNSAT", ["pl", "pl-ord", "cdcl"],
+                   {"small": [3, 4], "medium": [4, 5, 6], "large": [5, 6, 7, 8]}),
+    "random3sat": (generators.random_ksat, "cnf", None, ["pl", "pl-ord", "cdcl"],
+                   {"small": [10, 20], "medium": [20, 40, 80], "large": [50, 100, 150, 200]}),
+    "parity": (generators.parity, "cnf", "UNSAT", ["pl", "pl-ord", "cdcl"],
+               {"small": [8, 16], "medium": [16, 32, 64], "large": [32, 64, 128, 256]}),
+    "tseitin": (generators.tseitin, "cnf", "UNSAT", ["pl", "pl-ord", "cdcl"],
+                {"small": [5, 6], "medium": [6, 8, 10], "large": [8, 12, 16, 20]}),
+    "nested": (generators.nested_chain, "p", "UNSAT", ["fol", "fol-ord"],
+               {"small": [5, 10], "medium": [10, 20, 40], "large": [20, 40, 80, 160]}),
+    "transitivity": (generators.transitivity, "p", "UNSAT", ["fol", "fol-ord"],
+                     {"small": [3, 4], "medium": [4, 5, 6], "large": [5, 6, 7, 8]}),
+    "unification": (generators.deep_unification, "p", "UNSAT", ["fol", "fol-ord"],
+                    {"small": [5, 10], "medium": [10, 20, 40], "large": [20, 40, 80, 160]}),
+}
+
+STATUS = {"s SATISFIABLE": "SAT", "s UNSATISFIABLE": "UNSAT", "s UNKNOWN": "UNKNOWN",
+          "% SZS status Unsatisfiable": "UNSAT", "% SZS status Satisfiable": "SAT"}
+
+
+def write_problem(family, size, directory):
+    generate, kind, _, _, _ = FAMILIES[family]
+    path = os.path.join(directory, "{}-{}.{}".format(family, size, kind))
+
+    with open(path, "w") as f:
+        if kind == "cnf":
+            write_cnf(generate(size), f, ["{} {}".format(family, size)])
+        else:
+            f.write(generate(size))
+
+    return path
+
+
+# the engine counters of the --stats json report
+def parse_stats(err):
+    for line in err.splitlines():
+        if line.startswith("{"):
+            return json.loads(line)["engine"]
+    return dict()
+
+
+def parse_status(out):
+    for line in out.splitlines():
+        for prefix, status in STATUS.items():
+            if line.startswith(prefix):
+                return status
+    return "UNKNOWN"
+
+
+# runs one solver process; wall time, and peak RSS from the rusage of
+# exactly this child (os.wait4) instead of the whole process tree
+def run_one(solver, path, time_limit):
+    cmd = [sys.executable, *SOLVERS[solver], path, "--stats", "json", "--time-limit", str(time_limit)]
+
+    with tempfile.TemporaryFile("w+") as out, tempfile.TemporaryFile("w+") as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=ROOT, stdout=out, stderr=err, text=True)
+
+        # the solver's own limit fires first; this catches a hung process
+        killer = threading.Timer(time_limit + 10, proc.kill)
+        killer.start()
+        _, status, rusage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+        killer.cancel()
+        proc.returncode = os.waitstatus_to_exitcode(status)
+
+        out.seek(0)
+        err.seek(0)
+        out, err = out.read(), err.read()
+
+    record = {"status": parse_status(out) if proc.returncode == 0 else "ERROR",
+              "wall": round(wall, 4), "rss_mb": round(rusage.ru_maxrss / 1024, 1)}
+    record.update(parse_stats(err))
+    return record
+
+
+def run(families, scale, time_limit, report=print):
+    records = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for family in families:
+            _, _, expected, solvers, sizes = FAMILIES[family]
+
+            for size in sizes[scale]:
+                path = write_problem(family, size, directory)
+
+                for solver in solvers:
+                    record = {"family": family, "size": size, "solver": solver}
+                    record.update(run_one(solver, path, time_limit))
+                    if expected and record["status"] in ("SAT", "UNSAT") and record["status"] != expected:
+                        record["status"] = "WRONG"
+
+                    records.append(record)
+                    report(record)
+
+    return records
+
+
+def key(record):
+    return (record["family"], record["size"], record["solver"])
+
+
+# runs slower than `threshold` times the baseline (and by more than `noise`
+# seconds), and runs that are no longer solved or answer differently
+def regressions(records, baseline, threshold=1.25, noise=0.05):
+    base = {key(r): r for r in baseline}
+    found = []
+
+    for r in records:
+        b = base.get(key(r))
+        if b is None:
+            continue
+
+        if r["status"] != b["status"]:
+            found.append((r, b, "status {} -> {}".format(b["status"], r["status"])))
+        elif r["wall"] > threshold * b["wall"] and r["wall"] - b["wall"] > noise:
+            found.append((r, b, "wall {:.2f}s -> {:.2f}s".format(b["wall"], r["wall"])))
+
+    return found
+
+
+def write_records(records, path):
+    if path.endswith(".csv"):
+        columns = list(dict.fromkeys(k for r in records for k in r))
+        with open(path, "w", newline="") as f:
+            w = csv.DictWriter(f, columns)
+            w.writeheader()
+            w.writerows(records)
+    else:
+        with open(path, "w") as f:
+            json.dump(records, f, indent=1)
+
+
+# CSV files give every field as a string; numbers are turned back into numbers
+def number(value):
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    return value
+
+
+def read_records(path):
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            return [{k: number(v) for k, v in r.items() if v != ""} for r in csv.DictReader(f)]
+        return json.load(f)
+
+
+def show(record):
+    counters = " ".join("{}={}".format(k, v) for k, v in record.items()
+                        if k not in ("family", "size", "solver", "status", "wall", "rss_mb"))
+    print("{:<13}{:>5}  {:<8}{:<8}{:>9.3f}s{:>8.1f}MB  {}".format(
+        record["family"], record["size"], record["solver"], record["status"], record["wall"], record["rss_mb"], counters), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time the solvers over a sweep of generated problems")
+    parser.add_argument("--family", action="append", choices=sorted(FAMILIES), help="problem families, default: all")
+    parser.add_argument("--scale", choices=["small", "medium", "large"], default="small")
+    parser.add_argument("--time-limit", type=float, default=60, help="per run, in seconds")
+    parser.add_argument("--out", action="append", default=[], help="write the results to a .csv or .json file")
+    parser.add_argument("--save-baseline", metavar="FILE", help="store the results as a baseline (.csv or .json), unless an answer is wrong")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a stored .csv or .json baseline, exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown factor counted as a regression")
+    args = parser.parse_args()
+
+    records = run(args.family or sorted(FAMILIES), args.scale, args.time_limit, show)
+
+    for path in args.out:
+        write_records(records, path)
+
+    # a run with wrong answers is never stored as a baseline
+    if any(r["status"] in ("WRONG", "ERROR") for r in records):
+        print("wrong answers or crashed runs", file=sys.stderr)
+        if args.save_baseline:
+            print("baseline not saved", file=sys.stderr)
+        sys.exit(1)
+
+    if args.save_baseline:
+        write_records(records, args.save_baseline)
+
+    if args.compare:
+        found = regressions(records, read_records(args.compare), args.threshold)
+        for r, b, what in found:
+            print("regression: {} {} {}: {}".format(*key(r), what))
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
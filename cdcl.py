@@ -0,0 +1,543 @@
+import heapq
+
+import stats
+
+
+def luby(x):
+    # x-th element (from 0) of the Luby restart sequence 1,1,2,1,1,2,4,...
+    size = 1
+    seq = 0
+    while size < x + 1:
+        seq += 1
+        size = 2 * size + 1
+
+    while size - 1 != x:
+        size = (size - 1) >> 1
+        seq -= 1
+        x = x % size
+
+    return 1 << seq
+
+
+# Conflict driven clause learning on DIMACS style literals (v / -v).
+# Every learned clause remembers the resolution chain it was derived by
+# (the conflict clause followed by (pivot, reason) steps), so an UNSAT answer
+# can be replayed as a plain resolution refutation.
+# With `drat` set (see dimacs.DratWriter), learned clauses and deletions are
+# logged as a DRAT proof as well; with `limits` set (see limits.Limits) every
+# conflict and decision counts against the budgets, learned clauses against
+# the clause budget.
+# Clauses can be added between solve() calls (add_clause). checkpoint()
+# returns a mark and restore(mark) takes back the clauses added since, the
+# level 0 assignments they caused and the learned clauses that depend on
+# them; clauses learned from the older clauses alone are kept and renumbered
+# to follow the clauses of the mark, so the ids of the others are reused.
+class CDCL:
+    def __init__(self, clauses, restart_base=100, var_decay=0.95, clause_decay=0.999, drat=None, limits=None):
+        self.drat = drat
+        self.limits = limits
+        self.clauses = []
+        self.learnts = []
+        self.derivation = dict()
+        self.refutation = None
+
+        self.nvars = 0
+        self.value = [None]
+        self.level = [0]
+        self.reason = [None]
+        self.pos = [0]
+        self.phase = [False]
+        self.activity = [0.0]
+
+        self.watches = dict()
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+
+        self.heap = []
+        self.var_inc = 1.0
+        self.var_decay = var_decay
+        self.cla_activity = dict()
+        self.cla_inc = 1.0
+        self.clause_decay = clause_decay
+
+        self.restart_base = restart_base
+        self.max_learnts = 0
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+        units = []
+        for lits in clauses:
+            cid = self.add_premise(lits)
+            if cid is not None and self.clauses[cid] is not None and len(self.clauses[cid]) == 1:
+                units.append(cid)
+
+        self.max_learnts = len(self.clauses) // 3 + 1000
+
+        if self.refutation is None:
+            for cid in units:
+                lit = self.clauses[cid][0]
+                if self.lit_value(lit) is False:
+                    self.set_refutation(self.refute(cid))
+                    break
+                if self.lit_value(lit) is None:
+                    self.enqueue(lit, cid)
+
+
+    def add_premise(self, lits):
+        lits = list(dict.fromkeys(lits))
+        cid = len(self.clauses)
+
+        for lit in lits:
+            self.grow(abs(lit))
+
+        if any(-lit in lits for lit in lits):
+            self.clauses.append(None)
+            return cid
+
+        self.clauses.append(lits)
+
+        if len(lits) == 0:
+            self.set_refutation((cid, []))
+        elif len(lits) > 1:
+            self.watch(cid)
+
+        return cid
+
+
+    def add_clause(self, lits):
+        self.cancel_until(0)
+        for lit in lits:
+            self.grow(abs(lit))
+
+        # literals false at level 0 go last, so the watches are on the others
+        cid = self.add_premise(sorted(dict.fromkeys(lits), key=lambda lit: self.lit_value(lit) is False))
+        c = self.clauses[cid]
+        if c is None or not c or self.refutation is not None:
+            return cid
+
+        if self.lit_value(c[0]) is False:
+            self.set_refutation(self.refute(cid))
+        elif self.lit_value(c[0]) is None and (len(c) == 1 or self.lit_value(c[1]) is False):
+            self.enqueue(c[0], cid)
+        return cid
+
+
+    def checkpoint(self):
+        self.cancel_until(0)
+        return len(self.clauses), len(self.trail), self.qhead, self.nvars, self.refutation
+
+
+    def restore(self, mark):
+        nclauses, ntrail, qhead, nvars, refutation = mark
+        self.cancel_until(0)
+
+        for lit in self.trail[ntrail:]:
+            v = abs(lit)
+            self.value[v] = None
+            self.reason[v] = None
+            if v <= nvars:
+                heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[ntrail:]
+        self.qhead = qhead
+
+        # a learned clause stays if its derivation only uses older clauses
+        # and learned clauses that stay
+        valid = set()
+        def depends(derivation):
+            confl, chain = derivation
+            return all(cid < nclauses or cid in valid for cid in [confl] + [r for _, r in chain])
+
+        units = []
+        for cid in range(nclauses, len(self.clauses)):
+            if cid in self.derivation and depends(self.derivation[cid]):
+                valid.add(cid)
+                if self.clauses[cid] is not None and len(self.clauses[cid]) == 1:
+                    units.append(cid)
+                continue
+
+            if self.drat is not None and self.clauses[cid] is not None and cid in self.derivation:
+                self.drat.delete(self.clauses[cid])
+            self.derivation.pop(cid, None)
+            self.cla_activity.pop(cid, None)
+
+        self.learnts = [cid for cid in self.learnts if cid < nclauses or cid in valid]
+        if self.refutation is not None and not depends(self.refutation):
+            self.refutation = refutation
+
+        # the clauses that stay move down over the freed ids (a learned
+        # clause deleted by reduce_db stays as None, its derivation may be
+        # part of a proof)
+        remap = {cid: nclauses + i for i, cid in enumerate(sorted(valid))}
+        def renumber(derivation):
+            confl, chain = derivation
+            return remap.get(confl, confl), [(v, remap.get(r, r)) for v, r in chain]
+
+        self.clauses[nclauses:] = [self.clauses[cid] for cid in sorted(valid)]
+        self.derivation = {remap.get(cid, cid): renumber(d) for cid, d in self.derivation.items()}
+        self.cla_activity = {remap.get(cid, cid): a for cid, a in self.cla_activity.items()}
+        self.learnts = [remap.get(cid, cid) for cid in self.learnts]
+        if self.refutation is not None:
+            self.refutation = renumber(self.refutation)
+        for lit, ws in self.watches.items():
+            self.watches[lit] = [remap.get(cid, cid) for cid in ws if cid < nclauses or cid in remap]
+        units = [remap[cid] for cid in units]
+
+        while self.nvars > nvars:
+            for l in (self.nvars, -self.nvars):
+                del self.watches[l]
+            for a in (self.value, self.level, self.reason, self.pos, self.phase, self.activity):
+                a.pop()
+            self.nvars -= 1
+        self.heap = [(a, v) for a, v in self.heap if v <= nvars]
+        heapq.heapify(self.heap)
+
+        for cid in units:
+            lit = self.clauses[cid][0]
+            if self.refutation is not None:
+                break
+            if self.lit_value(lit) is False:
+                self.set_refutation(self.refute(cid))
+            elif self.lit_value(lit) is None:
+                self.enqueue(lit, cid)
+
+
+    def grow(self, v):
+        while self.nvars < v:
+            self.nvars += 1
+            self.value.append(None)
+            self.level.append(0)
+            self.reason.append(None)
+            self.pos.append(0)
+            self.phase.append(False)
+            self.activity.append(0.0)
+            self.watches[self.nvars] = []
+            self.watches[-self.nvars] = []
+            heapq.heappush(self.heap, (0.0, self.nvars))
+
+
+    def watch(self, cid):
+        c = self.clauses[cid]
+        self.watches[c[0]].append(cid)
+        self.watches[c[1]].append(cid)
+
+
+    def lit_value(self, lit):
+        val = self.value[abs(lit)]
+        if val is None:
+            return None
+        return val == (lit > 0)
+
+
+    def decision_level(self):
+        return len(self.trail_lim)
+
+
+    def enqueue(self, lit, reason):
+        v = abs(lit)
+        self.value[v] = lit > 0
+        self.level[v] = self.decision_level()
+        self.reason[v] = reason
+        self.pos[v] = len(self.trail)
+        self.trail.append(lit)
+
+
+    def propagate(self):
+        while self.qhead < len(self.trail):
+            false_lit = -self.trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+
+            ws = self.watches[false_lit]
+            keep = []
+            self.watches[false_lit] = keep
+
+            i = 0
+            while i < len(ws):
+                cid = ws[i]
+                i += 1
+                c = self.clauses[cid]
+                if c is None:
+                    continue
+
+                if c[0] == false_lit:
+                    c[0], c[1] = c[1], c[0]
+
+                if self.lit_value(c[0]) is True:
+                    keep.append(cid)
+                    continue
+
+                for k in range(2, len(c)):
+                    if self.lit_value(c[k]) is not False:
+                        c[1], c[k] = c[k], c[1]
+                        self.watches[c[1]].append(cid)
+                        break
+                else:
+                    keep.append(cid)
+                    if self.lit_value(c[0]) is False:
+                        keep.extend(ws[i:])
+                        self.qhead = len(self.trail)
+                        return cid
+                    self.enqueue(c[0], cid)
+
+        return None
+
+
+    def bump_var(self, v):
+        self.activity[v] += self.var_inc
+        if self.activity[v] > 1e100:
+            for w in range(1, self.nvars + 1):
+                self.activity[w] *= 1e-100
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[w], w) for w in range(1, self.nvars + 1) if self.value[w] is None]
+            heapq.heapify(self.heap)
+        elif self.value[v] is None:
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+
+    def bump_clause(self, cid):
+        if cid not in self.cla_activity:
+            return
+
+        self.cla_activity[cid] += self.cla_inc
+        if self.cla_activity[cid] > 1e20:
+            for k in self.cla_activity:
+                self.cla_activity[k] *= 1e-20
+            self.cla_inc *= 1e-20
+
+
+    def resolve_zero(self, zero, chain):
+        # resolves the (false) level 0 literals of vars in `zero` away,
+        # latest assignment first, so the chain stays a valid derivation
+        queue = [(-self.pos[v], v) for v in zero]
+        heapq.heapify(queue)
+
+        while queue:
+            _, v = heapq.heappop(queue)
+            r = self.reason[v]
+            chain.append((v, r))
+            for q in self.clauses[r]:
+                w = abs(q)
+                if w != v and w not in zero:
+                    zero.add(w)
+                    heapq.heappush(queue, (-self.pos[w], w))
+
+
+    def refute(self, confl):
+        chain = []
+        self.resolve_zero({abs(q) for q in self.clauses[confl]}, chain)
+        return (confl, chain)
+
+
+    def set_refutation(self, refutation):
+        self.refutation = refutation
+        if self.drat is not None:
+            self.drat.add([])
+
+
+    def analyze(self, confl):
+        seen = set()
+        zero = set()
+        learnt = [None]
+        chain = []
+        counter = 0
+        p = None
+        index = len(self.trail) - 1
+        cid = confl
+
+        while True:
+            self.bump_clause(cid)
+            for q in self.clauses[cid]:
+                v = abs(q)
+                if q == p or v in seen or v in zero:
+                    continue
+                if self.level[v] == 0:
+                    zero.add(v)
+                    continue
+
+                seen.add(v)
+                self.bump_var(v)
+                if self.level[v] == self.decision_level():
+                    counter += 1
+                else:
+                    learnt.append(q)
+
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            p = self.trail[index]
+            index -= 1
+            counter -= 1
+
+            if counter == 0:
+                break
+
+            cid = self.reason[abs(p)]
+            chain.append((abs(p), cid))
+
+        learnt[0] = -p
+        self.resolve_zero(zero, chain)
+
+        btlevel = 0
+        if len(learnt) > 1:
+            m = max(range(1, len(learnt)), key=lambda k: self.level[abs(learnt[k])])
+            learnt[1], learnt[m] = learnt[m], learnt[1]
+            btlevel = self.level[abs(learnt[1])]
+
+        return learnt, (confl, chain), btlevel
+
+
+    def cancel_until(self, level):
+        if self.decision_level() <= level:
+            return
+
+        for k in range(len(self.trail) - 1, self.trail_lim[level] - 1, -1):
+            v = abs(self.trail[k])
+            self.phase[v] = self.value[v]
+            self.value[v] = None
+            self.reason[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+
+    def learn(self, learnt, derivation):
+        cid = len(self.clauses)
+        self.clauses.append(learnt)
+        self.derivation[cid] = derivation
+        if self.drat is not None:
+            self.drat.add(learnt)
+
+        if len(learnt) > 1:
+            self.watch(cid)
+            self.learnts.append(cid)
+            self.cla_activity[cid] = 0.0
+            self.bump_clause(cid)
+
+        self.enqueue(learnt[0], cid)
+
+
+    def locked(self, cid):
+        v = abs(self.clauses[cid][0])
+        return self.reason[v] == cid and self.value[v] is not None
+
+
+    def reduce_db(self):
+        self.learnts.sort(key=lambda cid: self.cla_activity[cid])
+        half = len(self.learnts) // 2
+        kept = []
+
+        for k, cid in enumerate(self.learnts):
+            if k < half and len(self.clauses[cid]) > 2 and not self.locked(cid):
+                if self.drat is not None:
+                    self.drat.delete(self.clauses[cid])
+                self.clauses[cid] = None
+                del self.cla_activity[cid]
+            else:
+                kept.append(cid)
+
+        self.learnts = kept
+
+
+    def pick_branch(self):
+        while self.heap:
+            act, v = heapq.heappop(self.heap)
+            if self.value[v] is None and -act == self.activity[v]:
+                return v if self.phase[v] else -v
+
+        for v in range(1, self.nvars + 1):
+            if self.value[v] is None:
+                return v if self.phase[v] else -v
+
+        return None
+
+
+    def search(self, budget):
+        st = stats.current
+        conflicts = 0
+
+        while True:
+            t = st.start()
+            confl = self.propagate()
+            st.stop("propagate", t)
+
+            if self.limits is not None:
+                self.limits.check(len(self.derivation))
+
+            if confl is not None:
+                self.conflicts += 1
+                conflicts += 1
+
+                if self.decision_level() == 0:
+                    self.set_refutation(self.refute(confl))
+                    return False
+
+                t = st.start()
+                learnt, derivation, btlevel = self.analyze(confl)
+                self.cancel_until(btlevel)
+                self.learn(learnt, derivation)
+                st.stop("analyze", t)
+                st.count("learned_literals", len(learnt))
+
+                self.var_inc /= self.var_decay
+                self.cla_inc /= self.clause_decay
+                continue
+
+            if conflicts >= budget:
+                self.cancel_until(0)
+                return None
+
+            if len(self.learnts) - len(self.trail) >= self.max_learnts:
+                t = st.start()
+                self.reduce_db()
+                st.stop("reduce_db", t)
+
+            lit = self.pick_branch()
+            if lit is None:
+                return True
+
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(lit, None)
+
+
+    def solve(self):
+        if self.refutation is not None:
+            return False
+
+        restarts = 0
+        while True:
+            status = self.search(luby(restarts) * self.restart_base)
+            restarts += 1
+            if status is not None:
+                return status
+            stats.current.count("restarts")
+            self.max_learnts = int(self.max_learnts * 1.1)
+
+
+    def stats(self):
+        return {"conflicts": self.conflicts, "decisions": self.decisions, "propagations": self.propagations,
+                "learned": len(self.derivation), "learnts": len(self.learnts)}
+
+
+    def model(self):
+        return [v if self.value[v] else -v for v in range(1, self.nvars + 1)]
+
+
+    # clause ids (premises and learned clauses) the refutation depends on,
+    # in derivation order
+    def core(self):
+        needed = set()
+        stack = [self.refutation]
+
+        while stack:
+            confl, chain = stack.pop()
+            for cid in [confl] + [r for _, r in chain]:
+                if cid not in needed:
+                    needed.add(cid)
+                    if cid in self.derivation:
+                        stack.append(self.derivation[cid])
+
+        return sorted(needed)
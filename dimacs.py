@@ -0,0 +1,128 @@
+import bz2
+import gzip
+import io
+import lzma
+import sys
+
+from proof import Writer
+
+
+class DimacsError(Exception):
+    def __init__(self, msg, line):
+        super().__init__("line {}: {}".format(line, msg))
+        self.line = line
+
+
+# text lines of a possibly compressed file, "-" reads stdin
+def open_input(path):
+    if path == "-":
+        return sys.stdin
+
+    with open(path, "rb") as f:
+        magic = f.read(6)
+
+    if magic[:2] == b"\x1f\x8b":
+        return gzip.open(path, "rt")
+    if magic == b"\xfd7zXZ\x00":
+        return lzma.open(path, "rt")
+    if magic[:3] == b"BZh":
+        return bz2.open(path, "rt")
+    return io.open(path)
+
+
+# lazily yields the clauses of a DIMACS CNF file as lists of ints;
+# a clause may span lines and ends with 0, "c" lines are comments
+def read_cnf(lines):
+    nvars = nclauses = None
+    count = 0
+    clause = []
+    lineno = 0
+
+    for lineno, l in enumerate(lines, 1):
+        fields = l.split()
+        if not fields or fields[0] == "c":
+            continue
+
+        if fields[0] == "p":
+            if nvars is not None:
+                raise DimacsError("second problem line", lineno)
+            if len(fields) != 4 or fields[1] != "cnf":
+                raise DimacsError("expected 'p cnf <variables> <clauses>'", lineno)
+            try:
+                nvars, nclauses = int(fields[2]), int(fields[3])
+            except ValueError:
+                raise DimacsError("expected 'p cnf <variables> <clauses>'", lineno)
+            continue
+
+        # end marker of the SATLIB benchmark files
+        if fields[0] == "%":
+            break
+
+        if nvars is None:
+            raise DimacsError("clause before the problem line", lineno)
+
+        for f in fields:
+            try:
+                lit = int(f)
+            except ValueError:
+                raise DimacsError("not a literal: {!r}".format(f), lineno)
+
+            if lit == 0:
+                count += 1
+                if count > nclauses:
+                    raise DimacsError("more than the {} clauses declared".format(nclauses), lineno)
+                yield clause
+                clause = []
+            elif abs(lit) > nvars:
+                raise DimacsError("variable {} out of range 1..{}".format(abs(lit), nvars), lineno)
+            else:
+                clause.append(lit)
+
+    if clause:
+        raise DimacsError("last clause is not terminated by 0", lineno)
+    if nvars is None:
+        raise DimacsError("missing problem line", lineno)
+    if count != nclauses:
+        raise DimacsError("{} clauses declared, {} found".format(nclauses, count), lineno)
+
+
+# "s ..." status line and, for a model, "v ..." lines ending in 0
+def write_result(sat, model=None, out=None):
+    w = Writer(out)
+    w.write("s " + {True: "SATISFIABLE", False: "UNSATISFIABLE", None: "UNKNOWN"}[sat])
+
+    if model is not None:
+        lits = [*map(str, model), "0"]
+        for i in range(0, len(lits), 16):
+            w.write("v " + " ".join(lits[i:i + 16]))
+
+    w.flush()
+
+
+# DRAT proof in the textual format: added lemmas and "d" deletions
+class DratWriter:
+    def __init__(self, out):
+        self.w = Writer(out)
+
+    def add(self, lits):
+        self.w.write(" ".join(map(str, [*lits, 0])))
+
+    def delete(self, lits):
+        self.w.write("d " + " ".join(map(str, [*lits, 0])))
+
+    def close(self):
+        self.w.flush()
+        self.w.out.close()
+
+
+def write_cnf(clauses, out, comments=()):
+    clauses = [*clauses]
+    nvars = max((abs(l) for c in clauses for l in c), default=0)
+
+    w = Writer(out)
+    for c in comments:
+        w.write("c " + c)
+    w.write("p cnf {} {}".format(nvars, len(clauses)))
+    for c in clauses:
+        w.write(" ".join(map(str, [*c, 0])))
+    w.flush()
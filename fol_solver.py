@@ -1,37 +1,71 @@
 import argparse
-from itertools import chain, combinations
-from copy import deepcopy
+from itertools import combinations
 import functools
+import os
+import signal
 import sys
 
 from parser import *
+from tptp import read_tptp, problem_name, szs_status, szs_output, limit_status
 from structure import *
 from unification import *
+from saturation import GivenClause
+from index import LiteralIndex
+from subsumption import Subsumption, FOLFeatures, fol_subsumes
+from proof import ProofPrinter
+from parallel import ParallelProofs
+from ordering import refinement
+from preprocess import FOLPreprocessor
+import stats
+from limits import Limits, LimitReached, snapshot, snapshot_on_signal
+from result import Result, SAT, UNSAT, UNKNOWN
 
 
 class Clause:
     def __init__(self, rels):
         self.relations = frozenset(rels)
+        self.vars = None
+        self.key = None
 
     def apply(self, subst):
-        self.relations = frozenset(rel.apply(subst) for rel in self.relations)
+        return Clause(rel.apply(subst) for rel in self.relations)
 
     def getvars(self):
-        vs = [*map(lambda x: x.getvars(), self.relations)]
-        if len(vs)>0:
-            return set.union(*vs)
-        return set()
+        if self.vars is None:
+            self.vars = frozenset().union(*map(lambda x: x.getvars(), self.relations))
+        return self.vars
 
     def difference(self, other):
-        unfrozen = set(self.relations)
-        self.relations = frozenset(unfrozen.difference(other.relations))
+        return Clause(self.relations.difference(other.relations))
 
     def union(self, other):
-        unfrozen = set(self.relations)
-        self.relations = frozenset(unfrozen.union(other.relations))
-
+        return Clause(self.relations.union(other.relations))
+
+    def tautology(self):
+        return any(rel.negate() in self.relations for rel in self.relations)
+
+    # the clause up to variable names: the literals in the order of
+    # canonical_order() and the variables numbered in order of first
+    # occurrence across them
+    def canonical(self):
+        if self.key is None:
+            lits = canonical_order(self.relations)
+            order = dict()
+            for l in lits:
+                for v in occurrence(l):
+                    order.setdefault(v, Var(str(len(order) + 1)))
+            self.key = tuple(l.apply(Subst(subs=order)) for l in lits) if order else tuple(lits)
+        return self.key
+
+    # equal up to variable names
     def __eq__(self, other):
-        return self.getvars() == other.getvars()
+        return isinstance(other, Clause) and self.canonical() == other.canonical()
+
+    def __hash__(self):
+        return hash(self.canonical())
+
+    def __len__(self):
+        return len(self.relations)
 
     def __str__(self):
         return ", ".join(map(str, self.relations))
@@ -40,39 +74,147 @@ class Clause:
         return ", ".join(map(lambda x: x.tex(), self.relations))
 
 
-def powerset(iterable, ml=0):
-    s = list(iterable)
-    return chain.from_iterable(
-    combinations(
-        s, r) for r in range(
-            ml, len(s) + 1))
+# The literals of a clause in an order that only depends on their structure,
+# so that variants of a clause list them alike: by their own variant (see
+# unification.variant) written out, then by where their variables occur in
+# the clause (shape of the literal and position in it). Literals that are
+# still equal are taken one at a time, first the one whose variables get the
+# smallest numbers when numbered in order of first occurrence.
+def canonical_order(lits):
+    shapes = {l: (str(variant(l, "<")[0]), occurrence(l)) for l in lits}
+
+    places = dict()
+    for shape, vs in shapes.values():
+        for i, v in enumerate(vs):
+            places.setdefault(v, []).append((shape, i))
+    keys = {l: (shape, tuple(tuple(sorted(places[v])) for v in vs)) for l, (shape, vs) in shapes.items()}
+
+    lits = sorted(lits, key=keys.get)
+    order = dict()
+
+    def numbers(l):
+        ns = []
+        new = len(order)
+        for v in shapes[l][1]:
+            if v in order:
+                ns.append(order[v])
+            else:
+                ns.append(new)
+                new += 1
+        return ns
+
+    for i in range(len(lits)):
+        j = i + 1
+        while j < len(lits) and keys[lits[j]] == keys[lits[i]]:
+            j += 1
+        if j > i + 1:
+            l = min(lits[i:j], key=numbers)
+            lits.remove(l)
+            lits.insert(i, l)
+
+        for v in shapes[lits[i]][1]:
+            order.setdefault(v, len(order))
+
+    return lits
+
+
+# the renaming that standardizes c2 apart from c1: the variables the two
+# share are moved past every variable of both (variables are numbered, see
+# parser.py), the others keep their names
+def standardize(c1, c2):
+    v1 = c1.getvars()
+    v2 = c2.getvars()
+    shared = v1 & v2
+    if not shared:
+        return dict()
+
+    stats.current.count("renamings")
+    labels = [int(v.label) for v in v1 | v2]
+    offset = max(labels) - min(labels) + 1
+    return {v: Var(str(int(v.label) + offset)) for v in shared}
+
+
+# binary resolution on one literal of each clause; the clause with the
+# positive literal comes first, swapped tells whether that is c2.
+# The clauses are standardized apart at unification time (mgu_apart), each
+# one is instantiated once. With `refine` (see ordering.Refinement) only on
+# eligible literals.
+def resolve(c1, c2, refine=None):
+    st = stats.current
+    resolutions = []
+    renamings = dict()
+
+    if refine is None:
+        e1, sel1 = c1.relations, False
+        e2, sel2 = c2.relations, False
+    else:
+        e1, sel1 = refine.eligible(c1.relations)
+        e2, sel2 = refine.eligible(c2.relations)
+
+    for l1 in e1:
+        for l2 in e2:
+            if l1.neg == l2.neg or l1.label != l2.label or len(l1.childs) != len(l2.childs):
+                continue
+
+            st.count("literal_pairs")
+
+            if l1.neg:
+                r1, r2 = l2, l1
+                k1, k2 = c2, c1
+                s1, s2 = sel2, sel1
+            else:
+                r1, r2 = l1, l2
+                k1, k2 = c1, c2
+                s1, s2 = sel1, sel2
+
+            if l1.neg not in renamings:
+                renamings[l1.neg] = standardize(k1, k2)
 
+            sigmas = mgu_apart(r1, r2.negate(), renamings[l1.neg])
+            if sigmas is None:
+                continue
+
+            sigma1, sigma2 = sigmas
+            k1 = k1.apply(sigma1)
+            k2 = k2.apply(sigma2)
+            a1 = r1.apply(sigma1)
+            a2 = r2.apply(sigma2)
 
-def rename(vs, forbidden, start=1):
-    renaming = dict()
+            if refine is not None and not (refine.allowed(a1, k1.relations, s1) and refine.allowed(a2, k2.relations, s2)):
+                st.count("not_maximal")
+                continue
 
-    i = start
-    for v in vs:
-        while Var(str(i)) in forbidden:
-            i += 1
+            k1 = k1.difference(Clause([a1]))
+            k2 = k2.difference(Clause([a2]))
 
-        renaming[v] = Var(str(i))
+            resolutions.append((l1.neg, k1.union(k2), r1, r2))
 
-    return Subst(subs=renaming)
+    return resolutions
 
 
-def check_unifiable(R1, R2):
-    if R1[0].neg:
-        if not all(r.neg for r in R1) or any(r.neg for r in R2):
-            return False
-    else:
-        if any(r.neg for r in R1) or not all(r.neg for r in R2):
-            return False
+def encode_clause(res):
+    return tuple(map(encode, res.resolvent.relations))
 
-    return True
+
+def decode_clause(e):
+    return Clause(map(decode, e))
+
+
+# process pool side of ParallelProofs
+def work(task, refine=None):
+    g, others = task
+    c1 = decode_clause(g)
+
+    return [[(swapped, tuple(map(encode, k.relations)), encode(r1), encode(r2))
+             for swapped, k, r1, r2 in resolve(c1, decode_clause(o), refine)]
+            for o in others]
+
+
+def unwork(given, other, results):
+    return [given.inference(other, swapped, decode_clause(k), decode(r1), decode(r2))
+            for swapped, k, r1, r2 in results]
 
 
-# (bool, int)
 @functools.total_ordering
 class Resolution:
     def __init__(
@@ -83,115 +225,69 @@ class Resolution:
     rels1=None,
     rels2=None,
     subst=None,
-     renaming=None):
+     ancestors=0,
+     refine=None):
 
         self.resolvent = resolvent  # resolvent :: Clause
         self.parents = (p1, p2)  # p1 :: Resolution
         self.rels=(rels1, rels2)
-        self.subst = subst
-        self.renaming = renaming
-
-
-    def proof(self, other):
-        resolutions = []
-        renaming = None
-        k1 = None
-        k2 = None
-        r1 = None
-        r2 = None
-        p1 = None
-        p2 = None
-
-        ps1 = powerset(self.resolvent.relations, ml=1)
-        ps2 = powerset(other.resolvent.relations, ml=1)
-
-        for rels1 in ps1:
-            for rels2 in ps2:
-                if check_unifiable(rels1, rels2):
-                        rset = set()
-
-                        if rels1[0].neg:
-                            r1 = deepcopy(rels2)
-                            r2 = deepcopy(rels1)
-
-                            k2 = deepcopy(self.resolvent)
-                            k1 = deepcopy(other.resolvent)
-                            p2 = self
-                            p1 = other
-                        else:
-                            r1 = deepcopy(rels1)
-                            r2 = deepcopy(rels2)
-
-                            k2 = deepcopy(other.resolvent)
-                            k1 = deepcopy(self.resolvent)
-                            p1 = self
-                            p2 = other
-
-                        k1vars = k1.getvars()
-                        k2vars = k2.getvars()
-
-                        wrong = k1vars & k2vars
-                        forbidden = k1vars | k2vars
+        self.subst = subst  # of factoring steps, see unifiers()
 
-                        renaming = rename(wrong, forbidden)
+        # bitset over the ids of the premises this clause is derived from
+        self.ancestors = ancestors
+        for p in self.parents:
+            if p:
+                self.ancestors |= p.ancestors
 
-                        r2neg = set()
-                        for ri in r2:
-                            ri = deepcopy(ri)
-                            ri.neg = False
-                            ri.apply(renaming)
+        # ordering.Refinement of the search, shared with the premises
+        self.refine = p1.refine if p1 else refine
 
-                            r2neg.add(ri)
 
-                        mgu = unify(deepcopy(set(r1).union(r2neg)))
-
-                        r1 = Clause(r1)
-                        r2 = Clause(r2)
+    def proof(self, other):
+        return [self.inference(other, *r) for r in resolve(self.resolvent, other.resolvent, self.refine)]
 
-                        r1c = deepcopy(r1)
-                        r2c = deepcopy(r2)
 
-                        # print(rels1, rels2, mgu, renaming, k1, k2, r1,r2)
-                        if bool(mgu):
-                            k1.apply(mgu)
-                            r1.apply(mgu)
-                            k1.difference(r1)
+    def inference(self, other, swapped, k, r1, r2):
+        p1, p2 = (other, self) if swapped else (self, other)
+        return (len(k.relations) == 0, Resolution(k, p1=p1, p2=p2, rels1=Clause([r1]), rels2=Clause([r2])))
 
-                            k2.apply(renaming)
-                            k2.apply(mgu)
-                            r2.apply(renaming)
-                            r2.apply(mgu)
-                            k2.difference(r2)
 
-                            k1.union(k2)
+    # (renaming, mgu) of the step: resolution steps work them out again from
+    # the parents, as only printed proofs need them
+    def unifiers(self):
+        p1, p2 = self.parents
+        if not p2:
+            return None, self.subst
 
-                            found = False
-                            if len(k1.relations) == 0:
-                                found = True
+        (r1,), (r2,) = self.rels[0].relations, self.rels[1].relations
+        renaming = Subst(subs=standardize(p1.resolvent, p2.resolvent))
+        return renaming, mgu(r1, r2.negate().apply(renaming))
 
-                            resolutions.append((found, Resolution(k1, p1=p1, p2=p2, rels1=r1c, rels2=r2c, subst=mgu, renaming=renaming)))
 
-        return resolutions
+    # factoring: unify two literals of the same polarity within the clause
+    def factors(self):
+        factors = []
+        lits = self.resolvent.relations
 
-    
-    def dept(self):
-        if not self.parents[0]:
-            return 0
+        for l1, l2 in combinations(lits, 2):
+            if l1.neg != l2.neg or l1.label != l2.label or len(l1.childs) != len(l2.childs):
+                continue
+            if self.refine is not None and not self.refine.factorable(lits, l1, l2):
+                continue
 
-        return 1 + max(self.parents[0].dept(), self.parents[1].dept())
+            sigma = mgu(l1, l2)
+            if sigma is None:
+                continue
 
+            k = self.resolvent.apply(sigma)
+            if self.refine is not None and not self.refine.maximal(l1.apply(sigma), k.relations):
+                continue
 
-    def deep_parents(self):
-        s = set()
+            factors.append(Resolution(k, p1=self, rels1=Clause([l1, l2]), subst=sigma))
 
-        if not self.parents[0]:
-            return {hash(self.resolvent.relations)}
+        return factors
 
-        s.update(*map(lambda x: x.deep_parents(), self.parents))
-       
-        return s 
     
-
     def __lt__(self, other):
         return len(self.resolvent.relations) < len(other.resolvent.relations)
     
@@ -201,147 +297,378 @@ class Resolution:
     
 
     def __hash__(self):
-        return hash(tuple([self.resolvent.relations, self.subst, self.renaming]) + self.parents)
+        return hash(self.resolvent)
 
 
     def __str__(self):
         if self.parents[0]:
-            return "res:{} \nP1: {} \nP2: {} \nMit Renaming {} \nund Substitution {}".format(self.resolvent, self.parents[0], self.parents[1], self.renaming, self.subst)
+            renaming, subst = self.unifiers()
+            return "res:{} \nP1: {} \nP2: {} \nMit Renaming {} \nund Substitution {}".format(self.resolvent, self.parents[0], self.parents[1], renaming, subst)
         else:
             return "res:{}".format(self.resolvent)
 
 
-class Pretty_Proof:
-    def __init__(self):
-        self.num = 1
-        self.m     = dict()
-      
-    def pretty(self, proof):
-        if not proof.parents[0]:
-            print("{}.\t{}\t\t\tpremise".format(self.num, proof.resolvent))
-            self.m[proof] = self.num
-            self.num += 1
-        else:
-            if not proof.parents[0] in self.m and not proof.parents[1] in self.m:
-                if proof.parents[0].dept() >= proof.parents[1].dept():
-                    self.pretty(proof.parents[0])
-                    self.pretty(proof.parents[1])
-                else:
-                    self.pretty(proof.parents[1])
-                    self.pretty(proof.parents[0])
-            else:
-                if not proof.parents[0] in self.m:
-                    yyself.pretty(proof.parents[0])
-                if not proof.parents[1] in self.m:
-                    self.pretty(proof.parents[1])
-
-            res = "{}"
-            if len(proof.resolvent.relations) != 0:
-                res = proof.resolvent
+# unit simplification for preprocess.FOLPreprocessor: the resolvent of `res`
+# with the unit clause `unit` on the literal `lit` of res, if that is a
+# variant of res without lit
+def unit_resolvent(unit, res, lit):
+    rest = res.resolvent.difference(Clause([lit]))
 
+    for r in resolve(unit.resolvent, res.resolvent):
+        if lit not in r[2:4]:
+            continue
+        _, node = unit.inference(res, *r)
+        if fol_subsumes(node.resolvent, rest) and fol_subsumes(rest, node.resolvent):
+            return node
 
-            p1id = self.m[proof.parents[0]]
-            p2id = self.m[proof.parents[1]]
-
-            p1str = str(proof.rels[0])
-            p2str = str(proof.rels[1])
-
-            print("{}.\t{}\t\t\t(Res) from {} and {} with {{{}}} and {{{}}}, renaming {}, and mgu {}".format(
-                                        self.num, res, p1id, p2id, p1str, p2str, proof.renaming, proof.subst))
-            self.m[proof] = self.num
-            self.num += 1
+    return None
 
 
-    def tex(self, proof):
-        print("\\begin{array}{lll}")
-        self._tex(proof)
-        print("\\end{array}")
-    
+class Pretty_Proof(ProofPrinter):
 
-    def _tex(self, proof):
+    def text_step(self, num, proof, parents):
         if not proof.parents[0]:
-            print ("\t{}. & \\{{ {}\\}}& \\text{{premise}} \\\\".format(self.num, proof.resolvent.tex()))
-            self.m[proof] = self.num
-            self.num += 1
-        else:
-            if not proof.parents[0] in self.m and not proof.parents[1] in self.m:
-                if proof.parents[0].dept() >= proof.parents[1].dept():
-                    self._tex(proof.parents[0])
-                    self._tex(proof.parents[1])
-                else:
-                    self._tex(proof.parents[1])
-                    self._tex(proof.parents[0])
-            else:
-                if not proof.parents[0] in self.m:
-                    yyself._tex(proof.parents[0])
-                if not proof.parents[1] in self.m:
-                    self._tex(proof.parents[1])
-            
-            res = ""
-            if len(proof.resolvent.relations) != 0:
-                res = proof.resolvent.tex()
-
-
-            p1id = self.m[proof.parents[0]]
-            p2id = self.m[proof.parents[1]]
+            return "{}.\t{}\t\t\tpremise".format(num, proof.resolvent)
 
-            p1str = proof.rels[0].tex()
-            p2str = proof.rels[1].tex()
+        if not proof.parents[1]:
+            return "{}.\t{}\t\t\t(Fac) from {} with {{{}}}, and mgu {}".format(
+                                        num, proof.resolvent, parents[0], proof.rels[0], proof.subst)
 
-            print("\t{}. & \\{{ {}\\}} & \\text{{(Res) from {} and {} with $\\{{ {} \\}}$ and $\\{{ {} \\}}$}}\\\\ \n&&\\text{{ renaming ${}$, and mgu ${}$}} \\\\".format(self.num, res, p1id, p2id, p1str, p2str, proof.renaming.tex(), proof.subst.tex()))
-            self.m[proof] = self.num
-            self.num += 1
+        res = "{}"
+        if len(proof.resolvent.relations) != 0:
+            res = proof.resolvent
+        renaming, subst = proof.unifiers()
 
+        return "{}.\t{}\t\t\t(Res) from {} and {} with {{{}}} and {{{}}}, renaming {}, and mgu {}".format(
+                                    num, res, parents[0], parents[1], proof.rels[0], proof.rels[1], renaming, subst)
 
-parser = argparse.ArgumentParser(description='FOL Solver')
-parser.add_argument('file', metavar='f', type=str)
-parser.add_argument('--all', action="store_true")
 
-args = parser.parse_args()
-
-
-clauses = parse(open(args.file).readlines())
-printall = args.all
+    def tex_step(self, num, proof, parents):
+        if not proof.parents[0]:
+            return "\t{}. & \\{{ {}\\}}& \\text{{premise}} \\\\".format(num, proof.resolvent.tex())
 
-print(clauses)
+        if not proof.parents[1]:
+            return "\t{}. & \\{{ {}\\}} & \\text{{(Fac) from {} with $\\{{ {} \\}}$, and mgu ${}$}} \\\\".format(num, proof.resolvent.tex(), parents[0], proof.rels[0].tex(), proof.subst.tex())
 
-clauses = map(Clause, clauses)
-resolutions = set(map(Resolution, clauses))
+        renaming, subst = proof.unifiers()
+        return "\t{}. & \\{{ {}\\}} & \\text{{(Res) from {} and {} with $\\{{ {} \\}}$ and $\\{{ {} \\}}$}}\\\\ \n&&\\text{{ renaming ${}$, and mgu ${}$}} \\\\".format(num, proof.resolvent.tex(), parents[0], parents[1], proof.rels[0].tex(), proof.rels[1].tex(), renaming.tex(), subst.tex())
 
-old_resolutions = set()
 
-solutions = set()
+    def json_step(self, proof):
+        step = {"clause": [*map(str, proof.resolvent.relations)]}
 
-while resolutions != old_resolutions:
-    old_resolutions = deepcopy(resolutions)
-    for (r1, r2) in combinations(sorted(old_resolutions), 2):
-        par1 = r1.deep_parents()
-        par2 = r2.deep_parents()
-        
-        if  bool(par1.intersection(par2)) and bool(par1) and bool(par2):
-            continue
-       
-        
-        for found, res in r1.proof(r2):
-            if found and res:
-                solutions.add(res)
-                if not printall:
-                    pretty = Pretty_Proof()
-                    pretty.tex(res)
-                    pretty = Pretty_Proof()
-                    pretty.pretty(res)
-                    sys.exit()
-                continue
-            resolutions.add(res)
+        if not proof.parents[0]:
+            step["rule"] = "premise"
+        elif not proof.parents[1]:
+            step.update(rule="factoring", literals=[*map(str, proof.rels[0].relations)],
+                        mgu={str(k): str(v) for k, v in proof.subst.subs.items()})
+        else:
+            renaming, subst = proof.unifiers()
+            step.update(rule="resolution", literals=[[*map(str, r.relations)] for r in proof.rels],
+                        renaming={str(k): str(v) for k, v in renaming.subs.items()},
+                        mgu={str(k): str(v) for k, v in subst.subs.items()})
+
+        return step
+
+
+# (literals, goal) of every clause; goals are the negated conjectures of
+# TPTP input and the clauses marked with "?" in the plain format
+def read_input(path, fmt="auto"):
+    if fmt == "auto":
+        fmt = "tptp" if os.path.splitext(path)[1] in (".p", ".ax", ".tptp") else "plain"
+
+    if fmt == "tptp":
+        return [(lits, role == "negated_conjecture") for _, role, lits in read_tptp(path)]
+    return [*parse_file(path)]
+
+
+# Resolution prover for a clause set. Clauses are lists of literals or lines
+# in the format of parser.py; solve() runs a fresh given-clause search over
+# all clauses added so far. With jobs > 1 the worker pool is created once and
+# kept for later calls until close().
+# `ordering` ("none", "kbo", "lpo"), `precedence` and `selection` ("none",
+# "negative") restrict the inferences as in ordering.Refinement. With `sos`
+# (set of support) every inference needs a parent derived from a goal clause.
+# With `preprocess` the clauses are simplified first (preprocess.FOLPreprocessor)
+# and tautological resolvents are dropped during the search.
+# Incremental use: saturate() searches the clauses added so far (the
+# background) and keeps the search state; from then on add_clause() feeds new
+# clauses into it and solve() only does the work they add. checkpoint()
+# returns a mark, restore(mark) takes back the clauses added since together
+# with what was derived from them, as often as needed; release(mark) says the
+# mark is no longer needed, which lets the engine stop logging its changes.
+# solve(assumptions=[...]) adds the literals as unit goal clauses for that
+# one call.
+class Solver:
+    def __init__(self, jobs=1, skip_related=False, ordering="none", selection="none", sos=False, precedence=(), preprocess=False):
+        self.jobs = jobs
+        self.skip_related = skip_related
+        self.refine = refinement(ordering, selection, precedence)
+        self.sos = sos
+        self.preprocess = preprocess
+        self.clauses = []
+        self.goals = 0
+        self.parallel = None
+        self.preprocessor = None
+        self.engine = None
+        self.refutation = None
+        self.refuted = None
+        self.incremental = False
+        self.cache = (0, 0)
+
+    def add_clause(self, lits, goal=False):
+        if isinstance(lits, str):
+            lits, marked = parse_clause(lits)
+            goal = goal or marked
+        if goal:
+            self.goals |= 1 << len(self.clauses)
+
+        # standardize() needs numbered variables, as the parsers make them;
+        # other labels are renumbered in the order of the canonical form
+        clause = Clause(lits)
+        if not all(v.label.isdigit() for v in clause.getvars()):
+            clause = Clause(clause.canonical())
+        self.clauses.append(clause)
+
+        if self.incremental:
+            self.engine.support = self.goals if self.sos else 0
+            self.engine.add(Resolution(self.clauses[-1], ancestors=self.ancestors(len(self.clauses) - 1), refine=self.refine))
+
+    # the ancestor bitset of premise i, only tracked where skip_related or
+    # the set of support look at it
+    def ancestors(self, i):
+        return 1 << i if self.skip_related or self.sos else 0
+
+    def start(self, limits=None, incremental=False):
+        if self.jobs > 1 and self.parallel is None:
+            self.parallel = ParallelProofs(self.jobs, encode_clause, functools.partial(work, refine=self.refine), unwork)
+
+        self.refutation = None
+        self.refuted = None
+        self.cache = (mgu_cache.hits, mgu_cache.misses)
+        self.engine = GivenClause(
+            key=lambda r: r.resolvent.canonical(),
+            index=LiteralIndex(),
+            subsumption=Subsumption(FOLFeatures(self.clauses), fol_subsumes),
+            parallel=self.parallel,
+            skip_related=self.skip_related,
+            support=self.goals if self.sos else 0,
+            limits=limits,
+            tautologies=self.preprocess)
+
+        inputs = [Resolution(c, ancestors=self.ancestors(i), refine=self.refine) for i, c in enumerate(self.clauses)]
+        self.preprocessor = None
+        if self.preprocess:
+            self.preprocessor = FOLPreprocessor(unit_resolvent, pure=not incremental)
+            inputs = self.preprocessor.run(inputs) or []
+            self.refuted = self.preprocessor.refutation
+
+        for res in inputs:
+            self.engine.add(res)
+
+    # every refutation the search finds; raises LimitReached
+    def refutations(self, limits=None):
+        self.start(limits)
+        if self.refuted is not None:
+            self.refutation = self.refuted
+            yield self.refutation
+            return
+
+        for res in self.engine.run():
+            self.refutation = res
+            yield res
+
+    def solve(self, limits=None, assumptions=()):
+        if assumptions:
+            mark = self.checkpoint()
+            for lit in assumptions:
+                self.add_clause(lit if isinstance(lit, str) else [lit], goal=True)
+            try:
+                return self.solve(limits)
+            finally:
+                self.restore(mark)
+                self.release(mark)
+
+        if self.incremental:
+            return self.search(limits)
+
+        try:
+            for _ in self.refutations(limits):
+                return Result(UNSAT, stats=self.stats())
+        except LimitReached as e:
+            return Result(UNKNOWN, limit=e, stats=self.stats())
+
+        return Result(SAT if self.complete() else UNKNOWN, stats=self.stats())
+
+    def saturate(self, limits=None):
+        self.start(limits, incremental=True)
+        self.incremental = True
+        return self.search(limits)
+
+    def search(self, limits):
+        self.refutation = None
+        self.engine.limits = limits
+        try:
+            if self.refuted is None:
+                for res in self.engine.run():
+                    self.refuted = res
+                    break
+        except LimitReached as e:
+            return Result(UNKNOWN, limit=e, stats=self.stats())
+
+        if self.refuted is not None:
+            self.refutation = self.refuted
+            return Result(UNSAT, stats=self.stats())
+        return Result(SAT if self.complete() else UNKNOWN, stats=self.stats())
+
+    def checkpoint(self):
+        return len(self.clauses), self.goals, self.engine.checkpoint() if self.incremental else None, self.refuted
+
+    def restore(self, mark):
+        n, self.goals, engine, self.refuted = mark
+        del self.clauses[n:]
+
+        # a mark from before saturate() ends the incremental use
+        if engine is None:
+            self.incremental = False
+        else:
+            self.engine.restore(engine)
+            self.engine.support = self.goals if self.sos else 0
+
+    def release(self, mark):
+        if mark[2] is not None and self.incremental:
+            self.engine.release(mark[2])
+
+    # there is no equality reasoning, so saturation only shows
+    # satisfiability without equality literals; a saturated set of support
+    # only shows it if the other clauses are satisfiable
+    def complete(self):
+        return not self.skip_related and not (self.sos and self.goals) and \
+            not any(l.label == "=" for c in self.clauses for l in c.relations)
+
+    def proof(self):
+        return self.refutation
+
+    def saturated(self):
+        return self.engine.clauses()
+
+    def stats(self):
+        d = dict()
+        if self.preprocessor is not None:
+            d.update(("pre_" + k, v) for k, v in sorted(self.preprocessor.effects.items()))
+        if self.engine is not None:
+            d.update(self.engine.stats())
+            d.update(mgu_cache_hits=mgu_cache.hits - self.cache[0], mgu_cache_misses=mgu_cache.misses - self.cache[1])
+        return d
+
+    def close(self):
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FOL Solver')
+    parser.add_argument('file', metavar='f', type=str, help="clause file, - reads stdin")
+    parser.add_argument('--input', choices=["auto", "plain", "tptp"], default="auto", help="input format, default: TPTP for .p, .ax and .tptp files")
+    parser.add_argument('--all', action="store_true")
+    parser.add_argument('--proof', action="append", choices=["text", "tex", "json"], help="proof output format(s), default: tex and text, none for TPTP input")
+    parser.add_argument('--jobs', type=int, default=1, help="generate resolvents on N worker processes")
+    parser.add_argument('--skip-related', action="store_true", help="never resolve two clauses derived from a common premise (incomplete)")
+    parser.add_argument('--ordering', choices=["none", "kbo", "lpo"], default="none", help="ordered resolution: resolve only on maximal literals")
+    parser.add_argument('--precedence', metavar="f,g,...", help="symbol precedence of the ordering, lowest first")
+    parser.add_argument('--selection', choices=["none", "negative"], default="none", help="negative: resolve only on the largest negative literal of a clause that has one")
+    parser.add_argument('--preprocess', action="store_true", help="simplify the clauses first: pure predicates, unit subsumption and simplification")
+    parser.add_argument('--sos', action="store_true", help="set of support: every inference involves a clause derived from a goal (TPTP negated_conjecture, ? in the plain format)")
+    parser.add_argument('--mgu-cache', type=int, default=mgu_cache.size, metavar="N", help="remember the unifiers of the last N literal pairs (up to variable names), 0 turns it off")
+    parser.add_argument('--time-limit', type=float, metavar="SECONDS", help="give up after this much wall time")
+    parser.add_argument('--memory-limit', type=float, metavar="MB", help="give up once the RSS exceeds this")
+    parser.add_argument('--max-clauses', type=int, metavar="N", help="give up after generating N clauses")
+    parser.add_argument('--stats', nargs="?", const="text", choices=["text", "json"], help="print counters and phase timers to stderr when done")
+    parser.add_argument('--profile', metavar="FILE", help="profile the run with cProfile (FILE.prof) or pyinstrument (FILE.html)")
+
+    args = parser.parse_args()
+    limits = Limits(args.time_limit, args.memory_limit, args.max_clauses)
+    mgu_cache.resize(args.mgu_cache)
+    if args.stats:
+        stats.enable()
+    if args.profile:
+        stats.profile(args.profile)
+
+
+    t = stats.current.start()
+    try:
+        clauses = read_input(args.file, args.input)
+    except ParseError as e:
+        sys.exit(str(e))
+    stats.current.stop("parse", t)
+
+    # TPTP input reports SZS status lines instead of echoing the clauses
+    szs = args.input == "tptp" or args.input == "auto" and os.path.splitext(args.file)[1] in (".p", ".ax", ".tptp")
+    problem = problem_name(args.file)
+    formats = args.proof or ([] if szs else ["tex", "text"])
+    # keeps stdout parseable when it carries JSON proofs
+    szs_out = sys.stderr if "json" in formats else sys.stdout
+
+    if szs and hasattr(signal, "SIGXCPU"):
+        def timeout(signum, frame):
+            szs_status("Timeout", problem, szs_out)
+            os._exit(0)
+        signal.signal(signal.SIGXCPU, timeout)
+
+    if not szs and "json" not in formats:
+        print([lits for lits, _ in clauses])
+
+    precedence = args.precedence.split(",") if args.precedence else ()
+    solver = Solver(args.jobs, args.skip_related, args.ordering, args.selection, args.sos, precedence, args.preprocess)
+    for lits, goal in clauses:
+        solver.add_clause(lits, goal)
+
+    snapshot_on_signal(limits, solver.stats)
+    if args.stats:
+        stats.report_at_exit(limits, solver.stats, args.stats)
+
+    solutions = []
+    limit = None
+
+    if args.all:
+        try:
+            for res in solver.refutations(limits):
+                solutions.append(res)
+        except LimitReached as e:
+            limit = e
+    else:
+        result = solver.solve(limits)
+        limit = result.limit
+        if result.status == UNSAT:
+            solutions.append(solver.proof())
+
+    if limit and not args.stats:
+        snapshot(limits, solver.stats)
+
+
+    if solutions:
+        if szs:
+            szs_status("Unsatisfiable", problem, szs_out)
+            if formats:
+                szs_output(True, "CNFRefutation", problem, szs_out)
+        for solution in solutions:
+            Pretty_Proof().write(solution, formats)
+        if szs and formats:
+            szs_output(False, "CNFRefutation", problem, szs_out)
+    elif limit:
+        if szs:
+            szs_status(limit_status(limit), problem, szs_out)
+        else:
+            print(limit)
+    elif szs:
+        szs_status("Satisfiable" if solver.complete() else "GaveUp", problem, szs_out)
+    else:
+        for res in solver.saturated():
+            print(res)
 
+    solver.close()
 
-if solutions:
-    for solution in solutions:
-        pretty = Pretty_Proof()
-        pretty.tex(solution)
-        pretty = Pretty_Proof()
-        pretty.pretty(solution)
-else:
-    for res in resolutions:
-        print(res)
 
+if __name__ == "__main__":
+    main()
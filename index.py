@@ -0,0 +1,152 @@
+from structure import Var, Function
+
+
+def flatten(lit):
+    # preorder key sequence of a literal; variables become the wildcard None
+    keys = [(lit.neg, lit.label, len(lit.childs))]
+    stack = list(reversed(lit.childs))
+
+    while stack:
+        t = stack.pop()
+        if isinstance(t, Var):
+            keys.append(None)
+        elif isinstance(t, Function):
+            keys.append((t.label, len(t.childs)))
+            stack.extend(reversed(t.childs))
+        else:
+            keys.append((t.label, 0))
+
+    return keys
+
+
+def skips(keys):
+    # skip[i] is the position right after the subterm starting at i
+    skip = [0] * len(keys)
+    ends = []
+
+    for i in range(len(keys) - 1, -1, -1):
+        k = keys[i]
+        end = i + 1
+        for _ in range(0 if k is None else k[-1]):
+            end = ends.pop()
+        skip[i] = end
+        ends.append(end)
+
+    return skip
+
+
+class Node:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children = dict()
+        self.entries = []
+
+
+# Discrimination tree over literals: the path of a literal is its polarity,
+# predicate and the preorder of its term structure with variables collapsed to
+# a wildcard. Retrieval is a superset filter (repeated variables are ignored),
+# every candidate still has to be unified.
+class DiscriminationTree:
+    def __init__(self):
+        self.root = Node()
+        self.size = 0
+
+    def insert(self, lit, value):
+        node = self.root
+        for k in flatten(lit):
+            child = node.children.get(k)
+            if child is None:
+                child = node.children[k] = Node()
+            node = child
+
+        node.entries.append((lit, value))
+        self.size += 1
+
+    def remove(self, lit, value):
+        path = [self.root]
+        keys = flatten(lit)
+        for k in keys:
+            node = path[-1].children.get(k)
+            if node is None:
+                return False
+            path.append(node)
+
+        leaf = path[-1]
+        kept = [e for e in leaf.entries if not (e[0] is lit and e[1] == value)]
+        if len(kept) == len(leaf.entries):
+            return False
+
+        self.size -= len(leaf.entries) - len(kept)
+        leaf.entries = kept
+
+        for k, node, parent in zip(reversed(keys), reversed(path), reversed(path[:-1])):
+            if node.children or node.entries:
+                break
+            del parent.children[k]
+
+        return True
+
+    def jump(self, node):
+        # all nodes reached from `node` by skipping exactly one stored term
+        stack = [(node, 1)]
+        while stack:
+            n, pending = stack.pop()
+            if pending == 0:
+                yield n
+                continue
+            for k, child in n.children.items():
+                stack.append((child, pending - 1 + (0 if k is None else k[-1])))
+
+    def unifiable(self, lit):
+        keys = flatten(lit)
+        skip = skips(keys)
+
+        first = self.root.children.get(keys[0])
+        if first is None:
+            return
+
+        stack = [(first, 1)]
+        while stack:
+            node, i = stack.pop()
+            if i == len(keys):
+                yield from node.entries
+                continue
+
+            k = keys[i]
+            if k is None:
+                for n in self.jump(node):
+                    stack.append((n, i + 1))
+                continue
+
+            wildcard = node.children.get(None)
+            if wildcard is not None:
+                stack.append((wildcard, skip[i]))
+
+            child = node.children.get(k)
+            if child is not None:
+                stack.append((child, i + 1))
+
+
+
+# clause level view: maps the literals of stored clauses to the clause keys
+class LiteralIndex:
+    def __init__(self):
+        self.tree = DiscriminationTree()
+
+    def add(self, key, res):
+        for lit in res.resolvent.relations:
+            self.tree.insert(lit, key)
+
+    def remove(self, key, res):
+        for lit in res.resolvent.relations:
+            self.tree.remove(lit, key)
+
+    # keys of stored clauses with a literal that may unify with the
+    # complement of a literal of `res`
+    def partners(self, res):
+        keys = set()
+        for lit in res.resolvent.relations:
+            keys.update(key for _, key in self.tree.unifiable(lit.negate()))
+
+        return keys
@@ -0,0 +1,71 @@
+import resource
+import signal
+import sys
+import time
+
+
+class LimitReached(Exception):
+    def __init__(self, reason):
+        super().__init__("{} limit reached".format(reason))
+        self.reason = reason
+
+
+# peak resident set size in MB (ru_maxrss is in kB on Linux, bytes on macOS)
+def peak_rss():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / (1 << 10)
+
+
+PAGE = resource.getpagesize()
+
+# current resident set size in MB where /proc has it, else the peak
+def rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE / (1 << 20)
+    except OSError:
+        return peak_rss()
+
+
+# Time (s), memory (MB of RSS) and clause budgets of a run. check() sits
+# in the inner loops of the engines, so only the clause count is compared on
+# every call and the clock and memory every `every` calls; check_resources()
+# compares them right away.
+class Limits:
+    def __init__(self, time_limit=None, memory_limit=None, max_clauses=None, every=16):
+        self.start = time.monotonic()
+        self.deadline = self.start + time_limit if time_limit is not None else None
+        self.memory_limit = memory_limit
+        self.max_clauses = max_clauses
+        self.every = every
+        self.ticks = 0
+
+    def check(self, clauses):
+        if self.max_clauses is not None and clauses >= self.max_clauses:
+            raise LimitReached("clause")
+
+        self.ticks += 1
+        if self.ticks % self.every == 0:
+            self.check_resources()
+
+    def check_resources(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise LimitReached("time")
+        if self.memory_limit is not None and rss() > self.memory_limit:
+            raise LimitReached("memory")
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+
+# one line of progress: elapsed time, peak memory and the engine's counters
+def snapshot(limits, stats, out=None):
+    fields = ["elapsed={:.2f}s".format(limits.elapsed()), "rss={:.1f}MB".format(peak_rss())]
+    fields.extend("{}={}".format(k, v) for k, v in stats().items())
+    print("stats: " + " ".join(fields), file=out or sys.stderr, flush=True)
+
+
+# `kill -USR1 <pid>` prints a snapshot without stopping the run
+def snapshot_on_signal(limits, stats):
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: snapshot(limits, stats))
@@ -0,0 +1,200 @@
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
+
+from structure import Var, Relation
+
+
+def args(t):
+    return getattr(t, "childs", ())
+
+
+# Term sizes and variable occurrence counts, computed once per hash-consed
+# term and children first, so a term with a lot of sharing costs its DAG size.
+sizes = WeakKeyDictionary()
+occurrences = WeakKeyDictionary()
+
+def measure(t):
+    stack = [t]
+    while stack:
+        u = stack[-1]
+        if u in sizes:
+            stack.pop()
+            continue
+
+        pending = [c for c in args(u) if c not in sizes]
+        if pending:
+            stack.extend(pending)
+            continue
+
+        stack.pop()
+        sizes[u] = 1 + sum(sizes[c] for c in args(u))
+        if isinstance(u, Var):
+            occurrences[u] = {u: 1}
+        elif u.vars:
+            occ = dict()
+            for c in args(u):
+                for v, n in occurrences[c].items():
+                    occ[v] = occ.get(v, 0) + n
+            occurrences[u] = occ
+        else:
+            occurrences[u] = dict()
+
+
+def size(t):
+    if t not in sizes:
+        measure(t)
+    return sizes[t]
+
+
+def occurs(t):
+    if t not in occurrences:
+        measure(t)
+    return occurrences[t]
+
+
+# Simplification orderings on terms and atoms. The precedence lists symbols
+# from lowest to highest; symbols not listed are below the listed ones and
+# ordered by arity, then name. Predicates are above all function symbols.
+class Ordering:
+    def __init__(self, precedence=()):
+        self.rank = {s: i for i, s in enumerate(precedence)}
+
+    def precedence(self, t):
+        return (isinstance(t, Relation), self.rank.get(t.label, -1), len(args(t)), t.label)
+
+    def greater(self, s, t):
+        pass
+
+    # literals compare by their atoms, !A is above A
+    def greater_literal(self, l1, l2):
+        if l1.label == l2.label and l1.childs == l2.childs:
+            return l1.neg and not l2.neg
+        return self.greater(l1.negate() if l1.neg else l1, l2.negate() if l2.neg else l2)
+
+
+# Knuth-Bendix ordering with weight 1 for every symbol and variable
+class KBO(Ordering):
+    def greater(self, s, t):
+        while True:
+            if s is t or isinstance(s, Var):
+                return False
+            if isinstance(t, Var):
+                return t in s.vars
+
+            occ = occurs(s)
+            if any(occ.get(v, 0) < n for v, n in occurs(t).items()):
+                return False
+
+            ws, wt = size(s), size(t)
+            if ws != wt:
+                return ws > wt
+
+            ps, pt = self.precedence(s), self.precedence(t)
+            if ps != pt:
+                return ps > pt
+
+            # same symbol: the first differing arguments decide
+            for a, b in zip(args(s), args(t)):
+                if a is not b:
+                    s, t = a, b
+                    break
+            else:
+                return False
+
+
+# lexicographic path ordering
+class LPO(Ordering):
+    def greater(self, s, t):
+        return self.gt(s, t, dict())
+
+    def gt(self, s, t, memo):
+        if s is t or isinstance(s, Var):
+            return False
+        if isinstance(t, Var):
+            return t in s.vars
+        if (s, t) in memo:
+            return memo[s, t]
+
+        if any(a is t or self.gt(a, t, memo) for a in args(s)):
+            result = True
+        else:
+            ps, pt = self.precedence(s), self.precedence(t)
+            result = False
+            if ps >= pt and all(self.gt(s, b, memo) for b in args(t)):
+                if ps > pt:
+                    result = True
+                else:
+                    for a, b in zip(args(s), args(t)):
+                        if a is not b:
+                            result = self.gt(a, b, memo)
+                            break
+
+        memo[s, t] = result
+        return result
+
+
+ORDERINGS = {"kbo": KBO, "lpo": LPO}
+
+
+# Ordered resolution with selection (Bachmair-Ganzinger): a clause takes part
+# in inferences only through its selected literal if the selection function
+# picks one, otherwise through the literals that are maximal in the ordering,
+# also after the unifier is applied. Factoring is restricted to maximal
+# positive literals of clauses without a selected literal. Without an
+# ordering every literal counts as maximal. The eligible literals of the last
+# `cache` clauses are remembered, by each instance for itself.
+class Refinement:
+    def __init__(self, order=None, select=False, cache=1 << 14):
+        self.order = order
+        self.select = select
+        self.cache = cache
+        self.eligibles = OrderedDict()
+
+    # workers get the refinement with every task, without the cache
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["eligibles"] = OrderedDict()
+        return state
+
+    # the largest negative literal
+    def selected(self, lits):
+        neg = [l for l in lits if l.neg]
+        if not self.select or not neg:
+            return None
+        return max(neg, key=lambda l: (size(l), str(l)))
+
+    def maximal(self, lit, lits):
+        return self.order is None or not any(self.order.greater_literal(l, lit) for l in lits)
+
+    # (literals to resolve on, whether that is the selected one)
+    def eligible(self, lits):
+        found = self.eligibles.get(lits)
+        if found is not None:
+            self.eligibles.move_to_end(lits)
+            return found
+
+        s = self.selected(lits)
+        if s is not None:
+            found = (s,), True
+        else:
+            found = tuple(l for l in lits if self.maximal(l, lits)), False
+
+        self.eligibles[lits] = found
+        if len(self.eligibles) > self.cache:
+            self.eligibles.popitem(last=False)
+        return found
+
+    # is `lit` still eligible in the instantiated clause
+    def allowed(self, lit, lits, selected):
+        return selected or self.maximal(lit, lits)
+
+    def factorable(self, lits, l1, l2):
+        eligible, selected = self.eligible(lits)
+        return not selected and not l1.neg and (l1 in eligible or l2 in eligible)
+
+
+def refinement(ordering="none", selection="none", precedence=()):
+    if ordering == "none" and selection == "none":
+        return None
+    order = ORDERINGS[ordering](precedence) if ordering != "none" else None
+    return Refinement(order, selection == "negative")
@@ -0,0 +1,56 @@
+import functools
+import multiprocessing
+
+import stats
+
+
+# runs `work` on a task in a worker; when the parent counts, also returns
+# the counters the task adds (not the timers, the phases of the workers
+# overlap)
+def counted(work, count, task):
+    if not count:
+        return work(task), None
+
+    stats.current = stats.Stats()
+    return work(task), stats.current.counters
+
+
+# Generates the inferences between a given clause and its partners on a
+# process pool. Clauses travel in a compact encoded form; `work` runs in the
+# workers on (encoded given, [encoded partner, ...]) and returns one result
+# per partner, `decode` turns such a result back into the (found, Resolution)
+# pairs of Resolution.proof. Results are merged in partner order, so the
+# search does not depend on the number of workers; the workers' counters are
+# added to stats.current.
+class ParallelProofs:
+    def __init__(self, jobs, encode, work, decode, batch=64):
+        self.jobs = jobs
+        self.encode = encode
+        self.work = work
+        self.decode = decode
+        self.batch = batch
+        # fork, so the workers see the solver module the functions come from
+        self.pool = multiprocessing.get_context("fork").Pool(jobs)
+
+    def proofs(self, given, partners):
+        if len(partners) < 2 * self.batch:
+            return [(other, given.proof(other)) for other in partners]
+
+        size = max(self.batch, -(-len(partners) // (4 * self.jobs)))
+        chunks = [partners[i:i + size] for i in range(0, len(partners), size)]
+
+        g = self.encode(given)
+        work = functools.partial(counted, self.work, not isinstance(stats.current, stats.NullStats))
+        results = self.pool.map(work, [(g, [self.encode(o) for o in chunk]) for chunk in chunks])
+
+        out = []
+        for chunk, (rs, counters) in zip(chunks, results):
+            for name, n in (counters or dict()).items():
+                stats.current.count(name, n)
+            for other, r in zip(chunk, rs):
+                out.append((other, self.decode(given, other, r)))
+
+        return out
+
+    def close(self):
+        self.pool.terminate()
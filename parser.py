@@ -1,53 +1,137 @@
 import re
+import sys
 from structure import Var, Const, Function, Relation
 
 
-def parse_terms(s):
-    if len(s) == 1:
-        return [Var(s[0])] if s[0].isdigit() else [Const(s[0])]
+TOKEN = re.compile(r"(?P<var>\d+)|(?P<pred>[A-Z][A-Za-z0-9_]*)|(?P<name>[a-z][A-Za-z0-9_]*)|(?P<punct>[!(),])|(?P<space>\s+)|(?P<bad>.)")
 
 
-    terms = []
+class ParseError(Exception):
+    def __init__(self, msg, line, col, path=None):
+        super().__init__(msg)
+        self.msg = msg
+        self.line = line
+        self.col = col
+        self.path = path
 
+    def __str__(self):
+        where = "line {}, column {}: {}".format(self.line, self.col, self.msg)
+        return "{}: {}".format(self.path, where) if self.path else where
 
-    while len(s)>0:
-        #print("parsing", s)
-        fst = s[0]
 
-        if fst == ")":
-            return terms, s[1:]
-        elif fst.isdigit():
-            terms.append(Var(fst))
-            s = s[1:]
-        elif fst.isalpha() and len(s)>1 and  s[1] == "(":
-            inner, s = parse_terms(s[2:])
+# every symbol name is stored once
+symbols = dict()
 
-            #print("inner", fst, inner, s)
-            terms.append(Function(fst, inner))
-        else:
-            terms.append(Const(fst))
-            s = s[1:]
+def symbol(s):
+    return symbols.setdefault(s, s)
 
-    return terms
 
+# (kind, text, column) of every token of a line in one regex pass,
+# closed by an "end" token
+def tokenize(l, lineno):
+    tokens = []
+    for m in TOKEN.finditer(l):
+        kind = m.lastgroup
+        if kind == "space":
+            continue
+        if kind == "bad":
+            raise ParseError("unexpected character {!r}".format(m.group()), lineno, m.start() + 1)
+        tokens.append((kind, m.group(), m.start() + 1))
 
+    tokens.append(("end", "", len(l) + 1))
+    return tokens
 
 
-def parse_line(l):
-    terms = re.findall("!?[A-Z][^A-Z^!]*", l)
+def describe(kind, text):
+    return "end of line" if kind == "end" else repr(text)
 
-    terms = map(lambda s: re.findall("!|\d+|[A-Z][a-z]*|[a-z]+|[()]", s), terms)
 
+# S(1, f(a)), !P(b): a list of literals, separated by commas or, as the
+# first version of the format allowed, just by spaces (S(1, f(a)) !P(b));
+# terms are built directly while scanning with an explicit stack of open
+# function symbols
+def parse_line(l, lineno=1):
+    tokens = tokenize(l.rstrip("\n"), lineno)
     parsed = []
-
-    for t in terms:
-        if t[0] == "!":
-            parsed.append(Relation(t[1], parse_terms(t[3:-1]), neg=True))
-        else:
-            parsed.append(Relation(t[0], parse_terms(t[2:-1])))
-
-    return parsed
-
+    i = 0
+
+    while True:
+        kind, text, col = tokens[i]
+        i += 1
+        if kind == "end":
+            return parsed
+        if parsed and text == ",":
+            kind, text, col = tokens[i]
+            i += 1
+
+        neg = text == "!"
+        if neg:
+            kind, text, col = tokens[i]
+            i += 1
+        if kind != "pred":
+            raise ParseError("expected a predicate, found {}".format(describe(kind, text)), lineno, col)
+        if tokens[i][1] != "(":
+            raise ParseError("expected '(', found {}".format(describe(*tokens[i][:2])), lineno, tokens[i][2])
+        i += 1
+
+        stack = [(symbol(text), [])]
+        term = True
+
+        while stack:
+            kind, text, col = tokens[i]
+            i += 1
+
+            # anything but the ')' of an empty argument list
+            if term and not (text == ")" and not stack[-1][1]):
+                if kind == "var":
+                    stack[-1][1].append(Var(symbol(text)))
+                elif kind == "name" and tokens[i][1] == "(":
+                    i += 1
+                    stack.append((symbol(text), []))
+                    continue
+                elif kind == "name":
+                    stack[-1][1].append(Const(symbol(text)))
+                else:
+                    raise ParseError("expected a term, found {}".format(describe(kind, text)), lineno, col)
+                term = False
+            elif text == "," and not term:
+                term = True
+            elif text == ")":
+                label, childs = stack.pop()
+                term = False
+                if stack:
+                    stack[-1][1].append(Function(label, childs))
+                else:
+                    parsed.append(Relation(label, childs, neg))
+            else:
+                raise ParseError("expected ',' or ')', found {}".format(describe(kind, text)), lineno, col)
+
+
+# ?!S(1, a): a clause marked with "?" is a goal, the negation of what is to be
+# proved; (literals, goal) for a line
+def parse_clause(l, lineno=1):
+    goal = l.lstrip().startswith("?")
+    if goal:
+        l = l.replace("?", " ", 1)
+    return parse_line(l, lineno), goal
+
+
+# lazily parses the non-blank lines of an iterable into (literals, goal)
 def parse(lines):
-    return [*map(parse_line, lines)]
-
+    for lineno, l in enumerate(lines, 1):
+        if l.strip():
+            yield parse_clause(l, lineno)
+
+
+# streams the clauses of a file, "-" reads stdin
+def parse_file(path):
+    try:
+        if path == "-":
+            yield from parse(sys.stdin)
+            return
+
+        with open(path) as f:
+            yield from parse(f)
+    except ParseError as e:
+        e.path = "<stdin>" if path == "-" else path
+        raise
@@ -1,69 +1,262 @@
 import argparse
-from itertools import combinations
-from copy import deepcopy
 import functools
+import itertools
 import sys
+from array import array
 
+from cdcl import CDCL
+from saturation import GivenClause
+from subsumption import Subsumption, PLFeatures, SparseFeatures, pl_subsumes, sparse_subsumes
+from proof import ProofPrinter, derivation
+from preprocess import PLPreprocessor
+from parallel import ParallelProofs
+import stats
+from dimacs import DimacsError, open_input, read_cnf, write_result, DratWriter
+from limits import Limits, LimitReached, snapshot, snapshot_on_signal
+from result import Result, SAT, UNSAT, UNKNOWN
 
+
+# clauses are stored as bitmasks when the variables go up to DENSE_VARS,
+# above that a 3-literal clause takes more memory as a bitmask than as a
+# SparseClause (about 150 B against 130 B at 200 variables) and SparseClause
+# is used
+DENSE_VARS = 128
+
+
+# literals are DIMACS style ints (v / -v); a clause is a pair of bitmasks
+# with bit v set in `pos` for X_v and in `neg` for !X_v
 class Clause:
-    def __init__(self, variables):
-        self.vars = frozenset(variables)
-    
+    __slots__ = ("pos", "neg")
+
+    def __init__(self, pos=0, neg=0):
+        self.pos = pos
+        self.neg = neg
+
+    @staticmethod
+    def of(lits):
+        pos = 0
+        neg = 0
+        for l in lits:
+            if l > 0:
+                pos |= 1 << l
+            else:
+                neg |= 1 << -l
+        return Clause(pos, neg)
+
+    def lits(self):
+        ls = []
+        m = self.pos | self.neg
+        while m:
+            low = m & -m
+            v = low.bit_length() - 1
+            if self.pos & low:
+                ls.append(v)
+            if self.neg & low:
+                ls.append(-v)
+            m ^= low
+        return ls
+
+    # resolvent on variable v, which is positive in one of the clauses and
+    # negative in the other
+    def resolve(self, other, v):
+        bit = 1 << v
+        if self.pos & bit:
+            return Clause((self.pos & ~bit) | other.pos, self.neg | (other.neg & ~bit))
+        return Clause(self.pos | (other.pos & ~bit), (self.neg & ~bit) | other.neg)
+
+    def tautology(self):
+        return bool(self.pos & self.neg)
+
+    def encode(self):
+        return (self.pos, self.neg)
+
     def __eq__(self, other):
-        return self.vars == other.vars
-    
+        return self.pos == other.pos and self.neg == other.neg
+
+    def __hash__(self):
+        return hash((self.pos, self.neg))
+
+    def __len__(self):
+        return self.pos.bit_count() + self.neg.bit_count()
+
     def __str__(self):
-        return ", ".join(map(lambda x: "X"+str(x[1])  if x[0] else "!X"+str(x[1]), self.vars))
+        return ", ".join(map(lambda l: "X"+str(l) if l > 0 else "!X"+str(-l), self.lits()))
 
     def tex(self):
-        return ", ".join(map(lambda x: "X_{"+str(x[1])+"}"  if x[0] else "\\neg X_{"+str(x[1])+"}", self.vars))
+        return ", ".join(map(lambda l: "X_{"+str(l)+"}" if l > 0 else "\\neg X_{"+str(-l)+"}", self.lits()))
+
+
+
+def literal_order(l):
+    return 2 * l if l > 0 else -2 * l + 1
+
+
+# the same clause as a sorted array('i') of its literals, in the order
+# Clause.lits() lists them (by variable, X_v before !X_v)
+class SparseClause:
+    __slots__ = ("literals",)
+
+    def __init__(self, literals):
+        self.literals = literals
+
+    @staticmethod
+    def of(lits):
+        return SparseClause(array("i", sorted(set(lits), key=literal_order)))
+
+    def lits(self):
+        return self.literals.tolist()
+
+    # as Clause.resolve: X_v goes from this clause if it has it, !X_v otherwise
+    def resolve(self, other, v):
+        l = v if v in self.literals else -v
+        return SparseClause.of([m for m in self.literals if m != l] + [m for m in other.literals if m != -l])
+
+    # complementary literals are neighbours in the order
+    def tautology(self):
+        ls = self.literals
+        return any(ls[i] == -ls[i + 1] for i in range(len(ls) - 1))
+
+    def encode(self):
+        return self.literals
+
+    def __eq__(self, other):
+        return self.literals == other.literals
+
+    def __hash__(self):
+        return hash(self.literals.tobytes())
+
+    def __len__(self):
+        return len(self.literals)
 
+    __str__ = Clause.__str__
+    tex = Clause.tex
+
+
+def decode_clause(e):
+    return Clause(*e) if isinstance(e, tuple) else SparseClause(e)
+
+
+
+# Ordered resolution with the variables ordered by number: a clause is only
+# resolved on its largest literal, or with `select` on its largest negative
+# literal if it has one. (pos, neg) masks of the literals eligible in `c`.
+class Refinement:
+    def __init__(self, ordered=True, select=False):
+        self.ordered = ordered
+        self.select = select
+
+    def eligible(self, c):
+        if self.select and c.neg:
+            return 0, 1 << (c.neg.bit_length() - 1)
+        if not self.ordered or not (c.pos | c.neg):
+            return c.pos, c.neg
+
+        top = 1 << (max(c.pos, c.neg).bit_length() - 1)
+        return c.pos & top, c.neg & top
+
+    # the same for a SparseClause, as a list of literals
+    def eligible_literals(self, c):
+        ls = c.literals
+        if self.select:
+            negative = [l for l in ls if l < 0]
+            if negative:
+                return negative[-1:]
+        if not self.ordered or not ls:
+            return ls
+
+        return [l for l in ls if l == ls[-1] or l == -ls[-1]]
+
+
+def refinement(ordered=False, selection="none"):
+    if not ordered and selection == "none":
+        return None
+    return Refinement(ordered, selection == "negative")
+
+
+def resolve(a, b, refine=None):
+    if type(a) is SparseClause:
+        return resolve_sparse(a, b, refine)
+
+    clash = (a.pos & b.neg) | (a.neg & b.pos)
+    # with more than one complementary pair every resolvent is a tautology
+    if not clash or clash & (clash - 1):
+        if clash:
+            stats.current.count("tautologies")
+        return []
+
+    if refine is not None:
+        apos, aneg = refine.eligible(a)
+        bpos, bneg = refine.eligible(b)
+        if not clash & ((apos & bneg) | (aneg & bpos)):
+            stats.current.count("not_maximal")
+            return []
+
+    v = clash.bit_length() - 1
+    return [(v, a.resolve(b, v))]
+
+
+def resolve_sparse(a, b, refine=None):
+    other = b.literals
+    clash = [l for l in a.literals if -l in other]
+    if len(clash) != 1:
+        if clash:
+            stats.current.count("tautologies")
+        return []
+
+    l = clash[0]
+    if refine is not None and (l not in refine.eligible_literals(a) or -l not in refine.eligible_literals(b)):
+        stats.current.count("not_maximal")
+        return []
+
+    v = abs(l)
+    return [(v, a.resolve(b, v))]
+
+
+def encode_clause(res):
+    return res.resolvent.encode()
+
+
+# process pool side of ParallelProofs
+def work(task, refine=None):
+    given, others = task
+    c1 = decode_clause(given)
+
+    return [[(v, k.encode()) for v, k in resolve(c1, decode_clause(o), refine)] for o in others]
+
+
+def unwork(given, other, results):
+    found = []
+    for v, e in results:
+        k = decode_clause(e)
+        found.append((len(k) == 0, Resolution(k, v, given, other)))
+    return found
 
 
-# (bool, int)
 @functools.total_ordering
 class Resolution:
-    def __init__(self, resolvent : Clause, removed=None , k1=None, k2=None):
+    __slots__ = ("resolvent", "parents", "removed", "ancestors", "refine")
+
+    def __init__(self, resolvent : Clause, removed=None , k1=None, k2=None, ancestors=0, refine=None):
       
         self.resolvent = resolvent # resolvent :: Clause
         self.parents = (k1,k2) # k1 :: Resolution
         self.removed = removed
 
-    def proof(self, other):
-        resolutions = []
-        for v in self.resolvent.vars:
-            if (not v[0], v[1]) in other.resolvent.vars:                  
-                
-                s1 = set(self.resolvent.vars)
-                s1.remove(v)
-                s2 = set(other.resolvent.vars)
-                s2.remove((not v[0], v[1]))
-                
-                
-                resolvent = Clause(s1.union(s2))
-                
-                if len(resolvent.vars) == 0:
-                    resolutions.append((True, Resolution(resolvent, v[1], self, other)))
-                
-                
-                resolutions.append((False,Resolution(resolvent, v[1], self, other)))
-        
-        return resolutions
-    
+        # bitset over the ids of the premises this clause is derived from
+        self.ancestors = k1.ancestors | k2.ancestors if k1 else ancestors
+        self.refine = k1.refine if k1 else refine
 
-    def deep_parents(self):
-        s = set()
+    def proof(self, other):
+        return [(len(k) == 0, Resolution(k, v, self, other)) for v, k in resolve(self.resolvent, other.resolvent, self.refine)]
 
-        if not self.parents[0]:
-            return {hash(self.resolvent.vars)}
 
-        s.update(*map(lambda x: x.deep_parents(), self.parents))
-       
-        return s 
+    # clauses are sets of ground literals, there is nothing to factor
+    def factors(self):
+        return []
     
 
     def __lt__(self, other):
-        return len(self.resolvent.vars) < len(other.resolvent.vars)
+        return len(self.resolvent) < len(other.resolvent)
     
     
     def __eq__(self, other):
@@ -71,7 +264,7 @@ class Resolution:
     
 
     def __hash__(self):
-        return hash(self.resolvent.vars)
+        return hash(self.resolvent)
 
 
     def __str__(self):
@@ -82,91 +275,412 @@ class Resolution:
 
 
       
-class Pretty_Proof:
-    def __init__(self):
-        self.num = 1
-        self.m     = dict()
-      
-    def pretty(self, proof):
+class Pretty_Proof(ProofPrinter):
+    deeper_first = False
+
+    def text_step(self, num, proof, parents):
         if not proof.parents[0]:
-            print("{}.\t{}\t\t\tpremise".format(self.num, proof.resolvent))
-            self.m[proof] = self.num
-            self.num += 1
-        else:
-            if not proof.parents[0] in self.m:
-                self.pretty(proof.parents[0])
-            if not proof.parents[1] in self.m:
-                self.pretty(proof.parents[1])
+            return "{}.\t{}\t\t\tpremise".format(num, proof.resolvent)
 
-            res = "{}"
-            if len(proof.resolvent.vars) != 0:
-                res = proof.resolvent
+        res = "{}"
+        if len(proof.resolvent) != 0:
+            res = proof.resolvent
 
+        return "{}.\t{}\t\t\t(res) with X{} from {} and {}".format(num, res, proof.removed, parents[0], parents[1])
 
-            p1id = self.m[proof.parents[0]]
-            p2id = self.m[proof.parents[1]]
-            print("{}.\t{}\t\t\t(res) with X{} from {} and {}".format(self.num, res, proof.removed, p1id, p2id))
-            self.m[proof] = self.num
-            self.num += 1
 
+    def tex_step(self, num, proof, parents):
+        if not proof.parents[0]:
+            return "{}. & \\{{ {}\\}}& \\text{{premise}} \\\\".format(num, proof.resolvent.tex())
 
-    def tex(self, proof):
-        print("\\begin{array}{lll}")
-        self._tex(proof)
-        print("\\end{array}")
-    
+        return "{}. & \\{{ {}\\}} & \\text{{(res) with $X_{}$ from {} and {} }} \\\\".format(num, proof.resolvent.tex(), proof.removed, parents[0], parents[1])
 
-    def _tex(self, proof):
+
+    def json_step(self, proof):
         if not proof.parents[0]:
-            print ("{}. & \\{{ {}\\}}& \\text{{premise}} \\\\".format(self.num, proof.resolvent.tex()))
-            self.m[proof] = self.num
-            self.num += 1
-        else:
-            if not proof.parents[0] in self.m:
-                self._tex(proof.parents[0])
-            if not proof.parents[1] in self.m:
-                self._tex(proof.parents[1])
+            return {"clause": proof.resolvent.lits(), "rule": "premise"}
+
+        return {"clause": proof.resolvent.lits(), "rule": "resolution", "pivot": proof.removed}
+
 
-            res = ""
-            if len(proof.resolvent.vars) != 0:
-                res = proof.resolvent.tex()
+# the refutation of a CDCL run as resolution steps; premise(cid) gives the
+# node of a clause the solver did not learn
+def replay(solver, premise):
+    steps = dict()
 
-            p1id = self.m[proof.parents[0]]
-            p2id = self.m[proof.parents[1]]
-            print("{}. & \\{{ {}\\}} & \\text{{(res) with $X_{}$ from {} and {} }} \\\\".format(self.num, res, proof.removed, p1id, p2id))
-            self.m[proof] = self.num
-            self.num += 1
+    def step(cid):
+        if cid not in steps:
+            steps[cid] = premise(cid)
+        return steps[cid]
 
+    def build(derivation):
+        confl, chain = derivation
+        res = step(confl)
+        for v, r in chain:
+            res = Resolution(res.resolvent.resolve(step(r).resolvent, v), v, res, step(r))
+        return res
 
-parser = argparse.ArgumentParser(description='PL Solver')
-parser.add_argument('file', metavar='f', type=str)
+    for cid in solver.core():
+        if cid in solver.derivation:
+            steps[cid] = build(solver.derivation[cid])
 
-args = parser.parse_args()
+    return build(solver.refutation)
 
 
-clauses = [Clause(map(lambda x: (False, int(x[1:])) if x[0] == "!" else (True, int(x)), l.strip().split(" "))) for l in open(args.file)]      # !3 4 --> not X3 OR X4
+# !3 4 --> not X3 OR X4, one clause per line
+def read_plain(lines):
+    for l in lines:
+        if l.strip():
+            yield [-int(x[1:]) if x[0] == "!" else int(x) for x in l.split()]
 
-resolutions = set(map(Resolution, clauses))
-old_resolutions = set()
 
-while resolutions != old_resolutions:
-    old_resolutions = deepcopy(resolutions)
-    for (r1, r2) in combinations(sorted(old_resolutions), 2):
-        par1 = r1.deep_parents()
-        par2 = r2.deep_parents()
-        
-        if  bool(par1.intersection(par2)) and bool(par1) and bool(par2):
+def read_clauses(path, fmt="auto"):
+    lines = iter(open_input(path))
+    head = []
+
+    if fmt == "auto":
+        fmt = "plain"
+        for l in lines:
+            head.append(l)
+            if l.strip():
+                if l.split()[0] in ("c", "p"):
+                    fmt = "dimacs"
+                break
+
+    lines = itertools.chain(head, lines)
+    return read_cnf(lines) if fmt == "dimacs" else read_plain(lines)
+
+
+# A model of a clause set saturated under resolution (ordered or not, with or
+# without negative selection), built as in the completeness proof: clauses
+# in increasing order (literals by variable, !X_v above X_v), each clause
+# still false whose largest literal is positive and that has no selected
+# literal makes that literal true.
+def saturated_model(clauses, nvars, select=False):
+    true = set()
+    for lits in sorted(clauses, key=lambda c: sorted(map(literal_order, c), reverse=True)):
+        if any(l in true if l > 0 else -l not in true for l in lits):
             continue
-       
-        
-        for found, res in r1.proof(r2):
-            if found:
-                pretty = Pretty_Proof()
-                pretty.tex(res)
-                pretty = Pretty_Proof()
-                pretty.pretty(res)
-                sys.exit()
-            resolutions.add(res)
-           
-for res in resolutions:
-    print(res)
+        top = max(lits, key=literal_order)
+        if top > 0 and not (select and any(l < 0 for l in lits)):
+            true.add(top)
+
+    return [v if v in true else -v for v in range(1, nvars + 1)]
+
+
+# the resolvents of a refutation as DRAT lemmas, premises first
+def write_drat(proof, drat):
+    for node in derivation(proof, deeper_first=False):
+        if node.parents[0]:
+            drat.add(node.resolvent.lits())
+
+
+# Propositional solver for a clause set, with the saturation or the CDCL
+# engine. Clauses are DIMACS style literal lists or Clause objects; solve()
+# starts over on all clauses added so far. They are kept as literal lists,
+# the CDCL engine takes them as they are, the saturation engine as Clause
+# or, with more than DENSE_VARS variables, SparseClause objects. With `drat` set, an UNSAT answer
+# is logged as a DRAT proof. `ordered` and `selection` ("none", "negative")
+# restrict the saturation engine as in Refinement. With `preprocess` the
+# clauses are simplified first (preprocess.PLPreprocessor); the clauses it
+# derives show up in proofs and DRAT output, models are extended back to the
+# eliminated variables. The saturation engine then also drops tautologies
+# added later.
+# Incremental use: saturate() runs the engine on the clauses added so far
+# (the background) and keeps its state; from then on add_clause() hands new
+# clauses to that state and solve() only does the work they add.
+# checkpoint() returns a mark, restore(mark) takes back the clauses added
+# since together with what was derived from them, as often as needed;
+# release(mark) says the mark is no longer needed. solve(assumptions=[...])
+# adds the literals as unit clauses for that one call. Preprocessing does not
+# preserve equivalence, so it is skipped for incremental use.
+class Solver:
+    def __init__(self, engine="resolution", jobs=1, skip_related=False, drat=None, ordered=False, selection="none", preprocess=False):
+        self.engine = engine
+        self.jobs = jobs
+        self.skip_related = skip_related
+        self.drat = drat
+        self.refine = refinement(ordered, selection)
+        self.preprocess = preprocess
+        self.clauses = []
+        self.nvars = 0
+        self.dense = True
+        self.inputs = None
+        self.steps = dict()
+        self.parallel = None
+        self.preprocessor = None
+        self.saturation = None
+        self.cdcl = None
+        self.refutation = None
+        self.refuted = None
+        self.incremental = False
+
+    def add_clause(self, lits):
+        lits = lits.lits() if isinstance(lits, (Clause, SparseClause)) else lits
+        self.clauses.append(lits)
+        self.nvars = max(self.nvars, max(map(abs, lits), default=0))
+        if not self.incremental:
+            return
+
+        if self.cdcl is not None:
+            self.steps[self.cdcl.add_clause(lits)] = lits
+            return
+
+        res = Resolution(self.clause(lits), ancestors=self.ancestors(len(self.clauses) - 1), refine=self.refine)
+        if not lits:
+            self.refuted = res
+        else:
+            self.saturation.add(res)
+
+    def clause(self, lits):
+        return Clause.of(lits) if self.dense else SparseClause.of(lits)
+
+    # the ancestor bitset of premise i, only tracked for skip_related
+    def ancestors(self, i):
+        return 1 << i if self.skip_related else 0
+
+    def premises(self):
+        return [Resolution(self.clause(c), ancestors=self.ancestors(i), refine=self.refine) for i, c in enumerate(self.clauses)]
+
+    # the node of CDCL clause cid that was not learned
+    def premise(self, cid):
+        res = self.steps[cid]
+        if isinstance(res, Resolution):
+            return res
+        return Resolution(self.clause(res), refine=self.refine)
+
+    def solve(self, limits=None, assumptions=()):
+        if assumptions:
+            mark = self.checkpoint()
+            for lit in assumptions:
+                self.add_clause([lit])
+            try:
+                result = self.solve(limits)
+                self.proof()
+                return result
+            finally:
+                self.restore(mark)
+                self.release(mark)
+
+        if not self.incremental:
+            self.start()
+            if self.refutation is not None:
+                return Result(UNSAT, stats=self.stats())
+        return self.search(limits)
+
+    def saturate(self, limits=None):
+        self.start(incremental=True)
+        self.incremental = True
+        return self.search(limits)
+
+    def checkpoint(self):
+        if not self.incremental:
+            return len(self.clauses), None, None
+        if self.cdcl is not None:
+            return len(self.clauses), self.cdcl.checkpoint(), self.refuted
+        return len(self.clauses), self.saturation.checkpoint(), self.refuted
+
+    def restore(self, mark):
+        n, engine, self.refuted = mark
+        del self.clauses[n:]
+
+        # a mark from before saturate() ends the incremental use
+        if engine is None:
+            self.incremental = False
+        elif self.cdcl is not None:
+            self.cdcl.restore(engine)
+            self.steps = {cid: res for cid, res in self.steps.items() if cid < engine[0]}
+        else:
+            self.saturation.restore(engine)
+
+    def release(self, mark):
+        if mark[1] is not None and self.saturation is not None:
+            self.saturation.release(mark[1])
+
+    def start(self, incremental=False):
+        self.refutation = None
+        self.refuted = None
+        self.saturation = None
+        self.cdcl = None
+        self.dense = self.nvars <= DENSE_VARS
+        self.inputs = None
+        self.preprocessor = None
+
+        if self.preprocess and not incremental:
+            self.preprocessor = PLPreprocessor(lambda n: n.resolvent.lits(),
+                                               lambda n1, n2, v: Resolution(n1.resolvent.resolve(n2.resolvent, v), v, n1, n2))
+            self.inputs = self.preprocessor.run(self.premises())
+            if self.inputs is None:
+                self.refutation = self.preprocessor.refutation
+                if self.drat:
+                    write_drat(self.refutation, self.drat)
+                return
+
+        if self.engine == "cdcl":
+            self.start_cdcl()
+        else:
+            self.start_saturation()
+
+    def start_cdcl(self):
+        if self.drat and self.preprocessor is not None:
+            for lits in self.preprocessor.derived:
+                self.drat.add(lits)
+
+        if self.inputs is None:
+            self.cdcl = CDCL(self.clauses, drat=self.drat)
+            self.steps = dict(enumerate(self.clauses))
+        else:
+            self.cdcl = CDCL((n.resolvent.lits() for n in self.inputs), drat=self.drat)
+            self.steps = dict(enumerate(self.inputs))
+
+    def start_saturation(self):
+        if self.jobs > 1 and self.parallel is None:
+            self.parallel = ParallelProofs(self.jobs, encode_clause, functools.partial(work, refine=self.refine), unwork)
+
+        if self.dense:
+            subsumption = Subsumption(PLFeatures(self.nvars), pl_subsumes)
+        else:
+            subsumption = Subsumption(SparseFeatures(), sparse_subsumes)
+        self.saturation = GivenClause(key=lambda r: r.resolvent, subsumption=subsumption,
+                                      parallel=self.parallel, skip_related=self.skip_related,
+                                      tautologies=self.preprocess)
+        for res in self.premises() if self.inputs is None else self.inputs:
+            if not res.resolvent:
+                self.refuted = res
+            self.saturation.add(res)
+
+    def search(self, limits):
+        self.refutation = None
+        try:
+            if self.cdcl is not None:
+                return self.search_cdcl(limits)
+            return self.search_saturation(limits)
+        except LimitReached as e:
+            return Result(UNKNOWN, limit=e, stats=self.stats())
+
+    def search_cdcl(self, limits):
+        self.cdcl.limits = limits
+        if self.cdcl.solve():
+            model = self.cdcl.model()
+            if self.preprocessor is not None:
+                model = self.preprocessor.extend(model)
+            return Result(SAT, model=model, stats=self.stats())
+        return Result(UNSAT, stats=self.stats())
+
+    def search_saturation(self, limits):
+        self.saturation.limits = limits
+        if self.refuted is None:
+            for res in self.saturation.run():
+                self.refuted = res
+                break
+
+        if self.refuted is not None:
+            self.refutation = self.refuted
+            if self.drat:
+                write_drat(self.refutation, self.drat)
+            return Result(UNSAT, stats=self.stats())
+
+        # with skip_related a saturated set is not a proof of satisfiability
+        if self.skip_related:
+            return Result(UNKNOWN, stats=self.stats())
+
+        model = saturated_model([res.resolvent.lits() for res in self.saturated()], self.nvars,
+                                self.refine is not None and self.refine.select)
+        if self.preprocessor is not None:
+            model = self.preprocessor.extend(model)
+        return Result(SAT, model=model, stats=self.stats())
+
+    # the refutation of an UNSAT answer; CDCL's is replayed on first use
+    def proof(self):
+        if self.refutation is None and self.cdcl is not None and self.cdcl.refutation is not None:
+            self.refutation = replay(self.cdcl, self.premise)
+        return self.refutation
+
+    def saturated(self):
+        return self.saturation.clauses()
+
+    def stats(self):
+        d = dict()
+        if self.preprocessor is not None:
+            d.update(("pre_" + k, v) for k, v in sorted(self.preprocessor.effects.items()))
+        if self.cdcl is not None:
+            d.update(self.cdcl.stats())
+        elif self.saturation is not None:
+            d.update(self.saturation.stats())
+        return d
+
+    def close(self):
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PL Solver')
+    parser.add_argument('file', metavar='f', type=str, help="clause file, may be gzip/xz/bzip2 compressed, - reads stdin")
+    parser.add_argument('--input', choices=["auto", "plain", "dimacs"], default="auto", help="input format, default: DIMACS if the file starts with a c or p line")
+    parser.add_argument('--output', choices=["plain", "dimacs"], default="plain", help="dimacs: s/v result lines, proofs only with --proof")
+    parser.add_argument('--drat', metavar="FILE", help="write a DRAT proof for UNSAT inputs")
+    parser.add_argument('--engine', choices=["resolution", "cdcl"], default="resolution")
+    parser.add_argument('--proof', action="append", choices=["text", "tex", "json"], help="proof output format(s), default: tex and text")
+    parser.add_argument('--jobs', type=int, default=1, help="generate resolvents on N worker processes")
+    parser.add_argument('--skip-related', action="store_true", help="never resolve two clauses derived from a common premise (incomplete)")
+    parser.add_argument('--ordered', action="store_true", help="ordered resolution: resolve only on the largest literal of a clause, X1 < X2 < ...")
+    parser.add_argument('--selection', choices=["none", "negative"], default="none", help="negative: resolve only on the largest negative literal of a clause that has one")
+    parser.add_argument('--preprocess', action="store_true", help="simplify the clauses first: units, pure literals, variable and blocked clause elimination")
+    parser.add_argument('--time-limit', type=float, metavar="SECONDS", help="give up after this much wall time")
+    parser.add_argument('--memory-limit', type=float, metavar="MB", help="give up once the RSS exceeds this")
+    parser.add_argument('--max-clauses', type=int, metavar="N", help="give up after generating (cdcl: learning) N clauses")
+    parser.add_argument('--stats', nargs="?", const="text", choices=["text", "json"], help="print counters and phase timers to stderr when done")
+    parser.add_argument('--profile', metavar="FILE", help="profile the run with cProfile (FILE.prof) or pyinstrument (FILE.html)")
+
+    args = parser.parse_args()
+    limits = Limits(args.time_limit, args.memory_limit, args.max_clauses)
+    if args.stats:
+        stats.enable()
+    if args.profile:
+        stats.profile(args.profile)
+    dimacs = args.output == "dimacs"
+    formats = args.proof or ([] if dimacs else ["tex", "text"])
+
+    drat = DratWriter(open(args.drat, "w")) if args.drat else None
+    solver = Solver(args.engine, args.jobs, args.skip_related, drat, args.ordered, args.selection, args.preprocess)
+
+    t = stats.current.start()
+    try:
+        for lits in read_clauses(args.file, args.input):
+            solver.add_clause(lits)
+    except (DimacsError, ValueError) as e:
+        sys.exit("{}: {}".format(args.file, e))
+    stats.current.stop("parse", t)
+
+    snapshot_on_signal(limits, solver.stats)
+    if args.stats:
+        stats.report_at_exit(limits, solver.stats, args.stats)
+
+    result = solver.solve(limits)
+    if drat:
+        drat.close()
+    if result.limit and not args.stats:
+        snapshot(limits, solver.stats)
+
+    if result.status == UNSAT:
+        if dimacs:
+            write_result(False)
+        Pretty_Proof().write(solver.proof(), formats)
+    elif dimacs:
+        write_result(True if result.status == SAT else None, result.model)
+    elif result.limit:
+        print(result.limit)
+    elif args.engine == "cdcl":
+        print("SAT")
+        print(Clause.of(result.model))
+    else:
+        for res in solver.saturated():
+            print(res)
+
+    solver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+from collections import Counter, defaultdict
+from itertools import count
+
+import stats
+from unification import Bindings, match
+
+
+def tautology(lits):
+    return any(-l in lits for l in lits)
+
+
+# Propositional preprocessing (SatELite style) before the search: tautology
+# and duplicate deletion, unit propagation, pure literals, bounded variable
+# elimination and blocked clause elimination, repeated until nothing changes.
+# Clauses are derivation nodes: `lits(node)` gives the DIMACS literals of a
+# node and `derive(n1, n2, v)` the node of the resolvent of n1 and n2 on
+# variable v, so every clause the passes derive carries its own proof.
+# Clauses removed without being implied by the others go on `stack` as
+# (witness literal, literals); extend() turns a model of what is left into a
+# model of the input by making the witness true wherever such a clause is
+# false, latest removal first.
+class PLPreprocessor:
+    def __init__(self, lits, derive, eliminate=True, blocked=True, occurrences=16):
+        self.lits = lits
+        self.derive = derive
+        self.eliminate = eliminate
+        self.blocked = blocked
+        # variable elimination only for variables with at most this many occurrences
+        self.occurrences = occurrences
+
+        self.clauses = dict()
+        self.occ = defaultdict(set)
+        self.keys = set()
+        self.units = []
+        self.ids = count()
+
+        self.stack = []
+        self.derived = []
+        self.effects = Counter()
+        self.refutation = None
+        self.nvars = 0
+
+    def add(self, node):
+        lits = frozenset(self.lits(node))
+        if not lits:
+            self.refutation = node
+            return
+        if tautology(lits):
+            self.effects["tautologies"] += 1
+            return
+        if lits in self.keys:
+            self.effects["duplicates"] += 1
+            return
+
+        cid = next(self.ids)
+        self.clauses[cid] = (lits, node)
+        self.keys.add(lits)
+        for l in lits:
+            self.occ[l].add(cid)
+        if len(lits) == 1:
+            self.units.append(cid)
+
+    def remove(self, cid, witness=None):
+        lits, node = self.clauses.pop(cid)
+        self.keys.discard(lits)
+        for l in lits:
+            self.occ[l].discard(cid)
+        if witness is not None:
+            self.stack.append((witness, lits))
+        return lits, node
+
+    def resolvent(self, n1, n2, v):
+        node = self.derive(n1, n2, v)
+        self.derived.append(self.lits(node))
+        return node
+
+    def propagate(self):
+        while self.units and self.refutation is None:
+            cid = self.units.pop()
+            if cid not in self.clauses:
+                continue
+
+            (l,), unit = self.clauses[cid]
+            for c in [c for c in self.occ[l] if c != cid]:
+                self.remove(c)
+                self.effects["unit_subsumed"] += 1
+
+            for c in list(self.occ[-l]):
+                _, node = self.remove(c)
+                self.add(self.resolvent(node, unit, abs(l)))
+                self.effects["unit_strengthened"] += 1
+
+            self.remove(cid, l)
+            self.effects["units"] += 1
+
+    def pure(self):
+        for l in [l for l, cs in self.occ.items() if cs and not self.occ.get(-l)]:
+            if not self.occ[l]:
+                continue
+            for c in list(self.occ[l]):
+                self.remove(c, l)
+            self.effects["pure_literals"] += 1
+
+    # replaces the clauses of a variable by all their non-tautological
+    # resolvents where that does not add clauses (Davis-Putnam)
+    def bve(self):
+        for v in sorted({abs(l) for l, cs in self.occ.items() if cs}, key=lambda v: len(self.occ[v]) + len(self.occ[-v])):
+            pos, neg = self.occ[v], self.occ[-v]
+            if not pos or not neg or len(pos) + len(neg) > self.occurrences:
+                continue
+
+            pairs = []
+            for p in pos:
+                for n in neg:
+                    if not tautology((self.clauses[p][0] | self.clauses[n][0]) - {v, -v}):
+                        pairs.append((p, n))
+            if len(pairs) > len(pos) + len(neg):
+                continue
+
+            nodes = [self.resolvent(self.clauses[p][1], self.clauses[n][1], v) for p, n in pairs]
+            for c in list(pos):
+                self.remove(c, v)
+            for c in list(neg):
+                self.remove(c, -v)
+            for node in nodes:
+                self.add(node)
+                if self.refutation is not None:
+                    return
+
+            self.effects["eliminated_vars"] += 1
+            self.effects["resolvents"] += len(nodes)
+            self.propagate()
+            if self.refutation is not None:
+                return
+
+    # a clause is blocked on l if all its resolvents on l are tautologies
+    def bce(self):
+        for cid in list(self.clauses):
+            lits = self.clauses[cid][0]
+            for l in lits:
+                if all(any(-m in self.clauses[d][0] for m in lits if m != l) for d in self.occ[-l]):
+                    self.remove(cid, l)
+                    self.effects["blocked"] += 1
+                    break
+
+    # the remaining clauses, or None once the empty clause is derived
+    # (see `refutation`)
+    def run(self, nodes):
+        st = stats.current
+        t = st.start()
+
+        for node in nodes:
+            self.nvars = max(self.nvars, max(map(abs, self.lits(node)), default=0))
+            self.add(node)
+            if self.refutation is not None:
+                break
+
+        while self.refutation is None:
+            before = sum(self.effects.values())
+            self.propagate()
+            if self.refutation is not None:
+                break
+            self.pure()
+            if self.eliminate:
+                self.bve()
+                if self.refutation is not None:
+                    break
+            if self.blocked:
+                self.bce()
+            if sum(self.effects.values()) == before:
+                break
+
+        st.stop("preprocess", t)
+        if self.refutation is not None:
+            return None
+        return [node for _, node in self.clauses.values()]
+
+    def extend(self, model):
+        value = {abs(l): l > 0 for l in model}
+        for witness, lits in reversed(self.stack):
+            if not any(value.get(abs(l), False) == (l > 0) for l in lits):
+                value[abs(witness)] = witness > 0
+
+        nvars = max(self.nvars, max(value, default=0))
+        return [v if value.get(v, False) else -v for v in range(1, nvars + 1)]
+
+
+def instance(l, m):
+    return match(l, m, Bindings())
+
+
+# The sound first order counterparts: tautology and variant deletion, pure
+# predicate elimination, unit subsumption (clauses with an instance of a unit
+# clause) and unit simplification (literals that are instances of the
+# complement of a unit clause are cut off). `simplify(unit, node, lit)` is the
+# node of `node` without `lit`, derived from the unit, or None where that
+# cannot be built. Clauses are Resolution nodes of fol_solver. Pure predicate
+# elimination only preserves satisfiability; with `pure` off the result is
+# equivalent to the input, so clauses can still be added to it later.
+class FOLPreprocessor:
+    def __init__(self, simplify, pure=True):
+        self.simplify = simplify
+        self.eliminate = pure
+        self.effects = Counter()
+        self.removed = []
+        self.refutation = None
+
+    def pure(self, clauses):
+        signs = defaultdict(set)
+        for node in clauses.values():
+            for l in node.resolvent.relations:
+                signs[(l.label, len(l.childs))].add(l.neg)
+
+        # without equality axioms "=" is not an ordinary predicate
+        pure = {p for p, s in signs.items() if len(s) == 1 and p[0] != "="}
+        for cid, node in list(clauses.items()):
+            if any((l.label, len(l.childs)) in pure for l in node.resolvent.relations):
+                self.removed.append(("pure", clauses.pop(cid)))
+                self.effects["pure_clauses"] += 1
+
+    def units(self, clauses):
+        for uid, unit in list(clauses.items()):
+            if uid not in clauses or len(unit.resolvent.relations) != 1:
+                continue
+            (u,) = unit.resolvent.relations
+
+            for cid, node in list(clauses.items()):
+                if cid == uid:
+                    continue
+
+                for l in node.resolvent.relations:
+                    if l.label != u.label or len(l.childs) != len(u.childs):
+                        continue
+
+                    if l.neg == u.neg and instance(u, l):
+                        self.removed.append(("unit_subsumed", clauses.pop(cid)))
+                        self.effects["unit_subsumed"] += 1
+                        break
+
+                    if l.neg != u.neg and instance(u, l.negate()):
+                        res = self.simplify(unit, node, l)
+                        if res is None:
+                            continue
+                        self.effects["unit_simplified"] += 1
+                        if not res.resolvent.relations:
+                            self.refutation = res
+                            return
+                        clauses[cid] = res
+                        break
+
+    def run(self, nodes):
+        st = stats.current
+        t = st.start()
+
+        clauses = dict()
+        keys = set()
+        for cid, node in enumerate(nodes):
+            if node.resolvent.tautology():
+                self.effects["tautologies"] += 1
+            elif node.resolvent.canonical() in keys:
+                self.effects["duplicates"] += 1
+            else:
+                keys.add(node.resolvent.canonical())
+                clauses[cid] = node
+
+        while True:
+            before = sum(self.effects.values())
+            if self.eliminate:
+                self.pure(clauses)
+            self.units(clauses)
+            if self.refutation is not None or sum(self.effects.values()) == before:
+                break
+
+        st.stop("preprocess", t)
+        if self.refutation is not None:
+            return None
+        return [*clauses.values()]
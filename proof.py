@@ -0,0 +1,114 @@
+import json
+import sys
+
+
+# the inferences a proof uses, each once and every node after its parents;
+# with deeper_first the deeper parent's subproof is listed first.
+# Iterative, with the depth of every node computed once.
+def derivation(proof, deeper_first=True):
+    depth = dict()
+    stack = [proof]
+
+    while stack:
+        node = stack[-1]
+        parents = [p for p in node.parents if p]
+        pending = [p for p in parents if id(p) not in depth]
+
+        if pending:
+            stack.extend(pending)
+            continue
+
+        stack.pop()
+        depth[id(node)] = 1 + max((depth[id(p)] for p in parents), default=-1)
+
+    order = []
+    done = set()
+    stack = [(proof, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in done:
+            continue
+
+        if expanded:
+            done.add(id(node))
+            order.append(node)
+            continue
+
+        parents = [p for p in node.parents if p]
+        if deeper_first:
+            parents.sort(key=lambda p: -depth[id(p)])
+
+        stack.append((node, True))
+        stack.extend((p, False) for p in reversed(parents))
+
+    return order
+
+
+# collects output lines and writes them in chunks instead of one print per line
+class Writer:
+    def __init__(self, out=None, chunk=1024):
+        self.out = out or sys.stdout
+        self.chunk = chunk
+        self.buf = []
+
+    def write(self, line):
+        self.buf.append(line)
+        self.buf.append("\n")
+        if len(self.buf) >= 2 * self.chunk:
+            self.flush()
+
+    def flush(self):
+        self.out.write("".join(self.buf))
+        self.buf = []
+
+
+
+# numbering and output of a proof in text, LaTeX and JSON form;
+# the solvers fill in how a single step is rendered
+class ProofPrinter:
+    deeper_first = True
+
+    def __init__(self, out=None):
+        self.out = out
+
+    def steps(self, proof):
+        m = dict()
+        for num, node in enumerate(derivation(proof, self.deeper_first), 1):
+            m[id(node)] = num
+            yield num, node, [m[id(p)] for p in node.parents if p]
+
+    def pretty(self, proof):
+        w = Writer(self.out)
+        for num, node, parents in self.steps(proof):
+            w.write(self.text_step(num, node, parents))
+        w.flush()
+
+    def tex(self, proof):
+        w = Writer(self.out)
+        w.write("\\begin{array}{lll}")
+        for num, node, parents in self.steps(proof):
+            w.write(self.tex_step(num, node, parents))
+        w.write("\\end{array}")
+        w.flush()
+
+    # the steps as dicts, for JSON output
+    def records(self, proof):
+        for num, node, parents in self.steps(proof):
+            step = {"id": num, "parents": parents}
+            step.update(self.json_step(node))
+            yield step
+
+    def json(self, proof):
+        w = Writer(self.out)
+        w.write('{"steps": [')
+        sep = ""
+        for step in self.records(proof):
+            w.write(sep + json.dumps(step))
+            sep = ","
+        w.write("]}")
+        w.flush()
+
+    def write(self, proof, formats):
+        for f in formats:
+            getattr(self, {"text": "pretty"}.get(f, f))(proof)
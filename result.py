@@ -0,0 +1,25 @@
+SAT = "sat"
+UNSAT = "unsat"
+UNKNOWN = "unknown"
+
+
+# Outcome of Solver.solve(). An unknown result comes with the LimitReached
+# that stopped the run, or with limit None when an incomplete search saturated.
+# `model` is a list of DIMACS style literals where the engine finds one.
+class Result:
+    def __init__(self, status, limit=None, model=None, stats=None):
+        self.status = status
+        self.limit = limit
+        self.model = model
+        self.stats = stats or dict()
+
+    def as_dict(self):
+        d = {"status": self.status, "stats": self.stats}
+        if self.limit is not None:
+            d["limit"] = self.limit.reason
+        if self.model is not None:
+            d["model"] = self.model
+        return d
+
+    def __repr__(self):
+        return "Result({})".format(", ".join("{}={!r}".format(k, v) for k, v in self.as_dict().items()))
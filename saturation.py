@@ -0,0 +1,249 @@
+import heapq
+from itertools import count
+
+import stats
+
+
+# do both clauses depend on a common premise
+def related(r1, r2):
+    return bool(r1.ancestors & r2.ancestors)
+
+
+# Given-clause loop (Otter/DISCOUNT style):
+# every clause waits in `unprocessed` until it is selected as the given clause,
+# is then resolved against the `processed` clauses only and moves over to them,
+# so each pair of clauses is tried exactly once.
+# With `tautologies` set, tautological clauses are dropped on arrival, as the
+# preprocessors do with the input: their resolvents are tautologies again or
+# subsumed by the other parent. The solvers set it with `preprocess`.
+# With `subsumption` set, new clauses subsumed by a kept clause are dropped
+# (forward) and kept clauses subsumed by a new one are retired (backward).
+# With `parallel` set, the resolvents of a given clause are generated on a
+# process pool (see parallel.ParallelProofs).
+# With `support` set to a bitset of premise ids (the set of support), a clause
+# takes part in an inference only if it or its partner descends from one of
+# them; the other clauses are never resolved or factored among themselves.
+# With `limits` set (see limits.Limits), every given clause and partner tried
+# counts against the budgets and run() raises LimitReached once one is used up.
+# The state survives run(): clauses can be added after a refutation or a
+# saturated run and run() picks up from there. checkpoint() starts logging
+# every change to `trail`; restore(mark) undoes them back to the mark, so the
+# clauses added after a checkpoint and everything derived from them go away
+# while the work done before it is kept. A mark can be restored any number of
+# times until release(mark); once no mark is held, the trail is dropped and
+# changes are no longer logged.
+class GivenClause:
+    def __init__(self, key, index=None, subsumption=None, parallel=None, skip_related=False, support=0, limits=None,
+                 tautologies=False):
+        self.key = key
+        self.index = index
+        self.subsumption = subsumption
+        self.parallel = parallel
+        self.skip_related = skip_related
+        self.support = support
+        self.limits = limits
+        self.tautologies = tautologies
+
+        self.kept = dict()
+        self.processed = dict()
+        self.unprocessed = []
+        self.seen = set()
+        self.age = count()
+        self.trail = None
+        self.marks = []
+        self.current = None
+
+        self.given = 0
+        self.generated = 0
+
+    def add(self, res):
+        st = stats.current
+        if self.tautologies and res.resolvent.tautology():
+            st.count("tautologies")
+            return False
+
+        k = self.key(res)
+        if k in self.seen:
+            st.count("duplicates")
+            return False
+
+        self.seen.add(k)
+        self.log("seen", k, None)
+
+        if self.subsumption is not None:
+            t = st.start()
+            if self.subsumption.forward(res):
+                st.stop("subsumption", t)
+                st.count("forward_subsumed")
+                return False
+            for n in self.subsumption.backward(res):
+                st.count("backward_subsumed")
+                self.retire(n)
+            st.stop("subsumption", t)
+
+        n = next(self.age)
+        self.kept[n] = res
+        if self.subsumption is not None:
+            self.subsumption.add(n, res)
+        self.log("kept", n, res)
+
+        heapq.heappush(self.unprocessed, (len(res.resolvent), n, res))
+        return True
+
+    def retire(self, n):
+        res = self.kept.pop(n)
+        self.subsumption.remove(n)
+        self.log("retired", n, res)
+
+        if n in self.processed:
+            self.unprocess(n)
+            self.log("unprocessed", n, res)
+
+    def process(self, n, res):
+        self.processed[n] = res
+        if self.index is not None:
+            self.index.add(n, res)
+
+    def unprocess(self, n):
+        res = self.processed.pop(n)
+        if self.index is not None:
+            self.index.remove(n, res)
+
+    def log(self, kind, n, res):
+        if self.trail is not None:
+            self.trail.append((kind, n, res))
+
+    def checkpoint(self):
+        if self.trail is None:
+            self.trail = []
+        self.marks.append(len(self.trail))
+        return self.marks[-1]
+
+    def release(self, mark):
+        if mark in self.marks:
+            self.marks.remove(mark)
+        if not self.marks:
+            self.trail = None
+
+    def restore(self, mark):
+        # marks taken after this one point past the end of the trail
+        self.marks = [m for m in self.marks if m <= mark]
+        while len(self.trail) > mark:
+            kind, n, res = self.trail.pop()
+            if kind == "seen":
+                self.seen.discard(n)
+            elif kind == "kept":
+                del self.kept[n]
+                if self.subsumption is not None:
+                    self.subsumption.remove(n)
+            elif kind == "retired":
+                self.kept[n] = res
+                self.subsumption.add(n, res)
+            elif kind == "processed":
+                self.unprocess(n)
+            elif kind == "unprocessed":
+                self.process(n, res)
+
+        self.current = None
+        self.unprocessed = [(len(res.resolvent), n, res) for n, res in self.kept.items() if n not in self.processed]
+        heapq.heapify(self.unprocessed)
+
+    def select(self):
+        while self.unprocessed:
+            _, n, res = heapq.heappop(self.unprocessed)
+            if n in self.kept:
+                return n, res
+
+        return None, None
+
+    # processed clauses that may resolve with `given`, oldest first
+    def partners(self, given):
+        if self.index is None:
+            return list(self.processed.items())
+
+        return [(n, self.processed[n]) for n in sorted(self.index.partners(given))]
+
+    def run(self):
+        st = stats.current
+
+        # a given clause left half done by an earlier run() (which stopped at
+        # a refutation or a limit) is tried again
+        if self.current is not None:
+            g, given = self.current
+            if g in self.kept and g not in self.processed:
+                heapq.heappush(self.unprocessed, (len(given.resolvent), g, given))
+            self.current = None
+
+        while True:
+            t = st.start()
+            g, given = self.select()
+            st.stop("select", t)
+            if given is None:
+                return
+            self.current = g, given
+
+            self.given += 1
+            if self.limits is not None:
+                self.limits.check(self.generated)
+
+            supported = not self.support or given.ancestors & self.support
+
+            t = st.start()
+            factors = given.factors() if supported else []
+            st.stop("factoring", t)
+            st.count("factors", len(factors))
+            for res in factors:
+                self.add(res)
+
+            t = st.start()
+            candidates = self.partners(given)
+            partners = [(n, other) for n, other in candidates
+                        if not (self.skip_related and related(given, other))]
+            st.stop("index", t)
+            st.count("pairs", len(candidates))
+            st.count("pairs_related", len(candidates) - len(partners))
+
+            if not supported:
+                before = len(partners)
+                partners = [(n, other) for n, other in partners if other.ancestors & self.support]
+                st.count("pairs_unsupported", before - len(partners))
+
+            results = None
+            if self.parallel is not None:
+                t = st.start()
+                results = self.parallel.proofs(given, [other for _, other in partners])
+                st.stop("parallel", t)
+
+            for i, (n, other) in enumerate(partners):
+                if self.limits is not None:
+                    self.limits.check(self.generated)
+                if n not in self.kept:
+                    st.count("pairs_retired")
+                    continue
+
+                if results:
+                    inferences = results[i][1]
+                else:
+                    t = st.start()
+                    inferences = given.proof(other)
+                    st.stop("inference", t)
+
+                for found, res in inferences:
+                    self.generated += 1
+                    st.count("generated")
+                    if found:
+                        yield res
+                        continue
+                    self.add(res)
+
+            if g in self.kept:
+                self.process(g, given)
+                self.log("processed", g, given)
+            self.current = None
+
+    def clauses(self):
+        return [*self.kept.values()]
+
+    def stats(self):
+        return {"given": self.given, "generated": self.generated, "kept": len(self.kept),
+                "processed": len(self.processed), "unprocessed": len(self.unprocessed)}
@@ -0,0 +1,108 @@
+import atexit
+import json
+import sys
+from collections import Counter
+from time import perf_counter_ns
+
+from limits import peak_rss, snapshot
+
+
+# Counters and per-phase timers of a run. The engines report to
+# `stats.current`, which is a NullStats doing nothing until enable() is
+# called, so a run without --stats pays one no-op call per event.
+# Phases are timed as  t = current.start() ... current.stop("phase", t).
+class Stats:
+    def __init__(self):
+        self.counters = Counter()
+        self.times = Counter()
+        self.calls = Counter()
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def start(self):
+        return perf_counter_ns()
+
+    def stop(self, name, t0):
+        self.times[name] += perf_counter_ns() - t0
+        self.calls[name] += 1
+
+    def report(self):
+        return {"counters": dict(sorted(self.counters.items())),
+                "timers": {k: {"seconds": self.times[k] / 1e9, "calls": self.calls[k]} for k in sorted(self.times)}}
+
+
+class NullStats:
+    def count(self, name, n=1):
+        pass
+
+    def start(self):
+        return 0
+
+    def stop(self, name, t0):
+        pass
+
+    def report(self):
+        return {"counters": {}, "timers": {}}
+
+
+current = NullStats()
+
+
+def enable():
+    global current
+    current = Stats()
+    return current
+
+
+# the snapshot of limits.snapshot followed by the counters and timers,
+# or all of it as one JSON object
+def write_report(limits, engine_stats, fmt="text", out=None):
+    out = out or sys.stderr
+
+    if fmt == "json":
+        report = {"elapsed": limits.elapsed(), "rss_mb": peak_rss(), "engine": engine_stats()}
+        report.update(current.report())
+        print(json.dumps(report), file=out, flush=True)
+        return
+
+    snapshot(limits, engine_stats, out)
+    report = current.report()
+    fields = ["{}={}".format(k, v) for k, v in report["counters"].items()]
+    if fields:
+        print("counters: " + " ".join(fields), file=out)
+    fields = ["{}={:.3f}s/{}".format(k, v["seconds"], v["calls"]) for k, v in report["timers"].items()]
+    if fields:
+        print("timers: " + " ".join(fields), file=out, flush=True)
+
+
+def report_at_exit(limits, engine_stats, fmt="text"):
+    atexit.register(write_report, limits, engine_stats, fmt)
+
+
+# runs the whole program under cProfile (FILE.prof, read with pstats or
+# snakeviz) or pyinstrument (FILE.html) and writes the profile on exit
+def profile(path):
+    if path.endswith(".html"):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            sys.exit("--profile {}: HTML profiles need pyinstrument".format(path))
+
+        profiler = Profiler()
+        profiler.start()
+
+        def write():
+            profiler.stop()
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def write():
+            profiler.disable()
+            profiler.dump_stats(path)
+
+    atexit.register(write)
@@ -1,5 +1,5 @@
 from abc import ABC
-from copy import deepcopy
+from weakref import WeakValueDictionary
 
 
 class Subst:
@@ -16,11 +16,8 @@ class Subst:
     def compose(self, other):
         for k, v in self.subs.items():
             self.subs[k] = v.apply(other)
-        otherrest = deepcopy(other)
-        otherrest.restrictTo(self.subs.keys())
-        
 
-        self.subs = self.subs | otherrest.subs
+        self.subs = self.subs | {k: v for k, v in other.subs.items() if k not in self.subs}
 
 
     def restrictTo(self, vs):
@@ -31,7 +28,7 @@ class Subst:
     def tex(self):
         return "\\{"+ ", ".join(k.tex() +"\\to "+ v.tex() for k,v in self.subs.items()) + " \\}"
 
-    
+
     def __hash__(self):
         return hash(tuple(self.subs.items()))
 
@@ -41,8 +38,122 @@ class Subst:
 
 
 
+# Terms and literals are immutable and hash-consed: constructing a term that
+# already exists returns the existing object, so equal terms are identical,
+# hashes and variable sets are computed once and apply() shares every
+# unchanged subterm instead of copying it.
+class Interned:
+    __slots__ = ("hash", "vars", "__weakref__")
+
+    table = WeakValueDictionary()
+
+    def __new__(cls, *key):
+        key = (cls,) + key
+        obj = Interned.table.get(key)
+
+        if obj is None:
+            obj = object.__new__(cls)
+            object.__setattr__(obj, "hash", hash((cls.__name__,) + key[1:]))
+            obj.build(*key[1:])
+            Interned.table[key] = obj
+
+        return obj
+
+    def build(self, *key):
+        pass
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __reduce__(self):
+        return (type(self), self.key())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return self.hash
+
+
+
+def childvars(childs):
+    return frozenset().union(*map(lambda t: t.vars, childs))
+
+
+
+# t with the variables in subs replaced, every shared subterm rewritten
+# once (unifiers can be exponentially larger than their DAGs); iterative,
+# as derived terms can nest deeper than the recursion limit
+def substitute(t, subs, memo):
+    stack = [t]
+    while stack:
+        u = stack[-1]
+        if u in memo or not u.vars:
+            stack.pop()
+            continue
+        if isinstance(u, Var):
+            memo[u] = subs.get(u, u)
+            stack.pop()
+            continue
+
+        pending = [c for c in u.childs if c.vars and c not in memo]
+        if pending:
+            stack.extend(pending)
+            continue
+
+        stack.pop()
+        childs = [memo[c] if c.vars else c for c in u.childs]
+        memo[u] = Relation(u.label, childs, u.neg) if isinstance(u, Relation) else Function(u.label, childs)
+
+    return memo.get(t, t)
+
+
+
+# printed form of t, plain or LaTeX, built bottom-up like substitute()
+def render(t, tex=False):
+    memo = dict()
+    stack = [t]
+    while stack:
+        u = stack[-1]
+        if u in memo:
+            stack.pop()
+            continue
+        if isinstance(u, Var):
+            memo[u] = "x_{" + u.label + "}" if tex else "x" + u.label
+            stack.pop()
+            continue
+        if isinstance(u, Const):
+            memo[u] = u.label
+            stack.pop()
+            continue
+
+        pending = [c for c in u.childs if c not in memo]
+        if pending:
+            stack.extend(pending)
+            continue
+
+        stack.pop()
+        r = u.label + "(" + ", ".join(memo[c] for c in u.childs) + ")"
+        if isinstance(u, Relation) and u.neg:
+            r = ("\\neg " if tex else "!") + r
+        memo[u] = r
+
+    return memo[t]
+
+
+
 class Term(ABC):
-  
+    __slots__ = ()
+
     def apply(self, subst: Subst):
         pass
 
@@ -57,117 +168,108 @@ class Term(ABC):
 
 
 
-class Relation:
-    def __init__(self, label, childs, neg=False):
-        self.label = label
-        self.childs = childs
-        self.neg = neg
+class Relation(Interned):
+    __slots__ = ("label", "childs", "neg")
 
-    
-    def apply(self, subst: Subst):
-        self.childs = [*map(lambda x: x.apply(subst), self.childs)]
-        return self
-    
+    def __new__(cls, label, childs, neg=False):
+        return super().__new__(cls, label, tuple(childs), neg)
 
-    def getvars(self):
-        return set.union(*map(lambda t: t.getvars(), self.childs))
+    def build(self, label, childs, neg):
+        object.__setattr__(self, "label", label)
+        object.__setattr__(self, "childs", childs)
+        object.__setattr__(self, "neg", neg)
+        object.__setattr__(self, "vars", childvars(childs))
 
+    def key(self):
+        return (self.label, self.childs, self.neg)
 
-    def isvar(self):
-        return False
 
+    def apply(self, subst: Subst):
+        return substitute(self, subst.subs, dict())
 
-    def __eq__(self, other):
-        if not isinstance(other, Relation):
-            return False
-        return self.label == other.label and self.childs == other.childs and self.neg == other.neg
 
+    def negate(self):
+        return Relation(self.label, self.childs, not self.neg)
 
-    def __hash__(self):
-        return hash((self.neg, self.label) + tuple(hash(c) for c in self.childs))
 
+    def getvars(self):
+        return self.vars
 
-    def __str__(self):
-        s = self.label + "(" + ", ".join(map(lambda x: str(x), self.childs)) + ")"
-        if self.neg:
-            return "!" + s
 
-        return s
+    def isvar(self):
+        return False
+
+
+    def __str__(self):
+        return render(self)
 
     def __repr__(self):
         return str(self)
 
 
     def tex(self):
-        s = self.label + "(" + ", ".join(map(lambda x: x.tex(), self.childs)) + ")"
-        if self.neg:
-            return "\\neg " + s
+        return render(self, tex=True)
+
 
-        return s
 
+class Function(Interned, Term):
+    __slots__ = ("label", "childs")
 
+    def __new__(cls, label, childs):
+        return super().__new__(cls, label, tuple(childs))
 
-class Function(Term):
-    def __init__(self, label, childs):
-        self.label = label
-        self.childs = childs
+    def build(self, label, childs):
+        object.__setattr__(self, "label", label)
+        object.__setattr__(self, "childs", childs)
+        object.__setattr__(self, "vars", childvars(childs))
+
+    def key(self):
+        return (self.label, self.childs)
 
     def apply(self, subst: Subst):
-        self.childs = [*map(lambda x: x.apply(subst), self.childs)]
-        return self
+        return substitute(self, subst.subs, dict())
 
 
     def getvars(self):
-        return set.union(*map(lambda t: t.getvars(), self.childs))
+        return self.vars
 
 
     def isvar(self):
         return False
 
-    def __eq__(self, other):
-        if not isinstance(other,Function):
-            return False
-        return self.label == other.label and self.childs == other.childs
-        
-    def __hash__(self):
-        return hash(tuple(self.label) + tuple(hash(c) for c in self.childs))
-
     def __repr__(self):
         return str(self)
 
     def __str__(self):
-        return  self.label + "(" + ", ".join(map(lambda x: str(x), self.childs)) + ")"
+        return render(self)
 
     def tex(self):
-        return  self.label + "(" + ", ".join(map(lambda x: x.tex(), self.childs)) + ")"
+        return render(self, tex=True)
+
+
 
 
+class Var(Interned, Term):
+    __slots__ = ("label",)
 
+    def __new__(cls, label):
+        return super().__new__(cls, label)
 
-class Var(Term):
-    def __init__(self, label):
-        self.label = label
+    def build(self, label):
+        object.__setattr__(self, "label", label)
+        object.__setattr__(self, "vars", frozenset((self,)))
+
+    def key(self):
+        return (self.label,)
 
-    #TBD------------------------------------------
     def apply(self, subst: Subst):
-        if self in subst.subs:
-            return subst.subs[self]
-        
-        return self
+        return subst.subs.get(self, self)
 
     def getvars(self):
-        return {self}
+        return self.vars
 
     def isvar(self):
-        return False
-
-    def __eq__(self, other):
-        if not isinstance(other, Var):
-            return False
-        return self.label == other.label
-
-    def __hash__(self):
-        return hash(self.label)
+        return True
 
     def __repr__(self):
         return str(self)
@@ -180,15 +282,24 @@ class Var(Term):
 
 
 
-class Const(Term):
-    def __init__(self, label):
-        self.label = label
-    
+class Const(Interned, Term):
+    __slots__ = ("label",)
+
+    def __new__(cls, label):
+        return super().__new__(cls, label)
+
+    def build(self, label):
+        object.__setattr__(self, "label", label)
+        object.__setattr__(self, "vars", frozenset())
+
+    def key(self):
+        return (self.label,)
+
     def apply(self, subst: Subst):
         return self
 
     def getvars(self):
-        return set()
+        return self.vars
 
     def isvar(self):
         return False
@@ -199,19 +310,61 @@ class Const(Term):
     def __str__(self):
         return self.label
 
-    def __hash__(self):
-        return hash(self.label)
-    
-    def __eq__(self, other):
-        if not isinstance(other,Const):
-            return False
-        return self.label == other.label
-
 
     def tex(self):
         return self.label
 
 
 
-
-
+# compact plain-tuple form of terms and literals, cheap to pickle:
+# Const -> label, Var -> ("v", label), Function -> ("f", label, *childs),
+# Relation -> (neg, label, *childs); both directions are iterative, like
+# substitute()
+def encode(t):
+    memo = dict()
+    stack = [t]
+    while stack:
+        u = stack[-1]
+        if u in memo:
+            stack.pop()
+            continue
+        if isinstance(u, Var):
+            memo[u] = ("v", u.label)
+            stack.pop()
+            continue
+        if isinstance(u, Const):
+            memo[u] = u.label
+            stack.pop()
+            continue
+
+        pending = [c for c in u.childs if c not in memo]
+        if pending:
+            stack.extend(pending)
+            continue
+
+        stack.pop()
+        childs = (memo[c] for c in u.childs)
+        memo[u] = (u.neg, u.label, *childs) if isinstance(u, Relation) else ("f", u.label, *childs)
+
+    return memo[t]
+
+
+def decode(e):
+    out = []
+    stack = [(e, False)]
+    while stack:
+        e, built = stack.pop()
+        if isinstance(e, str):
+            out.append(Const(e))
+        elif e[0] == "v":
+            out.append(Var(e[1]))
+        elif not built:
+            stack.append((e, True))
+            stack.extend((c, False) for c in reversed(e[2:]))
+        else:
+            n = len(out) - (len(e) - 2)
+            childs = out[n:]
+            del out[n:]
+            out.append(Function(e[1], childs) if e[0] == "f" else Relation(e[1], childs, e[0]))
+
+    return out[0]
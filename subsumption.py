@@ -0,0 +1,184 @@
+from collections import Counter
+
+from structure import Function
+from unification import Bindings, match
+
+
+# Feature vector index (Schulz): clauses are stored in a trie over a fixed
+# vector of features that can only grow under subsumption, so a clause C can
+# subsume D only if every feature of C is <= the same feature of D.
+class FeatureIndex:
+    def __init__(self):
+        self.root = dict()
+
+    def add(self, key, vec):
+        node = self.root
+        for f in vec:
+            node = node.setdefault(f, dict())
+        node[key] = True
+
+    def remove(self, key, vec):
+        path = [self.root]
+        for f in vec:
+            path.append(path[-1][f])
+
+        del path[-1][key]
+        for f, node, parent in zip(reversed(vec), reversed(path), reversed(path[:-1])):
+            if node:
+                break
+            del parent[f]
+
+    def search(self, vec, fits):
+        stack = [(self.root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if i == len(vec):
+                yield from node
+                continue
+            for f, child in node.items():
+                if fits(f, vec[i]):
+                    stack.append((child, i + 1))
+
+    # keys of stored clauses that may subsume a clause with features vec
+    def subsuming(self, vec):
+        return self.search(vec, lambda f, q: f <= q)
+
+    # keys of stored clauses that a clause with features vec may subsume
+    def subsumed(self, vec):
+        return self.search(vec, lambda f, q: f >= q)
+
+
+
+class Subsumption:
+    def __init__(self, features, subsumes):
+        self.features = features
+        self.subsumes = subsumes
+        self.index = FeatureIndex()
+        self.clauses = dict()
+
+    def add(self, key, res):
+        vec = self.features(res.resolvent)
+        self.index.add(key, vec)
+        self.clauses[key] = (res, vec)
+
+    def remove(self, key):
+        _, vec = self.clauses.pop(key)
+        self.index.remove(key, vec)
+
+    # is res subsumed by a stored clause
+    def forward(self, res):
+        vec = self.features(res.resolvent)
+        return any(self.subsumes(self.clauses[k][0].resolvent, res.resolvent) for k in self.index.subsuming(vec))
+
+    # keys of the stored clauses subsumed by res
+    def backward(self, res):
+        vec = self.features(res.resolvent)
+        return [k for k in self.index.subsumed(vec) if self.subsumes(res.resolvent, self.clauses[k][0].resolvent)]
+
+
+
+def symbols(t, counts):
+    stack = [t]
+    while stack:
+        t = stack.pop()
+        if isinstance(t, Function):
+            counts[t.label] += 1
+            stack.extend(t.childs)
+        elif not t.isvar():
+            counts[t.label] += 1
+
+
+# features of a FOL clause: its length, the number of literals per
+# polarity/predicate and the number of occurrences of each function symbol
+# and constant, over the (most frequent) symbols of the premises
+class FOLFeatures:
+    def __init__(self, clauses, limit=16):
+        preds = Counter()
+        funs = Counter()
+
+        for c in clauses:
+            for lit in c.relations:
+                preds[(lit.neg, lit.label)] += 1
+                for t in lit.childs:
+                    symbols(t, funs)
+
+        self.preds = [p for p, _ in preds.most_common(limit)]
+        self.funs = [f for f, _ in funs.most_common(limit)]
+
+    def __call__(self, clause):
+        preds = Counter()
+        funs = Counter()
+
+        for lit in clause.relations:
+            preds[(lit.neg, lit.label)] += 1
+            for t in lit.childs:
+                symbols(t, funs)
+
+        return (len(clause.relations), *(preds[p] for p in self.preds), *(funs[f] for f in self.funs))
+
+
+# multiset subsumption: a matching substitution that maps the literals of c
+# to pairwise different literals of d
+def fol_subsumes(c, d):
+    if len(c.relations) > len(d.relations):
+        return False
+
+    cl = sorted(c.relations, key=lambda l: len(l.vars))
+    dl = list(d.relations)
+    b = Bindings()
+
+    def search(i, used):
+        if i == len(cl):
+            return True
+
+        for j, lit in enumerate(dl):
+            if j in used:
+                continue
+            mark = b.mark()
+            if match(cl[i], lit, b) and search(i + 1, used | {j}):
+                return True
+            b.undo(mark)
+
+        return False
+
+    return search(0, frozenset())
+
+
+
+# features of a PL clause (bitmask form): its length, the number of
+# positive and negative literals, and both counts per variable bucket
+class PLFeatures:
+    def __init__(self, nvars, buckets=8):
+        self.masks = [sum(1 << v for v in range(k, nvars + 1, buckets)) for k in range(buckets)]
+
+    def __call__(self, clause):
+        pos, neg = clause.pos, clause.neg
+        vec = [pos.bit_count() + neg.bit_count(), pos.bit_count(), neg.bit_count()]
+        for m in self.masks:
+            vec.append((pos & m).bit_count())
+            vec.append((neg & m).bit_count())
+        return tuple(vec)
+
+
+def pl_subsumes(c, d):
+    return not (c.pos & ~d.pos or c.neg & ~d.neg)
+
+
+
+# the same features of a sparse PL clause (sorted literal array)
+class SparseFeatures:
+    def __init__(self, buckets=8):
+        self.buckets = buckets
+
+    def __call__(self, clause):
+        vec = [len(clause.literals), 0, 0] + [0] * (2 * self.buckets)
+        for l in clause.literals:
+            neg = l < 0
+            vec[1 + neg] += 1
+            vec[3 + 2 * (abs(l) % self.buckets) + neg] += 1
+        return tuple(vec)
+
+
+def sparse_subsumes(c, d):
+    other = d.literals
+    return all(l in other for l in c.literals)
@@ -0,0 +1,146 @@
+import sys
+
+import pytest
+
+from structure import Const, Var, Relation
+from proof import derivation
+from result import Result, SAT, UNSAT, UNKNOWN
+import fol_solver
+import pl_solver
+
+
+def satisfies(model, clauses):
+    true = set(model)
+    return all(any(l in true for l in c) for c in clauses)
+
+
+def test_fol_clauses_as_strings_and_literals():
+    solver = fol_solver.Solver()
+    solver.add_clause("S(1, 1), S(f(b), f(b))")
+    solver.add_clause([Relation("S", [Var("1"), Var("1")], True)])
+
+    result = solver.solve()
+    assert isinstance(result, Result)
+    assert result.status == UNSAT and result.limit is None
+    assert result.stats["given"] > 0
+
+    proof = solver.proof()
+    assert len(proof.resolvent) == 0
+    premises = {frozenset(map(str, n.resolvent.relations)) for n in derivation(proof) if not n.parents[0]}
+    assert premises == {frozenset(["S(x1, x1)", "S(f(b), f(b))"]), frozenset(["!S(x1, x1)"])}
+
+
+def test_fol_goals():
+    solver = fol_solver.Solver(sos=True)
+    solver.add_clause("P(a)")
+    solver.add_clause("!P(1), Q(1)")
+    solver.add_clause("!Q(a)", goal=True)
+    assert solver.solve().status == UNSAT
+
+    solver = fol_solver.Solver(sos=True)
+    solver.add_clause("P(a)")
+    solver.add_clause("?!Q(a)")
+    assert solver.goals == 0b10
+
+
+@pytest.mark.parametrize("clauses, status", [
+    ([], SAT),
+    (["P(a)", "!P(b)"], SAT),
+    (["P(1)", "!P(f(a))"], UNSAT),
+    # without equality reasoning a saturated set says nothing
+    ([[Relation("=", [Const("a"), Const("b")])], "!P(a)"], UNKNOWN),
+])
+def test_fol_results(clauses, status):
+    solver = fol_solver.Solver()
+    for c in clauses:
+        solver.add_clause(c)
+    result = solver.solve()
+    assert result.status == status
+    assert (solver.proof() is not None) == (status == UNSAT)
+
+
+@pytest.mark.parametrize("engine", ["resolution", "cdcl"])
+def test_pl_clauses_as_lists_and_clauses(engine):
+    solver = pl_solver.Solver(engine=engine)
+    solver.add_clause([1, 2])
+    solver.add_clause(pl_solver.Clause.of([-1, 2]))
+    solver.add_clause([-2, 3])
+
+    result = solver.solve()
+    assert result.status == SAT and result.limit is None
+    assert satisfies(result.model, [[1, 2], [-1, 2], [-2, 3]])
+    assert solver.proof() is None
+
+    solver.add_clause([-3])
+    result = solver.solve()
+    assert result.status == UNSAT and result.model is None
+    assert solver.proof().resolvent.lits() == []
+
+
+@pytest.mark.parametrize("engine", ["resolution", "cdcl"])
+@pytest.mark.parametrize("clauses, status", [
+    ([], SAT),
+    ([[]], UNSAT),
+    ([[1], [-1]], UNSAT),
+    ([[1, -1]], SAT),
+])
+def test_pl_edge_cases(engine, clauses, status):
+    solver = pl_solver.Solver(engine=engine)
+    for c in clauses:
+        solver.add_clause(c)
+    result = solver.solve()
+    assert result.status == status
+    if status == SAT:
+        assert satisfies(result.model, clauses)
+
+
+# the cache counters depend on what ran before
+def engine_stats(result):
+    return {k: v for k, v in result.stats.items() if not k.startswith("mgu_cache")}
+
+
+# solve() starts over on all clauses added so far, every time
+@pytest.mark.parametrize("make, clauses", [
+    (lambda: pl_solver.Solver(), [[1, 2], [-1, 2], [1, -2], [-1, -2]]),
+    (lambda: pl_solver.Solver(engine="cdcl"), [[1, 2], [-1, 2], [1, -2], [-1, -2]]),
+    (lambda: fol_solver.Solver(), ["P(1), Q(1)", "!P(a)", "!Q(a)"]),
+])
+def test_solve_again(make, clauses):
+    solver = make()
+    for c in clauses[:-1]:
+        solver.add_clause(c)
+    first = solver.solve()
+    assert first.status == SAT
+    again = solver.solve()
+    assert again.status == SAT and engine_stats(again) == engine_stats(first)
+
+    solver.add_clause(clauses[-1])
+    assert solver.solve().status == UNSAT
+    assert solver.solve().status == UNSAT
+
+
+def test_results_as_dicts():
+    solver = pl_solver.Solver()
+    solver.add_clause([1])
+    d = solver.solve().as_dict()
+    assert d["status"] == "sat" and d["model"] == [1]
+    assert "limit" not in d
+
+
+# the modules can be imported without running anything, and main() runs
+# the command line on sys.argv as often as it is called
+@pytest.mark.parametrize("module, path", [(fol_solver, "fol_example.txt"), (pl_solver, "example.txt")])
+def test_main(module, path, tmp_path, monkeypatch, capsys):
+    if module is pl_solver:
+        path = tmp_path / "example.txt"
+        path.write_text("1 2\n!1 2\n!2\n")
+
+    monkeypatch.setattr(sys, "argv", [module.__file__, str(path), "--proof", "text"])
+    outputs = []
+    for _ in range(2):
+        module.main()
+        outputs.append(capsys.readouterr().out)
+
+    assert outputs[0] == outputs[1]
+    last = outputs[0].splitlines()[-1]
+    assert "{}" in last
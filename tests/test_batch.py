@@ -0,0 +1,147 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import batch
+from dimacs import write_cnf
+from benchmarks.generators import nested_chain, pigeonhole, transitivity
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def problems(tmp_path):
+    (tmp_path / "pl").mkdir()
+    (tmp_path / "fol" / "deep").mkdir(parents=True)
+
+    with open(tmp_path / "pl" / "php3.cnf", "w") as f:
+        write_cnf(pigeonhole(3), f)
+    (tmp_path / "pl" / "sat.txt").write_text("1 2\n!1\n")
+    (tmp_path / "fol" / "chain.p").write_text(nested_chain(4))
+    (tmp_path / "fol" / "deep" / "tr5.p").write_text(transitivity(5))
+    (tmp_path / "fol" / "plain.txt").write_text("P(a)\n!P(1), Q(1)\n")
+    return tmp_path
+
+
+def ids(specs):
+    return [s["id"] for s in specs]
+
+
+def test_directories_and_globs(problems):
+    defaults = {"engine": "cdcl"}
+    specs = [*batch.problems([str(problems / "fol"), str(problems / "pl" / "*.cnf")], defaults)]
+
+    assert ids(specs) == [str(problems / p) for p in ("fol/chain.p", "fol/deep/tr5.p", "fol/plain.txt", "pl/php3.cnf")]
+    assert all(s["path"] == s["id"] and s["engine"] == "cdcl" for s in specs)
+
+    # a name that matches nothing is passed on, to fail as a problem of its own
+    missing = str(problems / "missing.cnf")
+    assert ids(batch.problems([missing], {})) == [missing]
+
+
+def test_manifests(problems):
+    manifest = problems / "fol" / "manifest.jsonl"
+    manifest.write_text('{"path": "chain.p", "sos": true}\n'
+                        '\n'
+                        '{"id": "inline", "logic": "pl", "clauses": [[1, 2], [-1], [-2]], "engine": "cdcl"}\n'
+                        '{"logic": "pl", "clauses": [[1]]}\n')
+
+    specs = [*batch.problems([str(manifest)], {"engine": "resolution", "sos": False})]
+    assert ids(specs) == [str(problems / "fol" / "chain.p"), "inline", "{}:4".format(manifest)]
+    assert specs[0]["path"] == str(problems / "fol" / "chain.p") and specs[0]["sos"] is True
+    assert [s["engine"] for s in specs] == ["resolution", "cdcl", "resolution"]
+
+    # manifests next to the problems are not problems themselves
+    assert str(manifest) not in ids(batch.problems([str(problems / "fol")], {}))
+
+
+@pytest.mark.parametrize("name, logic", [("pl/php3.cnf", "pl"), ("pl/sat.txt", "pl"),
+                                         ("fol/chain.p", "fol"), ("fol/plain.txt", "fol")])
+def test_detect(problems, name, logic):
+    assert batch.detect(str(problems / name)) == logic
+
+
+def solve(path, **spec):
+    spec.setdefault("id", str(path))
+    return batch.solve(dict(spec, path=str(path)))
+
+
+def test_results(problems):
+    out = solve(problems / "pl" / "php3.cnf", engine="cdcl")
+    assert out["logic"] == "pl" and out["status"] == "unsat"
+    assert out["proof_length"] > 0 and "proof" not in out and out["time"] >= 0
+
+    out = solve(problems / "pl" / "sat.txt", model=True)
+    assert out["status"] == "sat" and out["model"] == [-1, 2]
+    assert "model" not in solve(problems / "pl" / "sat.txt")
+
+    out = solve(problems / "fol" / "chain.p", proof=True)
+    assert out["logic"] == "fol" and out["status"] == "unsat"
+    assert len(out["proof"]) == out["proof_length"]
+
+    out = batch.solve({"id": "inline", "logic": "fol", "clauses": ["P(a)", "!P(1)"]})
+    assert out["status"] == "unsat"
+
+
+# a problem that fails is reported as such and does not stop the others
+@pytest.mark.parametrize("name, text, error", [
+    ("missing.cnf", None, "FileNotFoundError"),
+    ("broken.txt", "P(a\n", "ParseError"),
+    ("broken.cnf", "p cnf 2 1\n1 x 0\n", "DimacsError"),
+])
+def test_errors(problems, name, text, error):
+    if text is not None:
+        (problems / name).write_text(text)
+    out = solve(problems / name)
+    assert out["status"] == "error" and out["error"].startswith(error + ": ")
+    assert out["id"] == str(problems / name)
+
+
+@pytest.mark.parametrize("limit, reason", [({"max_clauses": 5}, "clause"), ({"time_limit": 0}, "time"),
+                                           ({"memory_limit": 1}, "memory")])
+def test_limits(problems, limit, reason):
+    out = solve(problems / "fol" / "deep" / "tr5.p", **limit)
+    assert out["status"] == "unknown" and out["limit"] == reason
+    assert "proof_length" not in out
+
+
+# the search checks the clock every few clauses and is done before it looks;
+# the proof steps check it before each step
+def test_proof_limit():
+    out = solve(os.path.join(ROOT, "fol_example.txt"), proof=True, time_limit=0)
+    assert out["status"] == "unsat" and out["proof_limit"] == "time"
+    assert out["proof_length"] > 0 and "proof" not in out
+
+
+# with the same hash seed the searches of both runs take the same steps
+def run(*args):
+    env = dict(os.environ, PYTHONHASHSEED="0")
+    run = subprocess.run([sys.executable, os.path.join(ROOT, "batch.py"), *args], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=120, check=True)
+    return [json.loads(l) for l in run.stdout.splitlines()], run.stderr
+
+
+# every problem comes back once, and with the same answer whether it ran
+# alone or after other problems in a worker of the reused pool
+@pytest.mark.parametrize("tasks", [[], ["--max-tasks-per-worker", "1"]])
+def test_pool(problems, tasks):
+    sources = [str(problems / "fol"), str(problems / "pl"), str(problems / "missing.cnf")]
+    alone, _ = run(*sources, "--jobs", "1", "--max-clauses", "2000")
+    pooled, summary = run(*sources, "--jobs", "2", "--max-clauses", "2000", *tasks)
+
+    # a worker's unifier cache lives on from the problems it solved before
+    def key(out):
+        out = {k: v for k, v in out.items() if k != "time"}
+        if "stats" in out:
+            out["stats"] = {k: v for k, v in out["stats"].items() if not k.startswith("mgu_cache")}
+        return out
+
+    # one worker answers in the order of the input, a pool as the problems finish
+    assert [o["id"] for o in alone] == ids(batch.problems(sources, {}))
+    assert len(pooled) == len(alone) == 6
+    assert sorted(map(json.dumps, map(key, pooled))) == sorted(map(json.dumps, map(key, alone)))
+    assert summary.startswith("6 problems in ") and "1 error" in summary
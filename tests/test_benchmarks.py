@@ -0,0 +1,60 @@
+import itertools
+
+import pytest
+
+from benchmarks import generators
+from benchmarks.run import FAMILIES, key, read_records, regressions, run_one, write_problem, write_records
+
+
+def satisfiable(clauses):
+    n = max(abs(l) for c in clauses for l in c)
+    for signs in itertools.product((1, -1), repeat=n):
+        true = {s * v for s, v in zip(signs, range(1, n + 1))}
+        if all(any(l in true for l in c) for c in clauses):
+            return True
+    return False
+
+
+@pytest.mark.parametrize("clauses", [generators.pigeonhole(3), generators.parity(4), generators.tseitin(5)])
+def test_unsatisfiable_families(clauses):
+    assert not satisfiable(clauses)
+
+
+def test_sizes():
+    # 4 pigeons need a hole each, and no two share one of the 3 holes
+    assert len(generators.pigeonhole(3)) == 4 + 3 * 6
+    clauses = generators.random_ksat(20, seed=1)
+    assert len(clauses) == round(20 * 4.26) and all(len(c) == 3 for c in clauses)
+    assert clauses == generators.random_ksat(20, seed=1) != generators.random_ksat(20, seed=2)
+
+
+@pytest.mark.parametrize("family, size, solver", [("pigeonhole", 3, "cdcl"), ("pigeonhole", 3, "pl"),
+                                                  ("nested", 5, "fol"), ("transitivity", 3, "fol")])
+def test_run_one(family, size, solver, tmp_path):
+    record = run_one(solver, write_problem(family, size, str(tmp_path)), 60)
+    assert record["status"] == FAMILIES[family][2]
+    assert record["wall"] > 0 and record["rss_mb"] > 0
+
+
+def record(status="UNSAT", wall=1.0, size=3):
+    return {"family": "pigeonhole", "size": size, "solver": "cdcl", "status": status, "wall": wall, "rss_mb": 10.0}
+
+
+def test_regressions():
+    baseline = [record(), record(size=4)]
+    assert regressions([record(wall=1.2), record(size=5, wall=9)], baseline) == []
+    # below the noise floor a slowdown does not count
+    assert regressions([record(wall=0.05)], [record(wall=0.01)]) == []
+
+    (r, b, why), = regressions([record(wall=2.0), record(size=4, wall=0.5)], baseline)
+    assert key(r) == key(b) and why == "wall 1.00s -> 2.00s"
+    (_, _, why), = regressions([record(status="UNKNOWN", wall=0.5)], baseline)
+    assert why == "status UNSAT -> UNKNOWN"
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".json"])
+def test_records_roundtrip(suffix, tmp_path):
+    records = [record(), dict(record(size=4), given=12, generated=40)]
+    path = str(tmp_path / ("base" + suffix))
+    write_records(records, path)
+    assert read_records(path) == records
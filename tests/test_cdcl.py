@@ -0,0 +1,127 @@
+import itertools
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from cdcl import CDCL, luby
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# n+1 pigeons in n holes
+def pigeonhole(n):
+    p = lambda i, j: i * n + j + 1
+    clauses = [[p(i, j) for j in range(n)] for i in range(n + 1)]
+    for j in range(n):
+        for i, k in itertools.combinations(range(n + 1), 2):
+            clauses.append([-p(i, j), -p(k, j)])
+    return clauses
+
+
+def random_3sat(n, m, seed):
+    rng = random.Random(seed)
+    return [[v if rng.random() < 0.5 else -v for v in rng.sample(range(1, n + 1), 3)] for _ in range(m)]
+
+
+def satisfies(model, clauses):
+    true = set(model)
+    return all(any(l in true for l in c) for c in clauses)
+
+
+def brute_force(clauses):
+    nvars = max((abs(l) for c in clauses for l in c), default=0)
+    for signs in itertools.product((1, -1), repeat=nvars):
+        if satisfies([s * v for s, v in zip(signs, range(1, nvars + 1))], clauses):
+            return True
+    return False
+
+
+def test_luby():
+    assert [luby(i) for i in range(15)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+@pytest.mark.parametrize("clauses, sat", [
+    ([], True),
+    ([[]], False),
+    ([[1], [-1]], False),
+    ([[1, 2], [-1, 2], [1, -2]], True),
+    ([[1, 2], [-1, 2], [1, -2], [-1, -2]], False),
+    (pigeonhole(3), False),
+    (pigeonhole(4), False),
+    (random_3sat(20, 60, 1), True),
+])
+def test_known_instances(clauses, sat):
+    solver = CDCL(clauses, restart_base=4)
+    assert solver.solve() == sat
+    if sat:
+        assert satisfies(solver.model(), clauses)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_against_brute_force(seed):
+    clauses = random_3sat(10, 43, seed)
+    solver = CDCL(clauses, restart_base=2)
+    sat = solver.solve()
+
+    assert sat == brute_force(clauses)
+    if sat:
+        assert satisfies(solver.model(), clauses)
+
+
+# a small clause database forces reduce_db to delete learned clauses
+def test_reduce_db_keeps_answers():
+    solver = CDCL(pigeonhole(5), restart_base=8)
+    solver.max_learnts = 10
+
+    assert solver.solve() is False
+    assert any(c is None for c in solver.clauses)
+
+
+def run(clauses, tmp_path):
+    path = tmp_path / "clauses.txt"
+    path.write_text("".join(" ".join(str(l) if l > 0 else "!" + str(-l) for l in c) + "\n" for c in clauses))
+    run = subprocess.run([sys.executable, os.path.join(ROOT, "pl_solver.py"), str(path), "--engine", "cdcl"],
+                         capture_output=True, text=True, timeout=60, check=True)
+    return run.stdout.splitlines()
+
+
+def literals(text):
+    if text == "{}":
+        return frozenset()
+    return frozenset(-int(l[2:]) if l[0] == "!" else int(l[1:]) for l in text.split(", "))
+
+
+# every step of the printed refutation is a premise or a resolvent of its
+# parents on the pivot, which is positive in one and negative in the other
+@pytest.mark.parametrize("clauses", [pigeonhole(3), [[1, 2], [-1, 2], [1, -2], [-1, -2]], [[1, 3], [1], [-1, 2], [-2]]])
+def test_printed_proof_is_a_refutation(clauses, tmp_path):
+    premises = {frozenset(c) for c in clauses}
+    steps = dict()
+
+    for line in run(clauses, tmp_path):
+        if not line[:1].isdigit() or "\t" not in line:
+            continue
+        num, clause, *_, rule = line.split("\t")
+        lits = steps[int(num[:-1])] = literals(clause)
+        if rule == "premise":
+            assert lits in premises
+            continue
+
+        _, _, pivot, _, a, _, b = rule.split(" ")
+        a, b, v = steps[int(a)], steps[int(b)], int(pivot[1:])
+        assert (v in a and -v in b) or (-v in a and v in b)
+        l = v if v in a else -v
+        assert lits == (a - {l}) | (b - {-l})
+
+    assert steps[max(steps)] == frozenset()
+
+
+def test_printed_model(tmp_path):
+    clauses = random_3sat(20, 60, 1)
+    out = run(clauses, tmp_path)
+    assert out[0] == "SAT"
+    assert satisfies(literals(out[1]), clauses)
@@ -0,0 +1,137 @@
+import gzip
+import io
+import itertools
+import os
+import subprocess
+import sys
+
+import pytest
+
+from dimacs import DimacsError, open_input, read_cnf, write_cnf, write_result
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CNF = """c example
+p cnf 3 2
+1 -3 0
+2 3
+-1 0
+"""
+
+
+def pigeonhole(n):
+    p = lambda i, j: i * n + j + 1
+    clauses = [[p(i, j) for j in range(n)] for i in range(n + 1)]
+    for j in range(n):
+        for i, k in itertools.combinations(range(n + 1), 2):
+            clauses.append([-p(i, j), -p(k, j)])
+    return clauses
+
+
+def cnf(clauses):
+    n = max(abs(l) for c in clauses for l in c)
+    return "p cnf {} {}\n".format(n, len(clauses)) + "".join(" ".join(map(str, [*c, 0])) + "\n" for c in clauses)
+
+
+def cli(path, *args):
+    run = subprocess.run([sys.executable, os.path.join(ROOT, "pl_solver.py"), str(path), *args],
+                         capture_output=True, text=True, timeout=60, check=True)
+    return run.stdout.splitlines()
+
+
+def test_read_cnf():
+    assert [*read_cnf(CNF.splitlines())] == [[1, -3], [2, 3, -1]]
+
+
+def test_read_gzip(tmp_path):
+    path = tmp_path / "example.cnf.gz"
+    with gzip.open(path, "wt") as f:
+        f.write(CNF)
+
+    with open_input(str(path)) as f:
+        assert [*read_cnf(f)] == [[1, -3], [2, 3, -1]]
+    assert cli(path, "--output", "dimacs", "--engine", "cdcl")[0] == "s SATISFIABLE"
+
+
+def test_write_read_roundtrip():
+    out = io.StringIO()
+    write_cnf(pigeonhole(2), out, ["pigeonhole 2"])
+    assert [*read_cnf(out.getvalue().splitlines())] == pigeonhole(2)
+
+
+@pytest.mark.parametrize("text, line", [
+    ("1 2 0\n", 1),
+    ("p cnf 2\n1 2 0\n", 1),
+    ("p dnf 2 1\n1 2 0\n", 1),
+    ("p cnf two 1\n1 2 0\n", 1),
+    ("p cnf 2 1\np cnf 2 1\n", 2),
+    ("p cnf 2 1\n1 x 0\n", 2),
+    ("p cnf 2 1\n1 3 0\n", 2),
+    ("p cnf 2 1\n1 0\n2 0\n", 3),
+    ("p cnf 2 2\n1 0\n", 2),
+    ("p cnf 2 1\n1 2\n", 2),
+    ("c only a comment\n", 1),
+])
+def test_malformed(text, line):
+    with pytest.raises(DimacsError) as e:
+        [*read_cnf(text.splitlines())]
+    assert e.value.line == line
+
+
+def test_result_lines():
+    out = io.StringIO()
+    write_result(True, [*range(1, 21)], out)
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "s SATISFIABLE"
+    assert all(l.startswith("v ") for l in lines[1:])
+    assert " ".join(l[2:] for l in lines[1:]).split() == [*map(str, range(1, 21)), "0"]
+
+    for sat, status in ((False, "UNSATISFIABLE"), (None, "UNKNOWN")):
+        out = io.StringIO()
+        write_result(sat, out=out)
+        assert out.getvalue() == "s {}\n".format(status)
+
+
+def propagate(clauses, assigned):
+    while True:
+        for c in clauses:
+            free = [l for l in c if -l not in assigned]
+            if not free:
+                return True
+            if len(free) == 1 and free[0] not in assigned:
+                assigned.add(free[0])
+                break
+        else:
+            return False
+
+
+# every lemma has the RUP property (unit propagation on its negation
+# reaches a conflict) and the proof ends with the empty clause
+def rup_check(clauses, drat):
+    db = [list(c) for c in clauses]
+    lemmas = []
+    for line in drat.splitlines():
+        fields = line.split()
+        if fields[0] == "d":
+            db.remove(sorted(map(int, fields[1:-1])))
+            continue
+
+        lemma = [*map(int, fields[:-1])]
+        assert propagate(db, {-l for l in lemma}), "lemma {} is not RUP".format(lemma)
+        db.append(sorted(lemma))
+        lemmas.append(lemma)
+
+    return lemmas[-1] == []
+
+
+@pytest.mark.parametrize("engine", ["resolution", "cdcl"])
+@pytest.mark.parametrize("preprocess", [[], ["--preprocess"]])
+@pytest.mark.parametrize("clauses", [pigeonhole(3), [[a, b, c] for a, b, c in itertools.product(*([1, -1], [2, -2], [3, -3]))]])
+def test_drat_is_rup(engine, preprocess, clauses, tmp_path):
+    path = tmp_path / "problem.cnf"
+    path.write_text(cnf(clauses))
+    drat = tmp_path / "proof.drat"
+
+    assert cli(path, "--engine", engine, *preprocess, "--output", "dimacs", "--drat", str(drat))[0] == "s UNSATISFIABLE"
+    assert rup_check([sorted(c) for c in clauses], drat.read_text())
@@ -0,0 +1,194 @@
+import os
+import random
+import re
+import subprocess
+import sys
+
+import pytest
+
+from structure import Const, Var, Function, Relation
+from parser import parse_line
+import stats
+from fol_solver import Solver, Clause, read_input, resolve, standardize
+from benchmarks.generators import deep_unification
+from result import SAT, UNSAT, UNKNOWN
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_variables_with_any_labels():
+    s = Solver()
+    s.add_clause([Relation("P", [Var("x")])])
+    assert s.solve().status == SAT
+
+    s.add_clause([Relation("P", [Function("f", [Var("y"), Var("x")])], True), Relation("Q", [Var("y")])])
+    s.add_clause([Relation("Q", [Const("a")], True)])
+    assert s.solve().status == UNSAT
+    assert len(s.proof().resolvent) == 0
+
+
+def test_plain_clauses():
+    s = Solver()
+    s.add_clause("S(1, 1), S(f(b), f(b))")
+    s.add_clause("!S(1, 1)")
+    assert s.solve().status == UNSAT
+
+
+# only the variables both clauses use are renamed, past the labels of both
+def test_standardize():
+    c1 = Clause(parse_line("P(1, 2), Q(3)"))
+    assert standardize(c1, Clause(parse_line("!P(3, 4)"))) == {Var("3"): Var("7")}
+    assert standardize(c1, Clause(parse_line("!P(4, 5)"))) == dict()
+    assert standardize(Clause(parse_line("P(2)")), Clause(parse_line("!P(2), Q(5)"))) == {Var("2"): Var("6")}
+
+
+# the variables of the parents stay apart in the resolvent: x1 of both
+# parents ends up as two variables unless the unifier binds them together
+@pytest.mark.parametrize("c1, c2, shape, nvars", [
+    ("P(1), Q(1)", "!P(f(1)), R(1)", ["Q(f(x))", "R(x)"], 1),
+    ("P(1, 2), Q(1, 2)", "!P(2, 1), R(1, 3)", ["Q(x, x)", "R(x, x)"], 3),
+    ("P(1), Q(1, 2)", "!P(a), R(1, 2)", ["Q(a, x)", "R(x, x)"], 3),
+])
+def test_resolvents_keep_the_parents_apart(c1, c2, shape, nvars):
+    (swapped, k, r1, r2), = resolve(Clause(parse_line(c1)), Clause(parse_line(c2)))
+    assert not swapped
+    assert len(k.getvars()) == nvars
+    assert sorted(re.sub(r"x\d+", "x", str(l)) for l in k.relations) == shape
+
+
+@pytest.mark.parametrize("n", [2, 5, 10])
+def test_deep_unification(n, tmp_path):
+    path = tmp_path / "deep.p"
+    path.write_text(deep_unification(n))
+    s = Solver()
+    for lits, goal in read_input(str(path)):
+        s.add_clause(lits, goal)
+    assert s.solve().status == UNSAT
+
+
+def renamed(line, seed):
+    rng = random.Random(seed)
+    labels = [*range(1, 10)]
+    rng.shuffle(labels)
+    return re.sub(r"\d+", lambda m: str(labels[int(m.group()) - 1] + 10), line)
+
+
+@pytest.mark.parametrize("line", [
+    "P(1), P(2), Q(1)",
+    "P(1, 2), P(2, 1), Q(1)",
+    "R(1, 2), R(2, 3), R(3, 1)",
+    "R(1, 2), R(2, 3), R(3, 4), !R(1, 4)",
+    "!P(1), P(f(1, 2)), Q(2, 2), Q(3, a)",
+    "P(1), P(2), P(3), !Q(2, 3)",
+])
+@pytest.mark.parametrize("seed", range(10))
+def test_canonical_variants(line, seed):
+    c = Clause(parse_line(line))
+    d = Clause(parse_line(renamed(line, seed)))
+    assert c.canonical() == d.canonical()
+    assert c == d and hash(c) == hash(d)
+
+
+def test_canonical_tells_non_variants_apart():
+    assert Clause(parse_line("P(1), Q(1)")) != Clause(parse_line("P(1), Q(2)"))
+    assert Clause(parse_line("R(1, 2), R(2, 1)")) != Clause(parse_line("R(1, 2), R(2, 3)"))
+
+
+# the key does not depend on the hash seed of the process
+def test_canonical_across_hash_seeds():
+    code = "import fol_solver, parser; print(fol_solver.Clause(parser.parse_line({!r})).canonical())"
+    keys = set()
+    for seed in range(4):
+        run = subprocess.run([sys.executable, "-c", code.format("R(1, 2), R(3, 2), R(3, 4), Q(1), Q(4)")],
+                             cwd=ROOT, env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+                             capture_output=True, text=True, check=True)
+        keys.add(run.stdout)
+    assert len(keys) == 1
+
+
+def cli(text, tmp_path, *args):
+    path = tmp_path / "clauses.txt"
+    path.write_text(text)
+    run = subprocess.run([sys.executable, os.path.join(ROOT, "fol_solver.py"), str(path), *args],
+                         capture_output=True, text=True, timeout=60, check=True)
+    return run.stdout.splitlines()
+
+
+def refuted(out):
+    return any(l.split("\t")[1:2] == ["{}"] for l in out if l[:1].isdigit())
+
+
+# binary resolution alone only derives two-literal clauses from these
+@pytest.mark.parametrize("text", [
+    "P(1), P(2)\n!P(3), !P(4)\n",
+    "P(1), P(f(2))\n!P(f(3)), !P(3)\n",
+    "S(1, a), S(b, 2)\n!S(1, 2), !S(2, 1)\n",
+])
+def test_refutations_that_need_factoring(text, tmp_path):
+    out = cli(text, tmp_path)
+    assert refuted(out)
+    assert any("(Fac)" in l for l in out)
+
+
+# the literals of a kind in these clauses do not unify: no factors, and the
+# saturated set is the input
+@pytest.mark.parametrize("text", [
+    "P(a), P(b)\n",
+    "Q(1), Q(f(1))\n",
+    "P(1), !P(1)\n",
+    "R(1, a), R(b, 1), S(1), T(1)\n",
+])
+def test_no_factors_of_literals_that_do_not_unify(text, tmp_path):
+    out = cli(text, tmp_path)
+    saturated = [l for l in out if l.startswith("res:")]
+    assert len(saturated) == text.count("\n")
+    assert not any("(Fac)" in l or "P2: None" in l for l in out)
+
+
+def test_factors_of_unifiable_literals(tmp_path):
+    out = cli("P(1), P(a), Q(b)\n", tmp_path)
+    saturated = [l.strip()[4:] for l in out if l.startswith("res:")]
+    assert len(saturated) == 1 and set(saturated[0].split(", ")) == {"P(a)", "Q(b)"}
+
+
+# --skip-related never resolves clauses derived from a common premise: the
+# first refutation resolves Q(a) with the premise !Q(a), the second would need
+# Sol(x1, x1) with the premise !Sol(x1, x1) it was derived from
+@pytest.mark.parametrize("text, found", [
+    ("P(a)\n!P(1), Q(1)\n!Q(a)\n", True),
+    ("Sol(1, 1), Sol(f(a), f(a))\n!Sol(1, 1)\n", False),
+])
+def test_skip_related(text, found, tmp_path):
+    assert refuted(cli(text, tmp_path))
+    assert refuted(cli(text, tmp_path, "--skip-related")) == found
+
+
+def solve_counted(text, **options):
+    st = stats.enable()
+    try:
+        s = Solver(**options)
+        for line in text.splitlines():
+            s.add_clause(line)
+        return s, s.solve(), st.counters
+    finally:
+        stats.current = stats.NullStats()
+
+
+def test_pairs_related_are_counted():
+    text = "Sol(1, 1), Sol(f(a), f(a))\n!Sol(1, 1)\n"
+    _, result, counters = solve_counted(text)
+    assert result.status == UNSAT and counters["pairs_related"] == 0
+
+    _, result, counters = solve_counted(text, skip_related=True)
+    assert counters["pairs_related"] > 0
+    # the saturated set shows nothing
+    assert result.status == UNKNOWN
+
+
+# premise i has bit i of the ancestor bitsets only where they are looked at
+@pytest.mark.parametrize("options, tracked", [({}, False), (dict(skip_related=True), True), (dict(sos=True), True)])
+def test_ancestors_only_when_used(options, tracked):
+    s, _, _ = solve_counted("P(a)\n!P(1), Q(1)\n?!R(a)\n", **options)
+    assert s.ancestors(2) == (4 if tracked else 0)
+    assert any(res.ancestors for res in s.saturated()) == tracked
@@ -0,0 +1,129 @@
+import pytest
+
+from cdcl import CDCL
+from benchmarks.generators import pigeonhole, random_ksat
+import fol_solver
+import pl_solver
+
+
+def test_cdcl_restore_reuses_clause_ids():
+    solver = CDCL(random_ksat(30, ratio=3.5, seed=3), restart_base=4)
+    solver.solve()
+    n = len(solver.clauses)
+
+    for i in range(20):
+        mark = solver.checkpoint()
+        for c in random_ksat(30, ratio=1.0, seed=100 + i):
+            solver.add_clause(c)
+        solver.add_clause([1, -1])
+        solver.solve()
+        solver.restore(mark)
+
+        assert len(solver.clauses) <= n + len(solver.derivation)
+        assert all(cid < len(solver.clauses) for ws in solver.watches.values() for cid in ws)
+        assert solver.solve() is True
+
+
+def test_cdcl_restore_keeps_proofs():
+    clauses = pigeonhole(3)
+    solver = pl_solver.Solver(engine="cdcl")
+    for c in clauses[1:]:
+        solver.add_clause(c)
+    solver.saturate()
+
+    mark = solver.checkpoint()
+    solver.add_clause([100, 101])
+    solver.add_clause([-100])
+    solver.add_clause([-101])
+    assert solver.solve().status == pl_solver.UNSAT
+    solver.restore(mark)
+
+    solver.add_clause(clauses[0])
+    assert solver.solve().status == pl_solver.UNSAT
+    assert not solver.proof().resolvent.lits()
+
+
+@pytest.mark.parametrize("make", [
+    lambda: fol_solver.Solver(),
+    lambda: pl_solver.Solver(),
+])
+def test_trail_is_dropped_with_the_last_mark(make):
+    solver = make()
+    solver.add_clause("P(1), Q(1)" if isinstance(solver, fol_solver.Solver) else [1, 2])
+    solver.saturate()
+    engine = solver.engine if isinstance(solver, fol_solver.Solver) else solver.saturation
+
+    outer = solver.checkpoint()
+    inner = solver.checkpoint()
+    solver.restore(inner)
+    solver.release(inner)
+    assert engine.trail is not None
+
+    solver.restore(outer)
+    solver.restore(outer)
+    solver.release(outer)
+    assert engine.trail is None
+
+    solver.solve(assumptions=["!P(a)"] if isinstance(solver, fol_solver.Solver) else [-1])
+    assert engine.trail is None
+
+
+def fresh_status(make, clauses):
+    solver = make()
+    for c in clauses:
+        solver.add_clause(c)
+    return solver.solve().status
+
+
+PL_ENGINES = [lambda: pl_solver.Solver(), lambda: pl_solver.Solver(engine="cdcl")]
+
+@pytest.mark.parametrize("make", PL_ENGINES)
+@pytest.mark.parametrize("seed", range(8))
+def test_pl_same_answers_as_a_fresh_solver(make, seed):
+    background = random_ksat(8, ratio=2.5, seed=seed)
+    solver = make()
+    for c in background:
+        solver.add_clause(c)
+    assert solver.saturate().status == fresh_status(make, background)
+
+    mark = solver.checkpoint()
+    for i in range(4):
+        query = random_ksat(8, ratio=0.5 + i, seed=1000 * seed + i)
+        for c in query:
+            solver.add_clause(c)
+        result = solver.solve()
+        assert result.status == fresh_status(make, background + query)
+        if result.status == pl_solver.SAT:
+            assert all(any(l in result.model for l in c) for c in background + query)
+
+        solver.restore(mark)
+        assert solver.solve().status == fresh_status(make, background)
+
+        assumption = [(-1) ** i * (i + 1)]
+        assert solver.solve(assumptions=assumption).status == fresh_status(make, background + [assumption])
+    solver.release(mark)
+
+
+# a background that saturates
+FOL_BACKGROUND = ["!P(1), Q(f(1))", "!Q(1), R(1, a)", "P(a)", "P(b), S(b)"]
+FOL_QUERIES = [["!R(f(a), 1)"], ["!R(a, a)"], ["P(c)", "!R(f(c), a)"], ["!S(1)", "!Q(f(b))"], ["!P(1), !S(1)"]]
+
+@pytest.mark.parametrize("sos", [False, True])
+def test_fol_same_answers_as_a_fresh_solver(sos):
+    make = lambda: fol_solver.Solver(sos=sos)
+    solver = make()
+    for c in FOL_BACKGROUND:
+        solver.add_clause(c)
+    solver.saturate()
+
+    mark = solver.checkpoint()
+    for query in FOL_QUERIES:
+        for c in query:
+            solver.add_clause(c, goal=True)
+        assert solver.solve().status == fresh_status(make, FOL_BACKGROUND + ["?" + c for c in query])
+        solver.restore(mark)
+        assert solver.solve().status == fresh_status(make, FOL_BACKGROUND)
+
+    assert solver.solve(assumptions=["!Q(f(a))"]).status == fol_solver.UNSAT
+    assert solver.solve().status == fresh_status(make, FOL_BACKGROUND)
+    solver.release(mark)
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from structure import Const, Var, Function, Relation
+from unification import unify
+from index import DiscriminationTree, flatten, skips
+
+
+def term(rng, depth, vs):
+    r = rng.random()
+    if depth == 0 or r < 0.3:
+        return rng.choice(vs) if rng.random() < 0.5 else Const(rng.choice("ab"))
+    if r < 0.65:
+        return Function("f", [term(rng, depth - 1, vs)])
+    return Function("g", [term(rng, depth - 1, vs), term(rng, depth - 1, vs)])
+
+
+def literal(rng, vs):
+    label = rng.choice("PQ")
+    return Relation(label, [term(rng, 3, vs) for _ in range(2 if label == "P" else 1)], rng.random() < 0.5)
+
+
+# the stored literals and the queries have no variables in common
+def literals(seed, n):
+    rng = random.Random(seed)
+    stored = [literal(rng, [Var(str(i)) for i in range(1, 4)]) for _ in range(n)]
+    queries = [literal(rng, [Var(str(i)) for i in range(4, 7)]) for _ in range(n)]
+    return stored, queries
+
+
+def unifiable(s, t):
+    return s.neg == t.neg and unify([s, t]) is not None
+
+
+def tree(lits):
+    t = DiscriminationTree()
+    for i, l in enumerate(lits):
+        t.insert(l, i)
+    return t
+
+
+def test_keys():
+    x = Var("1")
+    lit = Relation("P", [Function("g", [x, Const("a")]), Function("f", [x])], True)
+    keys = flatten(lit)
+    assert keys == [(True, "P", 2), ("g", 2), None, ("a", 0), ("f", 1), None]
+    assert skips(keys) == [6, 4, 3, 4, 6, 6]
+
+
+# retrieval may return more than unifies (it ignores repeated variables),
+# never less
+@pytest.mark.parametrize("seed", range(5))
+def test_unifiable_against_brute_force(seed):
+    stored, queries = literals(seed, 60)
+    t = tree(stored)
+
+    extra = 0
+    for q in queries:
+        found = {i for _, i in t.unifiable(q)}
+        expected = {i for i, l in enumerate(stored) if unifiable(l, q)}
+        assert expected <= found, q
+        assert all(stored[i].label == q.label and stored[i].neg == q.neg for i in found)
+        extra += len(found - expected)
+
+    assert extra < sum(1 for q in queries for l in stored if l.label == q.label and l.neg == q.neg)
+
+
+# without repeated variables the filter is exact
+@pytest.mark.parametrize("seed", range(5))
+def test_linear_literals_are_exact(seed):
+    fresh = iter(range(1, 10 ** 6))
+
+    def linear(t):
+        if isinstance(t, Var):
+            return Var(str(next(fresh)))
+        if isinstance(t, Function):
+            return Function(t.label, [linear(c) for c in t.childs])
+        return t
+
+    stored, queries = literals(seed, 60)
+    stored = [Relation(l.label, [linear(c) for c in l.childs], l.neg) for l in stored]
+    queries = [Relation(l.label, [linear(c) for c in l.childs], l.neg) for l in queries]
+    t = tree(stored)
+
+    for q in queries:
+        assert {i for _, i in t.unifiable(q)} == {i for i, l in enumerate(stored) if unifiable(l, q)}, q
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_remove(seed):
+    stored, queries = literals(seed, 60)
+    t = tree(stored)
+    empty = DiscriminationTree()
+
+    rng = random.Random(seed)
+    gone = set(rng.sample(range(len(stored)), 40))
+    for i in gone:
+        assert t.remove(stored[i], i)
+        assert not t.remove(stored[i], i)
+    assert t.size == len(stored) - len(gone)
+
+    for q in queries:
+        found = {i for _, i in t.unifiable(q)}
+        assert not found & gone
+        assert found == {i for _, i in tree(stored).unifiable(q)} - gone
+
+    # removing everything prunes the tree back to its root
+    for i in set(range(len(stored))) - gone:
+        assert t.remove(stored[i], i)
+    assert t.size == 0 and t.root.children == empty.root.children
+
+
+def test_remove_keeps_other_values():
+    lit = Relation("P", [Var("1")])
+    t = DiscriminationTree()
+    t.insert(lit, 1)
+    t.insert(lit, 2)
+    assert not t.remove(lit, 3) and not t.remove(Relation("P", [Const("a")]), 1)
+
+    assert t.remove(lit, 1)
+    assert [*t.unifiable(Relation("P", [Const("a")]))] == [(lit, 2)]
@@ -0,0 +1,162 @@
+import itertools
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from limits import Limits, LimitReached, snapshot, snapshot_on_signal
+import fol_solver
+import pl_solver
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def pigeonhole(n):
+    p = lambda i, j: i * n + j + 1
+    clauses = [[p(i, j) for j in range(n)] for i in range(n + 1)]
+    for j in range(n):
+        for i, k in itertools.combinations(range(n + 1), 2):
+            clauses.append([-p(i, j), -p(k, j)])
+    return "".join(" ".join(str(l) if l > 0 else "!" + str(-l) for l in c) + "\n" for c in clauses)
+
+
+def transitivity(n):
+    lines = ["Less(c{}, c{})".format("i" * i, "i" * (i + 1)) for i in range(n)]
+    lines += ["!Less(1, 2), !Less(2, 3), Less(1, 3)", "!Less(c, c{})".format("i" * n)]
+    return "\n".join(lines) + "\n"
+
+
+def reason(limits, clauses=0, calls=1):
+    with pytest.raises(LimitReached) as e:
+        for _ in range(calls):
+            limits.check(clauses)
+    return e.value.reason
+
+
+def test_clause_limit():
+    limits = Limits(max_clauses=10)
+    limits.check(9)
+    assert reason(limits, 10) == "clause"
+
+
+def test_time_and_memory_every_n_calls():
+    limits = Limits(time_limit=0, every=4)
+    time.sleep(0.01)
+    for _ in range(3):
+        limits.check(0)
+    assert reason(limits) == "time"
+
+    assert reason(Limits(memory_limit=1, every=1)) == "memory"
+    with pytest.raises(LimitReached):
+        Limits(memory_limit=1).check_resources()
+
+    limits = Limits(time_limit=60, memory_limit=1 << 20, max_clauses=100, every=1)
+    for n in range(100):
+        limits.check(n)
+
+
+def test_message():
+    assert str(LimitReached("time")) == "time limit reached"
+
+
+def test_snapshot(capsys):
+    snapshot(Limits(), lambda: {"given": 3, "kept": 4})
+    line = capsys.readouterr().err
+    assert line.startswith("stats: elapsed=") and line.endswith(" given=3 kept=4\n")
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="no SIGUSR1")
+def test_snapshot_on_sigusr1(capsys):
+    old = signal.getsignal(signal.SIGUSR1)
+    try:
+        snapshot_on_signal(Limits(), lambda: {"given": 7})
+        os.kill(os.getpid(), signal.SIGUSR1)
+        time.sleep(0.01)
+    finally:
+        signal.signal(signal.SIGUSR1, old)
+
+    err = capsys.readouterr().err
+    assert err.startswith("stats: ") and "given=7" in err
+
+
+def pl(engine, text):
+    solver = pl_solver.Solver(engine=engine)
+    for c in pl_solver.read_plain(text.splitlines()):
+        solver.add_clause(c)
+    return solver
+
+
+def fol(text):
+    solver = fol_solver.Solver()
+    for line in text.splitlines():
+        solver.add_clause(line)
+    return solver
+
+
+@pytest.mark.parametrize("engine", ["resolution", "cdcl"])
+@pytest.mark.parametrize("kind, limits", [
+    ("clause", lambda: Limits(max_clauses=5)),
+    ("time", lambda: Limits(time_limit=0)),
+    ("memory", lambda: Limits(memory_limit=1)),
+])
+def test_pl_unknown(engine, kind, limits):
+    result = pl(engine, pigeonhole(6)).solve(limits())
+    assert result.status == pl_solver.UNKNOWN
+    assert result.limit.reason == kind
+    assert result.as_dict()["limit"] == kind
+
+
+@pytest.mark.parametrize("kind, limits", [
+    ("clause", lambda: Limits(max_clauses=5)),
+    ("time", lambda: Limits(time_limit=0)),
+    ("memory", lambda: Limits(memory_limit=1)),
+])
+def test_fol_unknown(kind, limits):
+    solver = fol(transitivity(9))
+    result = solver.solve(limits())
+    assert result.status == fol_solver.UNKNOWN
+    assert result.limit.reason == kind
+    assert result.stats["generated"] >= (5 if kind == "clause" else 0)
+
+    assert solver.solve(Limits()).status == fol_solver.UNSAT
+
+
+def solver(script, text, tmp_path):
+    path = tmp_path / "problem.txt"
+    path.write_text(text)
+    return [sys.executable, os.path.join(ROOT, script), str(path)]
+
+
+@pytest.mark.parametrize("script, text, args", [
+    ("pl_solver.py", pigeonhole(6), []),
+    ("pl_solver.py", pigeonhole(6), ["--engine", "cdcl"]),
+    ("fol_solver.py", transitivity(9), []),
+])
+@pytest.mark.parametrize("kind, limit", [
+    ("clause", ["--max-clauses", "20"]),
+    ("time", ["--time-limit", "0"]),
+    ("memory", ["--memory-limit", "1"]),
+])
+def test_cli_reports_the_limit(script, text, args, kind, limit, tmp_path):
+    run = subprocess.run(solver(script, text, tmp_path) + args + limit,
+                         capture_output=True, text=True, timeout=60, check=True)
+    assert run.stdout.splitlines()[-1] == "{} limit reached".format(kind)
+    assert run.stderr.startswith("stats: elapsed=")
+
+
+# the run goes on after the snapshot, until its time is up
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="no SIGUSR1")
+def test_cli_snapshot_on_sigusr1(tmp_path):
+    proc = subprocess.Popen(solver("pl_solver.py", pigeonhole(8), tmp_path) + ["--time-limit", "3"],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    time.sleep(1)
+    proc.send_signal(signal.SIGUSR1)
+    out, err = proc.communicate(timeout=60)
+
+    assert out.strip() == "time limit reached"
+    snapshots = err.splitlines()
+    assert len(snapshots) == 2 and all(l.startswith("stats: ") and "given=" in l for l in snapshots)
@@ -0,0 +1,142 @@
+import gc
+import itertools
+import pickle
+import weakref
+
+import pytest
+
+from structure import Const, Var, Function, Relation
+from ordering import KBO, LPO, Refinement, refinement
+from benchmarks.generators import nested_chain, transitivity
+import fol_solver
+
+
+a, b, c = Const("a"), Const("b"), Const("c")
+x, y = Var("1"), Var("2")
+
+
+def f(t):
+    return Function("f", [t])
+
+
+def g(s, t):
+    return Function("g", [s, t])
+
+
+def ground_terms():
+    terms = [a, b, c]
+    for _ in range(2):
+        terms = terms + [f(t) for t in terms] + [g(s, t) for s in terms[:6] for t in terms[:6]]
+    return [*dict.fromkeys(terms)]
+
+
+ORDERS = [KBO(), KBO(["a", "f", "g", "b"]), LPO(), LPO(["c", "g", "b", "f", "a"])]
+TERMS = ground_terms()
+
+
+@pytest.mark.parametrize("order", ORDERS)
+def test_total_on_ground_terms(order):
+    for s in TERMS:
+        assert not order.greater(s, s)
+    for s, t in itertools.combinations(TERMS, 2):
+        assert order.greater(s, t) != order.greater(t, s), (s, t)
+
+
+# a strict total order on a finite set is well-founded; what is left to check
+# is that it is transitive, and that a term is above its subterms (which
+# rules out descending chains through ever larger terms)
+@pytest.mark.parametrize("order", ORDERS)
+def test_transitive_with_subterm_property(order):
+    terms = TERMS[::3]
+    for r, s, t in itertools.permutations(terms, 3):
+        if order.greater(r, s) and order.greater(s, t):
+            assert order.greater(r, t), (r, s, t)
+
+    for t in TERMS:
+        assert order.greater(f(t), t)
+        assert order.greater(g(t, a), t) and order.greater(g(a, t), t)
+
+
+@pytest.mark.parametrize("order", ORDERS)
+def test_compatible_with_contexts(order):
+    terms = TERMS[:20]
+    for s, t in itertools.permutations(terms, 2):
+        if order.greater(s, t):
+            assert order.greater(f(s), f(t))
+            assert order.greater(g(s, c), g(t, c)) and order.greater(g(c, s), g(c, t))
+
+
+@pytest.mark.parametrize("order", ORDERS)
+def test_variables(order):
+    assert order.greater(f(x), x)
+    assert not order.greater(x, f(x))
+    # x and y are incomparable, and so are terms with different variables
+    assert not order.greater(x, y) and not order.greater(y, x)
+    assert not order.greater(f(x), y) and not order.greater(g(x, a), f(y))
+
+
+def test_literals():
+    order = KBO()
+    p = Relation("P", [f(a)])
+    assert order.greater_literal(p.negate(), p)
+    assert not order.greater_literal(p, p.negate())
+    assert order.greater_literal(Relation("P", [f(f(a))]), p.negate())
+
+
+def test_eligible_literals():
+    big = Relation("P", [f(f(a))])
+    small = Relation("Q", [a], True)
+    lits = frozenset([big, small])
+
+    assert refinement("kbo").eligible(lits) == ((big,), False)
+    assert refinement("none", "negative").eligible(lits) == ((small,), True)
+    assert refinement("kbo", "negative").eligible(frozenset([big])) == ((big,), False)
+
+
+# each refinement keeps a bounded cache of its own, and the workers get none
+def test_eligible_cache():
+    clauses = [frozenset([Relation("P", [t])]) for t in (a, f(a), f(f(a)))]
+    r, other = Refinement(KBO(), cache=2), Refinement(KBO())
+    for lits in clauses:
+        assert r.eligible(lits) == ((next(iter(lits)),), False)
+
+    assert [*r.eligibles] == clauses[1:] and not other.eligibles
+    assert r.eligible(clauses[1]) is r.eligible(clauses[1])
+    assert not pickle.loads(pickle.dumps(r)).eligibles
+
+    # nothing outside the solver keeps it alive
+    ref = weakref.ref(r)
+    del r
+    gc.collect()
+    assert ref() is None
+
+
+def solve(text, tmp_path, **options):
+    path = tmp_path / "problem.p"
+    path.write_text(text)
+
+    solver = fol_solver.Solver(**options)
+    for lits, goal in fol_solver.read_input(str(path)):
+        solver.add_clause(lits, goal)
+    return solver.solve().status
+
+
+@pytest.mark.parametrize("problem", [nested_chain(6), transitivity(5)])
+@pytest.mark.parametrize("options", [dict(sos=True), dict(ordering="kbo"), dict(ordering="lpo"),
+                                     dict(selection="negative"), dict(ordering="kbo", selection="negative")])
+def test_refutations_are_found(problem, options, tmp_path):
+    assert solve(problem, tmp_path, **options) == fol_solver.UNSAT
+
+
+def test_sos_plain_goals():
+    solver = fol_solver.Solver(sos=True)
+    for line in ("P(a)", "!P(1), P(f(1))", "!Q(1), Q(f(1))", "?!P(f(f(a)))"):
+        solver.add_clause(line)
+    assert solver.solve().status == fol_solver.UNSAT
+
+
+def test_saturated_sos_is_not_a_model():
+    solver = fol_solver.Solver(sos=True)
+    for line in ("P(a)", "!P(b)", "?!Q(a)"):
+        solver.add_clause(line)
+    assert solver.solve().status == fol_solver.UNKNOWN
@@ -0,0 +1,102 @@
+import io
+import sys
+
+import pytest
+
+from parser import ParseError, parse, parse_clause, parse_file, parse_line
+from structure import Const, Var, Function, Relation
+
+
+a = Const("a")
+x, y = Var("1"), Var("2")
+
+
+def f(*ts):
+    return Function("f", ts)
+
+
+@pytest.mark.parametrize("line, lits", [
+    ("S(1, 1), S(f(b), f(b))", [Relation("S", [x, x]), Relation("S", [f(Const("b")), f(Const("b"))])]),
+    ("!P(a)", [Relation("P", [a], True)]),
+    ("  P(f(1, f(a)), 2) ,!Q_2(c3)\n", [Relation("P", [f(x, f(a)), y]), Relation("Q_2", [Const("c3")], True)]),
+    ("P()", [Relation("P", [])]),
+    ("P(f())", [Relation("P", [Function("f", [])])]),
+    # the literals of the first version of the format had no separators
+    ("S(1, 1) S(f(b), f(b))", [Relation("S", [x, x]), Relation("S", [f(Const("b")), f(Const("b"))])]),
+    ("P(1)!Q(a)", [Relation("P", [x]), Relation("Q", [a], True)]),
+    ("", []),
+])
+def test_parse_line(line, lits):
+    assert parse_line(line) == lits
+
+
+def test_goals():
+    assert parse_clause("?!P(1)") == ([Relation("P", [x], True)], True)
+    assert parse_clause("P(1)") == ([Relation("P", [x])], False)
+
+
+def test_deep_terms():
+    n = 20000
+    lit, = parse_line("P(" + "f(" * n + "a" + ")" * n + ")")
+
+    t, depth = lit.childs[0], 0
+    while isinstance(t, Function):
+        t, depth = t.childs[0], depth + 1
+    assert depth == n and t is a
+
+
+@pytest.mark.parametrize("line, col, msg", [
+    ("S(1", 4, "expected ',' or ')', found end of line"),
+    ("S(1))", 5, "expected a predicate, found ')'"),
+    ("S(1),", 6, "expected a predicate, found end of line"),
+    ("s(1)", 1, "expected a predicate, found 's'"),
+    ("S 1", 3, "expected '(', found '1'"),
+    ("S(1, , 2)", 6, "expected a term, found ','"),
+    ("S(f()(1))", 6, "expected ',' or ')', found '('"),
+    ("!!S(1)", 2, "expected a predicate, found '!'"),
+    ("S(#)", 3, "unexpected character '#'"),
+])
+def test_errors(line, col, msg):
+    with pytest.raises(ParseError) as e:
+        [*parse(["P(a)", "", line])]
+
+    assert (e.value.line, e.value.col, e.value.msg) == (3, col, msg)
+    assert str(e.value) == "line 3, column {}: {}".format(col, msg)
+
+
+def test_parse_file_streams(tmp_path):
+    path = tmp_path / "clauses.txt"
+    path.write_text("P(1)\n\n?!P(a)\nP(\n")
+
+    clauses = parse_file(str(path))
+    assert next(clauses) == ([Relation("P", [x])], False)
+    assert next(clauses) == ([Relation("P", [a], True)], True)
+    with pytest.raises(ParseError) as e:
+        next(clauses)
+
+    assert (e.value.line, e.value.col) == (4, 3)
+    assert e.value.path == str(path)
+    assert str(e.value).startswith(str(path) + ": line 4, column 3: ")
+
+
+# nothing is read ahead of the clause asked for
+def test_parse_reads_lazily():
+    read = []
+
+    def lines():
+        for l in ("P(1)", "Q(1)", "R(1)"):
+            read.append(l)
+            yield l
+
+    clauses = parse(lines())
+    next(clauses)
+    assert read == ["P(1)"]
+
+
+def test_stdin(monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("P(a)\n!P(1), Q(1\n"))
+    clauses = parse_file("-")
+    assert next(clauses) == ([Relation("P", [a])], False)
+    with pytest.raises(ParseError) as e:
+        next(clauses)
+    assert e.value.path == "<stdin>"
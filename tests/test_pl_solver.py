@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pl_solver import DENSE_VARS, Clause, SparseClause, Solver
+from result import SAT, UNSAT
+from benchmarks.generators import pigeonhole
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cli(text, tmp_path, *args):
+    path = tmp_path / "clauses.txt"
+    path.write_text(text)
+    run = subprocess.run([sys.executable, os.path.join(ROOT, "pl_solver.py"), str(path), *args],
+                         capture_output=True, text=True, timeout=60, check=True)
+    return run.stdout.splitlines()
+
+
+def refuted(out):
+    return any(l.split("\t")[1:2] == ["{}"] for l in out if l[:1].isdigit())
+
+
+# X6, !X6 resolved with !X6, X5 on X6 keeps the !X6 of the first parent
+@pytest.mark.parametrize("form", [Clause, SparseClause])
+def test_resolve_removes_only_the_pivot_literals(form):
+    k = form.of([6, -6]).resolve(form.of([-6, 5]), 6)
+    assert sorted(k.lits()) == [-6, 5]
+
+    k = form.of([-6, 5]).resolve(form.of([6, -6]), 6)
+    assert sorted(k.lits()) == [-6, 5]
+
+
+@pytest.mark.parametrize("lits", [[1, -3, 7], [-2], [], [4, -4, 5]])
+def test_dense_and_sparse_agree(lits):
+    assert Clause.of(lits).lits() == SparseClause.of(lits).lits()
+    assert Clause.of(lits).tautology() == SparseClause.of(lits).tautology()
+    assert str(Clause.of(lits)) == str(SparseClause.of(lits))
+
+
+# a 3-literal clause on the largest variables: a bitmask up to DENSE_VARS,
+# past twice that a bitmask takes more memory than the literal array
+def test_dense_vars_crossover():
+    def size(n, form):
+        c = form.of([n - 2, 1 - n, n])
+        return sys.getsizeof(c.pos) + sys.getsizeof(c.neg) if form is Clause else sys.getsizeof(c.literals)
+
+    assert size(DENSE_VARS // 2, Clause) < size(DENSE_VARS // 2, SparseClause)
+    assert size(2 * DENSE_VARS, Clause) > size(2 * DENSE_VARS, SparseClause)
+
+
+# past DENSE_VARS the same problem is solved on sparse clauses
+@pytest.mark.parametrize("clauses, status", [(pigeonhole(3), UNSAT), ([[1, 2], [-1, 3], [-3]], SAT)])
+def test_sparse_clauses(clauses, status):
+    def solve(shift):
+        s = Solver()
+        for c in clauses:
+            s.add_clause([l + shift if l > 0 else l - shift for l in c])
+        result = s.solve()
+        return s, result.status
+
+    dense, answer = solve(0)
+    sparse, shifted = solve(DENSE_VARS)
+    assert dense.dense and not sparse.dense
+    assert answer == shifted == status
+
+
+# X1, !X1 resolved with !X3, !X1 on X1 keeps the !X1 of the first parent;
+# dropping it as well gives !X3 and a refutation of a satisfiable set
+def test_resolvent_of_a_tautology(tmp_path):
+    out = cli("1 !1\n3 1\n!1 !2\n!3 !1\n", tmp_path)
+    assert not refuted(out)
+    assert "res:!X1, !X3" in out
+
+
+def test_refutation(tmp_path):
+    assert refuted(cli("1 2\n!1 2\n1 !2\n!1 !2\n", tmp_path))
+
+
+@pytest.mark.parametrize("skip_related", [False, True])
+def test_ancestors_only_with_skip_related(skip_related):
+    s = Solver(skip_related=skip_related)
+    for c in ([1, 2], [-1, 3], [-3, 4]):
+        s.add_clause(c)
+    s.solve()
+
+    assert s.ancestors(2) == (4 if skip_related else 0)
+    assert any(res.ancestors for res in s.saturated()) == skip_related
@@ -0,0 +1,151 @@
+import itertools
+
+import pytest
+
+from preprocess import PLPreprocessor
+from saturation import GivenClause
+from benchmarks.generators import random_ksat
+import fol_solver
+import pl_solver
+
+
+def node(lits):
+    return pl_solver.Resolution(pl_solver.Clause.of(lits))
+
+
+@pytest.mark.parametrize("tautologies, kept", [(True, 1), (False, 2)])
+def test_given_clause_drops_tautologies(tautologies, kept):
+    engine = GivenClause(key=lambda r: r.resolvent, tautologies=tautologies)
+    engine.add(node([1, -1, 2]))
+    engine.add(node([2, 3]))
+    assert len(engine.clauses()) == kept
+
+
+# resolving on P leaves Q(a), !Q(a) and on Q P(a), !P(a)
+@pytest.mark.parametrize("preprocess", [False, True])
+def test_solvers_drop_tautologies_with_preprocess(preprocess):
+    solver = fol_solver.Solver(preprocess=preprocess)
+    for c in ("P(1), Q(1)", "!P(a), !Q(a)"):
+        solver.add_clause(c)
+    assert solver.solve().status == fol_solver.SAT
+    tautologies = [r for r in solver.saturated() if r.resolvent.tautology()]
+    assert len(tautologies) == (0 if preprocess else 2)
+
+    solver = pl_solver.Solver(preprocess=preprocess)
+    solver.add_clause([1, 2])
+    solver.saturate()
+    solver.add_clause([-1, 1])
+    assert solver.solve().status == pl_solver.SAT
+    assert len(solver.saturated()) == (1 if preprocess else 2)
+
+
+def satisfies(model, clauses):
+    true = set(model)
+    return all(any(l in true for l in c) for c in clauses)
+
+
+def models(clauses, nvars):
+    for signs in itertools.product((1, -1), repeat=nvars):
+        model = [s * v for s, v in zip(signs, range(1, nvars + 1))]
+        if satisfies(model, clauses):
+            yield model
+
+
+def resolvent(c1, c2, v):
+    l = v if v in c1 else -v
+    return sorted(set(c1) - {l} | set(c2) - {-l})
+
+
+def preprocessor(**options):
+    return PLPreprocessor(lambda n: n, resolvent, **options)
+
+
+# only one pass is on at a time, so each one is checked on its own
+PASSES = [dict(eliminate=False, blocked=False), dict(eliminate=True, blocked=False),
+          dict(eliminate=False, blocked=True), dict()]
+
+@pytest.mark.parametrize("options", PASSES)
+@pytest.mark.parametrize("seed", range(30))
+def test_pl_equisatisfiable(options, seed):
+    nvars = 8
+    clauses = random_ksat(nvars, ratio=2.5 + seed % 4, seed=seed)
+    clauses += [[v] for v in range(1, seed % 3 + 1)]
+    pre = preprocessor(**options)
+    rest = pre.run(clauses)
+
+    first = next(models(clauses, nvars), None)
+    if rest is None:
+        assert first is None
+        return
+
+    model = next(models(rest, nvars), None)
+    assert (model is None) == (first is None)
+    if model is not None:
+        assert satisfies(pre.extend(model), clauses)
+
+
+def test_bve_model_reconstruction():
+    # X1 only occurs in two clauses and is resolved away
+    clauses = [[1, 2], [-1, 3], [-2, -3, 4], [2, 3, -4], [-2, 3, -4]]
+    pre = preprocessor(blocked=False)
+    rest = pre.run(clauses)
+
+    assert pre.effects["eliminated_vars"] > 0
+    assert all(abs(l) != 1 for c in rest for l in c)
+    for model in models(rest, 4):
+        assert satisfies(pre.extend(model), clauses)
+
+
+def test_bce_model_reconstruction():
+    # X1 | X2 is blocked on X1: its only resolvent with !X1 | !X2 is a tautology
+    clauses = [[1, 2], [-1, -2], [2, 3], [-3, -2]]
+    pre = preprocessor(eliminate=False)
+    rest = pre.run(clauses)
+
+    assert pre.effects["blocked"] > 0
+    for model in models(rest, 3):
+        assert satisfies(pre.extend(model), clauses)
+
+
+def test_unit_propagation_refutes():
+    pre = preprocessor()
+    assert pre.run([[1], [-1, 2], [-2, 3], [-3, -1]]) is None
+    assert pre.refutation == []
+    assert pre.effects["units"] > 0
+
+
+@pytest.mark.parametrize("engine", ["resolution", "cdcl"])
+@pytest.mark.parametrize("seed", range(10))
+def test_pl_solver_models(engine, seed):
+    clauses = random_ksat(12, ratio=3.0, seed=seed)
+    solver = pl_solver.Solver(engine=engine, preprocess=True)
+    for c in clauses:
+        solver.add_clause(c)
+
+    result = solver.solve()
+    assert (result.status == pl_solver.SAT) == (next(models(clauses, 12), None) is not None)
+    if result.status == pl_solver.SAT:
+        assert satisfies(result.model, clauses)
+
+
+FOL = [
+    (["P(1), Q(1)", "!P(a)", "!Q(a)"], None),
+    (["P(a)", "!P(1), P(f(1))", "!P(f(f(a)))"], None),
+    (["P(a)", "!P(1), Q(1)", "R(b)"], "pure_clauses"),
+    (["P(1), !P(f(1))", "Q(a)", "!Q(1), R(1)"], "pure_clauses"),
+    (["P(1)", "!P(f(1)), Q(1)", "!Q(a)"], "unit_simplified"),
+    (["P(1)", "P(a), !Q(b)", "Q(1), !P(b)"], "unit_subsumed"),
+]
+
+@pytest.mark.parametrize("clauses, effect", FOL)
+def test_fol_equisatisfiable(clauses, effect):
+    results = []
+    for preprocess in (False, True):
+        solver = fol_solver.Solver(preprocess=preprocess)
+        for c in clauses:
+            solver.add_clause(c)
+        results.append(solver.solve().status)
+
+    assert results[0] == results[1]
+    if effect is not None:
+        assert solver.stats()["pre_" + effect] > 0
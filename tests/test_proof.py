@@ -0,0 +1,131 @@
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+from proof import Writer, derivation
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Node:
+    def __init__(self, name, *parents):
+        self.name = name
+        self.parents = parents or (None, None)
+
+
+def test_derivation_lists_shared_nodes_once():
+    a, b, c = Node("a"), Node("b"), Node("c")
+    ab = Node("ab", a, b)
+    abc = Node("abc", ab, c)
+    # ab is a parent twice, a three times
+    top = Node("top", Node("x", abc, ab), Node("y", a, abc))
+
+    order = derivation(top)
+    assert len(order) == len({id(n) for n in order}) == 8
+    seen = set()
+    for n in order:
+        assert all(id(p) in seen for p in n.parents if p)
+        seen.add(id(n))
+    assert order[-1] is top
+
+    # the deeper parent's subproof comes first, or the first parent's
+    assert [n.name for n in derivation(Node("r", c, abc))][:1] == ["a"]
+    assert [n.name for n in derivation(Node("r", c, abc), False)][:1] == ["c"]
+
+
+def test_deep_derivation():
+    node = Node("0")
+    for i in range(1, 20000):
+        node = Node(str(i), node, Node("p" + str(i)))
+    assert len(derivation(node)) == 39999
+
+
+def test_writer_chunks():
+    out = io.StringIO()
+    w = Writer(out, chunk=2)
+    w.write("a")
+    assert out.getvalue() == ""
+    w.write("b")
+    w.write("c")
+    assert out.getvalue() == "a\nb\n"
+    w.flush()
+    assert out.getvalue() == "a\nb\nc\n"
+
+
+# c0 < c1 < ... < cn and transitivity, against !(c0 < cn)
+def transitivity(n):
+    names = ["c" + "i" * i for i in range(n + 1)]
+    lines = ["Less({}, {})".format(a, b) for a, b in zip(names, names[1:])]
+    lines.append("!Less(1, 2), !Less(2, 3), Less(1, 3)")
+    lines.append("!Less({}, {})".format(names[0], names[-1]))
+    return "\n".join(lines) + "\n"
+
+
+def pigeonhole(n):
+    p = lambda i, j: i * n + j + 1
+    clauses = [[p(i, j) for j in range(n)] for i in range(n + 1)]
+    for j in range(n):
+        for i, k in itertools.combinations(range(n + 1), 2):
+            clauses.append([-p(i, j), -p(k, j)])
+    return "".join(" ".join(str(l) if l > 0 else "!" + str(-l) for l in c) + "\n" for c in clauses)
+
+
+@pytest.fixture(params=["fol", "pl"])
+def problem(request, tmp_path):
+    path = tmp_path / "problem.txt"
+    if request.param == "fol":
+        path.write_text(transitivity(5))
+        return "fol_solver.py", str(path)
+
+    path.write_text(pigeonhole(3))
+    return "pl_solver.py", str(path)
+
+
+def run(problem, fmt):
+    script, path = problem
+    run = subprocess.run([sys.executable, os.path.join(ROOT, script), path, "--proof", fmt], cwd=ROOT,
+                         capture_output=True, text=True, timeout=60, check=True)
+    return run.stdout
+
+
+# text steps are the lines "n.<tab>clause<tab><tab><tab>rule", numbered from 1
+def text_steps(out):
+    steps = [l.split("\t") for l in out.splitlines() if l[:1].isdigit()]
+    assert [int(s[0][:-1]) for s in steps] == [*range(1, len(steps) + 1)]
+    return [(s[1], s[-1]) for s in steps]
+
+
+def test_outputs_list_every_step_once(problem):
+    text = text_steps(run(problem, "text"))
+    steps = json.loads(run(problem, "json"))["steps"]
+
+    assert len(text) == len(steps) > 1
+    assert len(set(text)) == len(text)
+    assert [s["id"] for s in steps] == [*range(1, len(steps) + 1)]
+    for s in steps:
+        assert all(p < s["id"] for p in s["parents"])
+        assert len(s["parents"]) == (0 if s["rule"] == "premise" else 2)
+    assert steps[-1]["clause"] == []
+
+    premises = [t for t in text if t[1] == "premise"]
+    assert len(premises) == sum(s["rule"] == "premise" for s in steps)
+    assert len({json.dumps(s["clause"]) for s in steps if s["rule"] == "premise"}) == len(premises)
+
+    # every step but the last one is used, and some are used more than once
+    uses = Counter(p for s in steps for p in s["parents"])
+    assert set(uses) == set(range(1, len(steps)))
+    assert max(uses.values()) > 1
+
+
+def test_tex(problem):
+    lines = run(problem, "tex").splitlines()
+    lines = lines[lines.index("\\begin{array}{lll}"):]
+    assert lines[-1] == "\\end{array}"
+    assert sum("premise" in l for l in lines) == len([s for s in text_steps(run(problem, "text")) if s[1] == "premise"])
@@ -0,0 +1,95 @@
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from saturation import GivenClause
+from parallel import ParallelProofs
+
+
+# a clause stand-in: "resolving" two sets gives their union while it stays
+# small, so every start set saturates after finitely many clauses
+class Node:
+    calls = Counter()
+
+    def __init__(self, *items, ancestors=0):
+        self.resolvent = frozenset(items)
+        self.ancestors = ancestors
+
+    def factors(self):
+        return []
+
+    def proof(self, other):
+        Node.calls[frozenset([self.resolvent, other.resolvent])] += 1
+        union = self.resolvent | other.resolvent
+        if len(union) > 3 or union in (self.resolvent, other.resolvent):
+            return []
+        return [(False, Node(*union, ancestors=self.ancestors | other.ancestors))]
+
+
+@pytest.fixture(autouse=True)
+def calls():
+    Node.calls.clear()
+    return Node.calls
+
+
+def saturate(start, skip_related=False, parallel=None):
+    engine = GivenClause(key=lambda res: res.resolvent, parallel=parallel, skip_related=skip_related)
+    for i, items in enumerate(start):
+        engine.add(Node(*items, ancestors=1 << i))
+    assert [*engine.run()] == []
+    return engine.clauses()
+
+
+@pytest.mark.parametrize("start", [
+    [[1], [2]],
+    [[1], [2], [3], [4]],
+    [[1, 2], [3], [4, 5], [6]],
+    [[i] for i in range(6)],
+])
+def test_every_pair_is_tried_once(start, calls):
+    clauses = saturate(start)
+    n = len(clauses)
+    assert n > len(start)
+
+    assert sum(calls.values()) == n * (n - 1) // 2
+    assert set(calls.values()) == {1}
+    assert set(calls) == {frozenset([a.resolvent, b.resolvent]) for a, b in combinations(clauses, 2)}
+
+
+def test_duplicates_are_kept_once(calls):
+    clauses = saturate([[1], [2], [1], [1, 2]])
+    assert sorted(map(sorted, (c.resolvent for c in clauses))) == [[1], [1, 2], [2]]
+    assert sum(calls.values()) == 3
+
+
+# with skip_related clauses that share a premise are not resolved: of the 21
+# pairs of the saturated set only those of disjoint premises are tried
+def test_skip_related(calls):
+    clauses = saturate([[1], [2], [3]], skip_related=True)
+    assert len(clauses) == 7
+
+    pairs = {frozenset([a.resolvent, b.resolvent]) for a, b in combinations(clauses, 2) if not a.ancestors & b.ancestors}
+    assert len(pairs) == 6
+    assert set(calls) == pairs and set(calls.values()) == {1}
+
+
+# the workers get sorted items and send back the items of the resolvents
+def work(job):
+    given, others = job
+    return [[sorted(r.resolvent) for _, r in Node(*given).proof(Node(*o))] for o in others]
+
+
+def decode(given, other, result):
+    return [(False, Node(*items, ancestors=given.ancestors | other.ancestors)) for items in result]
+
+
+@pytest.mark.parametrize("start", [[[i] for i in range(6)], [[1, 2], [3], [4, 5], [6]]])
+def test_parallel_search_is_the_sequential_one(start):
+    sequential = saturate(start)
+    pool = ParallelProofs(2, lambda res: sorted(res.resolvent), work, decode, batch=1)
+    try:
+        parallel = saturate(start, parallel=pool)
+    finally:
+        pool.close()
+    assert [c.resolvent for c in parallel] == [c.resolvent for c in sequential]
@@ -0,0 +1,157 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import stats
+from stats import Stats, NullStats
+from limits import Limits
+from parallel import ParallelProofs
+from dimacs import write_cnf
+from benchmarks.generators import pigeonhole, transitivity
+import fol_solver
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_counters_and_timers():
+    st = Stats()
+    st.count("pairs")
+    st.count("pairs", 4)
+    t = st.start()
+    st.stop("select", t)
+    st.stop("select", st.start())
+
+    report = st.report()
+    assert report["counters"] == {"pairs": 5}
+    assert report["timers"]["select"]["calls"] == 2
+    assert report["timers"]["select"]["seconds"] >= 0
+
+
+def test_null_stats_keeps_nothing():
+    st = NullStats()
+    st.count("pairs")
+    st.stop("select", st.start())
+    assert st.report() == {"counters": {}, "timers": {}}
+    assert isinstance(stats.current, NullStats)
+
+
+def io_text(write):
+    out = io.StringIO()
+    write(out)
+    return out.getvalue()
+
+
+def test_report():
+    st = stats.enable()
+    try:
+        st.count("generated", 7)
+        st.stop("inference", st.start())
+        limits = Limits()
+        engine = lambda: {"given": 3, "generated": 7}
+
+        report = json.loads(io_text(lambda f: stats.write_report(limits, engine, "json", f)))
+        lines = io_text(lambda f: stats.write_report(limits, engine, "text", f)).splitlines()
+    finally:
+        stats.current = NullStats()
+
+    assert report["engine"] == {"given": 3, "generated": 7}
+    assert report["counters"] == {"generated": 7}
+    assert report["timers"]["inference"]["calls"] == 1
+
+    assert [l.split(":")[0] for l in lines] == ["stats", "counters", "timers"]
+    assert lines[0].endswith(" given=3 generated=7") and lines[1] == "counters: generated=7"
+
+
+@pytest.fixture
+def problems(tmp_path):
+    fol = tmp_path / "transitivity.p"
+    fol.write_text(transitivity(6))
+    pl = tmp_path / "php.cnf"
+    with open(pl, "w") as f:
+        write_cnf(pigeonhole(3), f)
+    return {"fol": str(fol), "pl": str(pl)}
+
+
+# with the same hash seed, runs that search alike print the same
+def run(script, *args):
+    env = dict(os.environ, PYTHONHASHSEED="0")
+    return subprocess.run([sys.executable, os.path.join(ROOT, script), *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True, timeout=60, check=True)
+
+
+def json_report(run):
+    report = json.loads(run.stderr.splitlines()[-1])
+    assert set(report) == {"elapsed", "rss_mb", "engine", "counters", "timers"}
+    assert "parse" in report["timers"]
+    return report
+
+
+def test_fol_run_is_counted(problems):
+    report = json_report(run("fol_solver.py", problems["fol"], "--stats", "json"))
+    counters, timers, engine = report["counters"], report["timers"], report["engine"]
+
+    assert counters["generated"] == engine["generated"]
+    assert counters["pairs"] > 0 and counters["literal_pairs"] > 0
+    assert counters["unify"] >= counters["unify_ok"] > 0
+    assert counters["forward_subsumed"] + counters["duplicates"] > 0
+    for phase in ("select", "index", "inference", "subsumption"):
+        assert timers[phase]["calls"] > 0
+    assert timers["select"]["calls"] == engine["given"]
+
+
+def test_cdcl_run_is_counted(problems):
+    report = json_report(run("pl_solver.py", problems["pl"], "--stats=json", "--engine", "cdcl"))
+    counters, timers, engine = report["counters"], report["timers"], report["engine"]
+
+    assert counters["learned_literals"] >= engine["learned"] > 0
+    # every conflict but the last one at level 0 is analyzed
+    assert timers["analyze"]["calls"] == engine["conflicts"] - 1
+    assert timers["propagate"]["calls"] > 0
+
+
+# the engines do the same with stats on or off: the same answer and proof
+@pytest.mark.parametrize("logic, script, args", [
+    ("fol", "fol_solver.py", []),
+    ("pl", "pl_solver.py", ["--engine", "resolution"]),
+    ("pl", "pl_solver.py", ["--engine", "cdcl"]),
+])
+def test_counting_leaves_the_search_alone(problems, logic, script, args):
+    off = run(script, problems[logic], *args)
+    on = run(script, problems[logic], *args, "--stats", "json")
+    assert on.stdout == off.stdout and off.stdout
+    assert not off.stderr
+
+
+def fol(path):
+    solver = fol_solver.Solver()
+    for lits, goal in fol_solver.read_input(path):
+        solver.add_clause(lits, goal)
+    return solver
+
+
+# with --jobs the counters of the workers come back to the main process: with
+# a batch of one every partner list goes to the pool, so the literal pairs
+# are only counted there. Each pair looks up a unifier in the cache of its
+# worker; the cache statistics of the result are those of the main process.
+def test_worker_counters_are_merged(problems):
+    st = stats.enable()
+    solver = fol(problems["fol"])
+    solver.parallel = ParallelProofs(2, fol_solver.encode_clause, fol_solver.work, fol_solver.unwork, batch=1)
+    try:
+        result = solver.solve()
+    finally:
+        solver.close()
+        stats.current = NullStats()
+
+    assert result.status == fol_solver.UNSAT
+    counters = st.counters
+    assert counters["generated"] == result.stats["generated"]
+    assert counters["literal_pairs"] > 0 and counters["renamings"] > 0
+    lookups = counters["mgu_cache_hits"] + counters["mgu_cache_misses"]
+    assert lookups >= counters["literal_pairs"]
+    assert lookups > result.stats["mgu_cache_hits"] + result.stats["mgu_cache_misses"]
@@ -0,0 +1,87 @@
+import copy
+import pickle
+
+import pytest
+
+from structure import Const, Var, Function, Relation, Subst, encode, decode
+import fol_solver
+
+
+a = Const("a")
+x = Var("1")
+y = Var("2")
+g = Function("g", [x, a])
+f0 = Function("f", [])
+
+
+def test_equal_terms_are_identical():
+    assert Function("g", [Var("1"), Const("a")]) is g
+    assert Relation("P", [g]) is Relation("P", (g,))
+    assert Relation("P", [g]) is not Relation("P", [g], True)
+    assert Relation("P", [g]).negate().negate() is Relation("P", [g])
+    # a constant, a variable and a function without arguments are different terms
+    assert len({Const("f"), Var("f"), Function("f", [])}) == 3
+
+
+# derived terms can nest deeper than the recursion limit
+def test_deep_terms():
+    t = a
+    for _ in range(5000):
+        t = Function("f", [t, x])
+    r = Relation("P", [t], True)
+
+    assert decode(encode(r)) is r
+    s = r.apply(Subst(x, a))
+    assert s.vars == frozenset() and s.apply(Subst(x, y)) is s
+    assert str(r).count("f(") == 5000 and str(r).startswith("!P(f(f(")
+    assert r.tex().count("x_{1}") == 5000 and r.tex().startswith("\\neg P(")
+
+
+@pytest.mark.parametrize("t", [a, x, g, Relation("P", [g, y], True)])
+def test_immutable(t):
+    with pytest.raises(AttributeError):
+        t.label = "h"
+    with pytest.raises(AttributeError):
+        del t.label
+
+    assert copy.copy(t) is t and copy.deepcopy(t) is t
+    assert pickle.loads(pickle.dumps(t)) is t
+
+
+def test_variables():
+    r = Relation("P", [g, Function("f", [y])])
+    assert r.vars == {x, y} and r.getvars() == {x, y}
+    assert x.isvar() and not a.isvar() and not g.isvar()
+
+
+def test_apply_shares_unchanged_subterms():
+    ground = Function("f", [a])
+    r = Relation("P", [ground, g, y])
+    s = r.apply(Subst(x, ground))
+
+    assert s is Relation("P", [ground, Function("g", [ground, a]), y])
+    assert s.childs[0] is ground and s.childs[2] is y
+    assert r.apply(Subst(Var("3"), a)) is r
+    assert Relation("Q", [ground]).apply(Subst(x, a)) is Relation("Q", [ground])
+
+
+@pytest.mark.parametrize("t", [a, x, Var("f"), f0, Function("f", [a]), g, Function("h", [g, g, f0]),
+                               Relation("P", []), Relation("P", [x, f0, g]), Relation("P", [a], True)])
+def test_encode_roundtrip(t):
+    assert decode(encode(t)) is t
+    assert decode(pickle.loads(pickle.dumps(encode(t)))) is t
+
+
+# a function without arguments is not the variable of the same label
+def test_constant_function_is_not_a_variable():
+    assert encode(f0) != encode(Var("f"))
+    assert isinstance(decode(encode(f0)), Function)
+
+
+def test_worker_resolvent_keeps_constant_functions():
+    c1 = fol_solver.Clause([Relation("Q", [x], True), Relation("R", [f0])])
+    c2 = fol_solver.Clause([Relation("Q", [a])])
+
+    (result,) = fol_solver.work((fol_solver.encode_clause(fol_solver.Resolution(c1)), [fol_solver.encode_clause(fol_solver.Resolution(c2))]))
+    (swapped, k, r1, r2), = result
+    assert fol_solver.decode_clause(k).relations == {Relation("R", [f0])}
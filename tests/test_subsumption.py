@@ -0,0 +1,150 @@
+from collections import namedtuple
+
+import pytest
+
+from parser import parse_line
+from index import LiteralIndex
+from saturation import GivenClause
+from subsumption import (Subsumption, FeatureIndex, FOLFeatures, PLFeatures, SparseFeatures,
+                         fol_subsumes, pl_subsumes, sparse_subsumes)
+from pl_solver import SparseClause
+
+
+# stand-ins for the solvers' clauses: the literals of a FOL clause, the
+# positive and negative bitmasks of a PL clause
+Clause = namedtuple("Clause", "relations")
+PLClause = namedtuple("PLClause", "pos neg")
+
+
+class Node:
+    def __init__(self, resolvent):
+        self.resolvent = resolvent
+
+    def __len__(self):
+        return len(self.resolvent.relations)
+
+    def factors(self):
+        return []
+
+    def proof(self, other):
+        return []
+
+
+def clause(line):
+    return Clause(tuple(parse_line(line)))
+
+
+def pl(lits):
+    return PLClause(sum(1 << l for l in lits if l > 0), sum(1 << -l for l in lits if l < 0))
+
+
+@pytest.mark.parametrize("c, d, subsumes", [
+    ("P(1)", "P(a), Q(b)", True),
+    ("P(1), Q(1)", "P(a), Q(a), R(c)", True),
+    ("P(1), Q(1)", "P(a), Q(b)", False),
+    ("P(1, 1)", "P(a, b)", False),
+    ("P(1, 2)", "P(a, a)", True),
+    ("P(a)", "P(1)", False),
+    ("!P(1)", "P(a)", False),
+    # multisets: two literals of c may not map to one literal of d
+    ("P(1), P(2)", "P(a)", False),
+    ("P(1), P(2)", "P(a), P(b)", True),
+    ("P(1), !Q(f(1))", "R(2), !Q(f(g(2))), P(g(2))", True),
+])
+def test_fol_subsumes(c, d, subsumes):
+    assert fol_subsumes(clause(c), clause(d)) == subsumes
+
+
+@pytest.mark.parametrize("c, d, subsumes", [
+    ([1, -2], [1, -2, 3], True),
+    ([1, -2], [1, 2, 3], False),
+    ([], [4], True),
+    ([4], [], False),
+])
+def test_pl_subsumes(c, d, subsumes):
+    assert pl_subsumes(pl(c), pl(d)) == subsumes
+    assert sparse_subsumes(SparseClause.of(c), SparseClause.of(d)) == subsumes
+
+
+def test_feature_index():
+    index = FeatureIndex()
+    index.add("a", (1, 0, 2))
+    index.add("b", (2, 1, 2))
+    index.add("c", (3, 0, 0))
+
+    assert set(index.subsuming((2, 1, 2))) == {"a", "b"}
+    assert set(index.subsumed((1, 0, 2))) == {"a", "b"}
+
+    index.remove("b", (2, 1, 2))
+    assert set(index.subsuming((2, 1, 2))) == {"a"}
+    assert index.root.keys() == {1, 3}
+
+
+@pytest.mark.parametrize("features, subsumes, pl", [(PLFeatures(20), pl_subsumes, pl),
+                                                   (SparseFeatures(), sparse_subsumes, SparseClause.of)])
+def test_forward_and_backward_pl(features, subsumes, pl):
+    s = Subsumption(features, subsumes)
+    s.add(1, Node(pl([1, 2, 3])))
+    s.add(2, Node(pl([-4, 5])))
+
+    assert s.forward(Node(pl([1, 2, 3, 9])))
+    assert not s.forward(Node(pl([1, 2])))
+    assert s.backward(Node(pl([1, 3]))) == [1]
+    assert s.backward(Node(pl([-4]))) == [2]
+    assert s.backward(Node(pl([4]))) == []
+
+    s.remove(1)
+    assert not s.forward(Node(pl([1, 2, 3, 9])))
+
+
+def test_forward_and_backward_fol():
+    clauses = [clause(l) for l in ("P(1), Q(a)", "R(f(1))", "P(b), R(2)")]
+    s = Subsumption(FOLFeatures(clauses), fol_subsumes)
+    for n, c in enumerate(clauses):
+        s.add(n, Node(c))
+
+    assert s.forward(Node(clause("P(c), Q(a), S(d)")))
+    assert s.forward(Node(clause("R(f(f(b)))")))
+    assert not s.forward(Node(clause("R(b)")))
+    assert sorted(s.backward(Node(clause("P(1)")))) == [0, 2]
+    assert s.backward(Node(clause("P(1), P(2)"))) == []
+
+
+def test_given_clause_subsumption():
+    clauses = [clause(l) for l in ("P(a), Q(b)", "R(c)", "!S(1), T(1)")]
+    e = GivenClause(key=lambda r: r.resolvent, index=LiteralIndex(),
+                    subsumption=Subsumption(FOLFeatures(clauses), fol_subsumes))
+    for c in clauses:
+        e.add(Node(c))
+    assert [*e.run()] == []
+    assert len(e.processed) == 3
+
+    assert not e.add(Node(clause("P(a), Q(b), R(d)")))
+
+    # P(x) retires the processed P(a), Q(b), which leaves the literal index
+    assert e.add(Node(clause("P(1)")))
+    assert clause("P(a), Q(b)") not in [r.resolvent for r in e.clauses()]
+    assert len(e.processed) == 2
+
+    assert not e.index.partners(Node(clause("!P(a)")))
+    assert [*e.run()] == []
+    assert len(e.processed) == 3
+
+
+def test_restore_brings_back_retired_clauses():
+    clauses = [clause(l) for l in ("P(a), Q(b)", "R(c)")]
+    e = GivenClause(key=lambda r: r.resolvent, index=LiteralIndex(),
+                    subsumption=Subsumption(FOLFeatures(clauses), fol_subsumes))
+    for c in clauses:
+        e.add(Node(c))
+    assert [*e.run()] == []
+
+    mark = e.checkpoint()
+    e.add(Node(clause("P(1)")))
+    assert [*e.run()] == []
+    assert len(e.kept) == 2
+
+    e.restore(mark)
+    assert {r.resolvent for r in e.clauses()} == set(clauses)
+    assert len(e.processed) == 2
+    assert e.index.partners(Node(clause("!P(a)")))
@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from parser import ParseError
+from structure import Const, Var, Function, Relation
+from tptp import read_tptp
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def transitivity(n):
+    lines = ["cnf(c{0}, axiom, less(c{0}, c{1})).".format(i, i + 1) for i in range(n)]
+    lines.append("cnf(trans, axiom, ~less(X, Y) | ~less(Y, Z) | less(X, Z)).")
+    lines.append("cnf(goal, negated_conjecture, ~less(c0, c{})).".format(n))
+    return "\n".join(lines) + "\n"
+
+
+def write(tmp_path, text, name="problem.p"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_cnf(tmp_path):
+    path = write(tmp_path, """
+% a comment
+cnf(one, axiom, p(X) | ~q(f(X, Y), 'a')).
+cnf(two, negated_conjecture, (~p(c) | X != b), inference(foo, [status(thm)], [one])).
+cnf('three', hypothesis, $false | r).
+cnf(four, axiom, p(a) | $true).
+""")
+
+    x, y = Var("1"), Var("2")
+    a = Const("a")
+    assert [*read_tptp(path)] == [
+        ("one", "axiom", [Relation("p", [x]), Relation("q", [Function("f", [x, y]), a], True)]),
+        ("two", "negated_conjecture", [Relation("p", [Const("c")], True), Relation("=", [x, Const("b")], True)]),
+        ("three", "hypothesis", [Relation("r", [])]),
+    ]
+
+
+def test_include(tmp_path):
+    write(tmp_path, "cnf(a1, axiom, p(a)).\ncnf(a2, axiom, p(b)).\n", "axioms.ax")
+    path = write(tmp_path, "include('axioms.ax', [a2]).\ncnf(g, negated_conjecture, ~p(b)).\n")
+    assert [name for name, _, _ in read_tptp(path)] == ["a2", "g"]
+
+
+@pytest.mark.parametrize("text, line, col, msg", [
+    ("cnf(a, axiom, p(a)).\nfof(b, axiom, p(a) | q(b)).\n", 2, 1, "only cnf formulas"),
+    ("cnf(a, axiom, p(a)).\nfof(b, axiom, ![X]: p(X)).\n", 2, 1, "only cnf formulas"),
+    ("cnf(a, axiom, p(a)).\ncnf(b, axiom, p(a) | ).\n", 2, 22, "expected a term"),
+    ("cnf(a, axiom, p(a)\n", 2, 1, "expected ')'"),
+    ("cnf(a, axiom, p(a)) .\n  cnf(b, axiom, p(#)).\n", 2, 19, "unexpected character"),
+    ("cnf(a, axiom, X).\n", 1, 15, "expected an atom"),
+    ("include('missing.ax').\n", 1, 9, "cannot find"),
+])
+def test_errors(tmp_path, text, line, col, msg):
+    path = write(tmp_path, text)
+    with pytest.raises(ParseError) as e:
+        [*read_tptp(path)]
+
+    assert (e.value.line, e.value.col) == (line, col)
+    assert msg in e.value.msg
+    assert e.value.path == path
+
+
+SAT = "cnf(a, axiom, p(a)).\ncnf(g, negated_conjecture, ~q(a)).\n"
+
+@pytest.mark.parametrize("text, args, status", [
+    (transitivity(4), [], "Unsatisfiable"),
+    (SAT, [], "Satisfiable"),
+    (SAT, ["--skip-related"], "GaveUp"),
+    (SAT, ["--sos"], "GaveUp"),
+    ("cnf(a, axiom, p(a)).\ncnf(b, axiom, a = b).\n", [], "GaveUp"),
+    ("fof(a, axiom, p(a)).\n", [], None),
+    ("fof(a, axiom, ?[X]: p(X)).\n", [], None),
+])
+def test_szs_status(tmp_path, text, args, status):
+    path = write(tmp_path, text)
+    run = subprocess.run([sys.executable, os.path.join(ROOT, "fol_solver.py"), path, *args],
+                         capture_output=True, text=True, timeout=60)
+
+    if status is None:
+        assert run.returncode != 0 and "only cnf formulas" in run.stderr
+        return
+
+    lines = [l for l in run.stdout.splitlines() if l.startswith("% SZS status")]
+    assert lines == ["% SZS status {} for problem".format(status)]
+
+
+@pytest.mark.parametrize("args, status", [
+    (["--time-limit", "0"], "Timeout"),
+    (["--max-clauses", "3"], "ResourceOut"),
+    (["--memory-limit", "1"], "MemoryOut"),
+])
+def test_szs_limits(tmp_path, args, status):
+    path = write(tmp_path, transitivity(9))
+    run = subprocess.run([sys.executable, os.path.join(ROOT, "fol_solver.py"), path, *args],
+                         capture_output=True, text=True, timeout=60, check=True)
+
+    lines = [l for l in run.stdout.splitlines() if l.startswith("% SZS status")]
+    assert lines == ["% SZS status {} for problem".format(status)]
+
+
+# with JSON proofs stdout is the JSON alone, the SZS lines go to stderr
+def test_szs_with_json_proofs(tmp_path):
+    path = write(tmp_path, transitivity(4))
+    run = subprocess.run([sys.executable, os.path.join(ROOT, "fol_solver.py"), path, "--proof", "json"],
+                         capture_output=True, text=True, timeout=60, check=True)
+
+    assert json.loads(run.stdout)["steps"][-1]["clause"] == []
+    assert run.stderr.splitlines() == ["% SZS status Unsatisfiable for problem",
+                                       "% SZS output start CNFRefutation for problem",
+                                       "% SZS output end CNFRefutation for problem"]
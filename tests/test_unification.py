@@ -0,0 +1,121 @@
+import pytest
+
+from structure import Const, Var, Function, Relation
+from unification import Bindings, unifier, unify, unify_pairs, match, mgu, mgu_cache
+from benchmarks.generators import transitivity
+import fol_solver
+
+
+a = Const("a")
+x = Var("1")
+y = Var("2")
+
+
+@pytest.fixture
+def cache_size():
+    size = mgu_cache.size
+    yield mgu_cache.resize
+    mgu_cache.resize(size)
+
+
+def run(path):
+    solver = fol_solver.Solver()
+    for lits, goal in fol_solver.read_input(str(path)):
+        solver.add_clause(lits, goal)
+    return solver.solve().stats
+
+
+def test_cache_does_not_change_the_search(tmp_path, cache_size):
+    path = tmp_path / "transitivity.p"
+    path.write_text(transitivity(9))
+
+    cache_size(0)
+    off = run(path)
+    cache_size(4096)
+    on = run(path)
+
+    assert (on["generated"], on["kept"]) == (off["generated"], off["kept"])
+    assert off["mgu_cache_hits"] == off["mgu_cache_misses"] == 0
+    assert on["mgu_cache_hits"] > 0
+
+
+def test_cache_off_apart(cache_size):
+    cache_size(0)
+    hits, misses = mgu_cache.hits, mgu_cache.misses
+
+    s1, s2 = mgu_cache.apart(Relation("P", [x, a]), Relation("P", [Function("f", [x]), y]), {x: Var("3")})
+    assert s1.subs == {x: Function("f", [Var("3")])}
+    assert s2.subs == {x: Var("3"), y: a}
+    assert (mgu_cache.hits, mgu_cache.misses) == (hits, misses)
+
+
+def f(*ts):
+    return Function("f", ts)
+
+
+def P(*ts):
+    return Relation("P", ts)
+
+
+@pytest.mark.parametrize("s, t", [
+    (x, f(x)),
+    (P(x, y), P(y, f(x))),
+    (P(x, f(y), y), P(f(y), x, f(x))),
+])
+def test_occurs_check(s, t):
+    assert unifier(s, t) is None
+    assert mgu(s, t) is None
+
+
+def test_cyclic_bindings_resolve_to_none():
+    b = Bindings()
+    assert unify_pairs([(P(x, y), P(f(y), f(x)))], b)
+    assert b.resolve(x, dict()) is None
+    assert b.subst({x, y}) is None
+
+
+def test_unify_set():
+    sigma = unify([P(x, a), P(f(y), y), P(x, y)])
+    assert sigma.subs == {x: f(a), y: a}
+    assert unify([P(x, x), P(f(x), y)]) is None
+
+
+# P(x1..xn, f(x0, x0)..f(xn-1, xn-1)) against P(y1..yn, y1..yn): the unifier
+# binds xn to a term with 2^n leaves that is a DAG of n + 1 nodes
+def test_exponential_unifier_stays_a_dag():
+    n = 64
+    xs = [Var(str(i)) for i in range(1, n + 1)]
+    ys = [Var(str(i)) for i in range(n + 1, 2 * n + 1)]
+    s = P(*xs, *(f(Var(str(i)), Var(str(i))) for i in range(n)))
+    t = P(*ys, *ys)
+
+    sigma = unifier(s, t)
+    assert sigma is not None
+    assert s.apply(sigma) is t.apply(sigma)
+    tau = mgu(s, t)
+    assert s.apply(tau) is t.apply(tau)
+
+    u = sigma.subs[xs[-1]]
+    for _ in range(n):
+        assert u.label == "f" and u.childs[0] is u.childs[1]
+        u = u.childs[0]
+    assert u is Var("0")
+
+
+def test_match_is_one_sided():
+    b = Bindings()
+    assert match(P(x, a), P(y, a), b)
+    assert b.parent == {x: y}
+
+    assert not match(P(a), P(x), Bindings())
+    assert not match(P(x, x), P(a, f(a)), Bindings())
+    assert match(P(x, x), P(f(a), f(a)), Bindings())
+
+
+def test_match_undo_to_mark():
+    b = Bindings()
+    assert match(P(x), P(a), b)
+    mark = b.mark()
+    assert not match(P(y, x), P(a, f(a)), b)
+    b.undo(mark)
+    assert b.parent == {x: a}
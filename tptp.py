@@ -0,0 +1,263 @@
+import os
+import re
+import sys
+
+from parser import ParseError, symbol
+from structure import Var, Const, Function, Relation
+
+
+TOKEN = re.compile(r"""
+    (?P<space>\s+|%[^\n]*|/\*.*?\*/)
+  | (?P<var>[A-Z][A-Za-z0-9_]*)
+  | (?P<word>\$?\$?[a-z][A-Za-z0-9_]*)
+  | (?P<quoted>'(?:[^'\\]|\\.)*')
+  | (?P<distinct>"(?:[^"\\]|\\.)*")
+  | (?P<number>[+-]?[0-9]+(?:[./][0-9]+)?(?:[Ee][+-]?[0-9]+)?)
+  | (?P<punct>!=|[(),.\[\]|~=])
+  | (?P<bad>.)
+""", re.VERBOSE | re.DOTALL)
+
+LOWER_WORD = re.compile(r"[a-z][A-Za-z0-9_]*\Z")
+
+
+# 'abc' and abc are the same symbol, other quoted names keep their quotes
+def name(kind, text):
+    if kind == "quoted" and LOWER_WORD.match(text[1:-1]):
+        text = text[1:-1]
+    return symbol(text)
+
+
+class Tokens:
+    def __init__(self, text, path):
+        self.text = text
+        self.path = path
+        self.tokens = [(m.lastgroup, m.group(), m.start()) for m in TOKEN.finditer(text) if m.lastgroup != "space"]
+        self.tokens.append(("end", "", len(text)))
+        self.i = 0
+
+    def peek(self):
+        return self.tokens[self.i]
+
+    # characters outside the cnf syntax are reported where they are read, so
+    # a fof formula is rejected as such and not for its quantifiers
+    def next(self):
+        kind, text, pos = tok = self.tokens[self.i]
+        if kind == "bad":
+            self.error("unexpected character {!r}".format(text), pos)
+        if kind != "end":
+            self.i += 1
+        return tok
+
+    def expect(self, value):
+        kind, text, pos = self.next()
+        if text != value or kind == "end":
+            self.error("expected {!r}, found {}".format(value, describe(kind, text)), pos)
+
+    def error(self, msg, pos):
+        line = self.text.count("\n", 0, pos) + 1
+        col = pos - self.text.rfind("\n", 0, pos)
+        raise ParseError(msg, line, col, self.path)
+
+
+def describe(kind, text):
+    return "end of file" if kind == "end" else repr(text)
+
+
+# a term, built with an explicit stack of open function symbols;
+# `variables` numbers the variables of the clause in order of appearance
+def term(tokens, variables):
+    stack = []
+
+    while True:
+        kind, text, pos = tokens.next()
+
+        if kind == "var":
+            t = Var(variables.setdefault(text, str(len(variables) + 1)))
+        elif kind in ("word", "quoted", "distinct", "number"):
+            if tokens.peek()[1] == "(" and kind in ("word", "quoted"):
+                tokens.next()
+                stack.append((name(kind, text), []))
+                continue
+            t = Const(name(kind, text))
+        else:
+            tokens.error("expected a term, found {}".format(describe(kind, text)), pos)
+
+        while stack:
+            stack[-1][1].append(t)
+            kind, text, pos = tokens.next()
+            if text == ",":
+                break
+            if text != ")" or kind == "end":
+                tokens.error("expected ',' or ')', found {}".format(describe(kind, text)), pos)
+            label, childs = stack.pop()
+            t = Function(label, childs)
+        else:
+            return t
+
+
+# a literal; None for $false, True for $true
+def literal(tokens, variables):
+    neg = tokens.peek()[1] == "~"
+    if neg:
+        tokens.next()
+
+    kind, text, pos = tokens.peek()
+    t = term(tokens, variables)
+
+    op = tokens.peek()[1]
+    if op in ("=", "!="):
+        tokens.next()
+        return Relation("=", [t, term(tokens, variables)], neg != (op == "!="))
+
+    if isinstance(t, Var) or kind in ("distinct", "number"):
+        tokens.error("expected an atom, found {}".format(describe(kind, text)), pos)
+
+    if t == Const("$true") or t == Const("$false"):
+        return None if (t == Const("$false")) != neg else True
+
+    if isinstance(t, Const):
+        return Relation(t.label, [], neg)
+    return Relation(t.label, t.childs, neg)
+
+
+# (L1 | ~L2 | ...) with optional parentheses; None for a tautology
+def disjunction(tokens):
+    variables = dict()
+    lits = []
+
+    parens = tokens.peek()[1] == "("
+    if parens:
+        tokens.next()
+
+    while True:
+        lit = literal(tokens, variables)
+        if lit is True:
+            lits = None
+        elif lit is not None and lits is not None:
+            lits.append(lit)
+
+        if tokens.peek()[1] != "|":
+            break
+        tokens.next()
+
+    if parens:
+        tokens.expect(")")
+
+    return lits
+
+
+# skips the source and useful info annotations of a formula
+def skip_annotations(tokens):
+    depth = 0
+    while True:
+        kind, text, pos = tokens.peek()
+        if kind == "end":
+            tokens.error("unexpected end of file", pos)
+        if depth == 0 and text == ")":
+            return
+        tokens.next()
+        if text in ("(", "["):
+            depth += 1
+        elif text in (")", "]"):
+            depth -= 1
+
+
+def include_path(path, current):
+    here = os.path.join(os.path.dirname(current), path) if current != "<stdin>" else path
+    if os.path.exists(here):
+        return here
+
+    root = os.environ.get("TPTP")
+    if root and os.path.exists(os.path.join(root, path)):
+        return os.path.join(root, path)
+
+    return here
+
+
+# yields (name, role, literals) for the cnf formulas of a TPTP file and the
+# files it includes; clauses with $true are left out. With `names` set, only
+# the formulas of that name are read. Each file is read and tokenized as a
+# whole, the formulas are parsed one at a time as they are asked for.
+def read_tptp(path, names=None):
+    if path == "-":
+        text, path = sys.stdin.read(), "<stdin>"
+    else:
+        with open(path) as f:
+            text = f.read()
+
+    tokens = Tokens(text, path)
+
+    while tokens.peek()[0] != "end":
+        kind, text, pos = tokens.next()
+
+        if text == "include":
+            tokens.expect("(")
+            kind, file, pos = tokens.next()
+            if kind != "quoted":
+                tokens.error("expected a quoted file name, found {}".format(describe(kind, file)), pos)
+
+            selection = None
+            if tokens.peek()[1] == ",":
+                tokens.next()
+                tokens.expect("[")
+                selection = set()
+                while tokens.peek()[1] != "]":
+                    selection.add(name(*tokens.next()[:2]))
+                    if tokens.peek()[1] == ",":
+                        tokens.next()
+                tokens.expect("]")
+            tokens.expect(")")
+            tokens.expect(".")
+
+            included = include_path(file[1:-1].replace("\\'", "'"), path)
+            if not os.path.exists(included):
+                tokens.error("cannot find included file {}".format(file), pos)
+
+            if names is not None:
+                selection = names if selection is None else selection & names
+            yield from read_tptp(included, selection)
+            continue
+
+        if text in ("fof", "tff", "thf", "tcf"):
+            tokens.error("only cnf formulas are supported, found {}".format(text), pos)
+        if text != "cnf":
+            tokens.error("expected cnf or include, found {}".format(describe(kind, text)), pos)
+
+        tokens.expect("(")
+        kind, label, pos = tokens.next()
+        if kind not in ("word", "quoted", "number"):
+            tokens.error("expected a formula name, found {}".format(describe(kind, label)), pos)
+        label = name(kind, label)
+        tokens.expect(",")
+        kind, role, pos = tokens.next()
+        if kind != "word":
+            tokens.error("expected a formula role, found {}".format(describe(kind, role)), pos)
+        tokens.expect(",")
+
+        lits = disjunction(tokens)
+
+        if tokens.peek()[1] == ",":
+            skip_annotations(tokens)
+        tokens.expect(")")
+        tokens.expect(".")
+
+        if lits is not None and (names is None or label in names):
+            yield label, role, lits
+
+
+def problem_name(path):
+    return "stdin" if path == "-" else os.path.splitext(os.path.basename(path))[0]
+
+
+# SZS result lines for standard benchmark harnesses
+def szs_status(status, problem, out=None):
+    print("% SZS status {} for {}".format(status, problem), file=out or sys.stdout, flush=True)
+
+
+# SZS status for a limits.LimitReached
+def limit_status(limit):
+    return {"time": "Timeout", "memory": "MemoryOut"}.get(limit.reason, "ResourceOut")
+
+
+def szs_output(start, kind, problem, out=None):
+    print("% SZS output {} {} for {}".format("start" if start else "end", kind, problem), file=out or sys.stdout, flush=True)
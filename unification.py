@@ -1,69 +1,318 @@
-from copy import deepcopy
-from itertools import combinations
-
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
 
 from structure import *
+import stats
 
 
-# finds a mgu for a set of Literals
-def unify(m):
-    sigma = Subst()
-    n = set(deepcopy(m))
-
-    while len(n) > 1:
-        nset = set()
-        alpha = None
-        for l1, l2 in combinations(n, 2):
-           alpha = find_ds(l1, l2)
-           if bool(alpha):
-               for x, t in alpha.subs.items():
-                   if x in t.getvars():
-                       return None
-               break
-
-        if alpha is None:
-            return None
+# Triangular bindings with a trail. Unification merges equivalence classes of
+# (hash-consed) term nodes union-find style: `parent` maps a variable to the
+# term it is bound to, and a non-variable node to the node it was merged into.
+# There is no path compression, so undoing back to a mark only pops the trail.
+class Bindings:
+    def __init__(self):
+        self.parent = dict()
+        self.trail = []
 
-        sigma.compose(alpha)
+    def find(self, t):
+        parent = self.parent
+        while t in parent:
+            t = parent[t]
+        return t
 
-        for L in n:
-            nset.add(L.apply(sigma))
+    def bind(self, s, t):
+        self.parent[s] = t
+        self.trail.append(s)
 
-        n = deepcopy(nset)
-    
-    return sigma
+    def mark(self):
+        return len(self.trail)
 
+    def undo(self, mark):
+        while len(self.trail) > mark:
+            del self.parent[self.trail.pop()]
 
+    # t with every binding applied, None if the bindings are cyclic
+    # (this is where the deferred occurs check happens)
+    def resolve(self, t, memo):
+        stack = [t]
+        path = set()
 
-def find_ds(l1, l2):
-    if l1.label == l2.label and len(l1.childs) == len(l2.childs):
-        for t1, t2 in zip(l1.childs, l2.childs):
-            alpha = ds(t1, t2)
-            
-            if bool(alpha):
-                return alpha
-   
-    return None
+        while stack:
+            u = stack[-1]
+            if u in memo:
+                stack.pop()
+                continue
 
+            r = self.find(u) if isinstance(u, Var) else u
+            if isinstance(r, Var) or not r.vars:
+                memo[u] = r
+                stack.pop()
+                continue
 
+            deps = r.childs if r is u else (r,)
+            pending = [d for d in deps if d not in memo]
 
-def ds(t1, t2):
-    if isinstance(t1, Var) or isinstance(t2, Var):
-        if t1!=t2 and bool(t1) and bool(t2):
-            if isinstance(t1, Var):
-                return Subst(var=t1, term=t2)
+            if pending:
+                if any(d in path for d in pending):
+                    return None
+                path.add(u)
+                stack.extend(pending)
+                continue
+
+            path.discard(u)
+            stack.pop()
+            if r is not u:
+                memo[u] = memo[r]
+            elif isinstance(r, Relation):
+                memo[u] = Relation(r.label, [memo[c] for c in r.childs], r.neg)
             else:
-                return Subst(var=t2, term=t1)
+                memo[u] = Function(r.label, [memo[c] for c in r.childs])
+
+        return memo[t]
+
+    def subst(self, vs):
+        memo = dict()
+        subs = dict()
+        for v in vs:
+            t = self.resolve(v, memo)
+            if t is None:
+                return None
+            if t is not v:
+                subs[v] = t
+
+        return Subst(subs=subs)
+
+
+
+def same_head(s, t):
+    if type(s) is not type(t) or s.label != t.label or len(s.childs) != len(t.childs):
+        return False
+    return not isinstance(s, Relation) or s.neg == t.neg
+
+
+# unifies the term pairs in `pairs` into `b` without occurs check
+# (Huet style, every merge reduces the number of classes);
+# on failure the bindings made so far are left on the trail
+def unify_pairs(pairs, b):
+    stack = list(pairs)
+
+    while stack:
+        s, t = stack.pop()
+        s = b.find(s)
+        t = b.find(t)
+
+        if s is t:
+            continue
+
+        if isinstance(s, Var):
+            b.bind(s, t)
+        elif isinstance(t, Var):
+            b.bind(t, s)
+        elif not s.vars and not t.vars:
+            return False
+        elif isinstance(s, (Function, Relation)) and same_head(s, t):
+            b.bind(s, t)
+            stack.extend(zip(s.childs, t.childs))
         else:
+            return False
+
+    return True
+
+
+# mgu of two terms or literals as a Subst, None if not unifiable
+def unifier(s, t):
+    st = stats.current
+    st.count("unify")
+    b = Bindings()
+    if not unify_pairs([(s, t)], b):
+        return None
+
+    sigma = b.subst(s.vars | t.vars)
+    if sigma is not None:
+        st.count("unify_ok")
+    return sigma
+
+
+# variables of a term in order of first occurrence
+def occurrence(t):
+    order = dict()
+    stack = [t]
+    while stack:
+        t = stack.pop()
+        if not t.vars:
+            continue
+        if isinstance(t, Var):
+            order.setdefault(t, None)
+        else:
+            stack.extend(reversed(t.childs))
+    return tuple(order)
+
+
+banks = {"<": [], ">": []}
+
+def canonical_var(bank, i):
+    vs = banks[bank]
+    while len(vs) <= i:
+        vs.append(Var(bank + str(len(vs))))
+    return vs[i]
+
+
+# a term with its variables renamed to <bank>0, <bank>1, ... in order of
+# occurrence, and that order; computed once per hash-consed term and bank
+variants = {"<": WeakKeyDictionary(), ">": WeakKeyDictionary()}
+
+def variant(t, bank):
+    if not t.vars:
+        return t, ()
+
+    v = variants[bank].get(t)
+    if v is None:
+        order = occurrence(t)
+        v = t.apply(Subst(subs={x: canonical_var(bank, i) for i, x in enumerate(order)})), order
+        variants[bank][t] = v
+    return v
+
+
+# The mgus of two pairs of terms that are variants of each other are the same
+# up to the renaming. Results (failures included) are stored under the
+# variants of both sides, the variables of s renamed to <0, <1, ... and those
+# of t to >0, >1, ..., so every pair is unified with its two sides in
+# separate variable banks; variables s and t share are merged into the bank
+# of s first. A hit renames the result back. At most `size` pairs are kept,
+# the least recently used go first; size 0 turns the cache off. Pairs are
+# unified in this form also with the cache off, so the unifiers (and the
+# search) are the same with any size.
+class MguCache:
+    def __init__(self, size=4096):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def resize(self, size):
+        self.size = size
+        while len(self.entries) > size:
+            self.entries.popitem(last=False)
+
+    # the canonical unifier of the pair under `key`, None if there is none
+    def lookup(self, key, s, t):
+        if not self.size:
+            sigma = unifier(s, t)
+            return None if sigma is None else sigma.subs
+
+        st = stats.current
+        if key in self.entries:
+            self.hits += 1
+            st.count("mgu_cache_hits")
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        st.count("mgu_cache_misses")
+        sigma = unifier(s, t)
+        subs = None if sigma is None else sigma.subs
+        self.entries[key] = subs
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return subs
+
+    def __call__(self, s, t):
+        cs, vs = variant(s, "<")
+        ct, vt = variant(t, ">")
+        names = {v: canonical_var(">", j) for j, v in enumerate(vt)}
+        names.update((v, canonical_var("<", i)) for i, v in enumerate(vs))
+
+        shared = s.vars & t.vars
+        if shared:
+            pattern = tuple(sorted((vs.index(v), vt.index(v)) for v in shared))
+            merged = ct.apply(Subst(subs={canonical_var(">", j): canonical_var("<", i) for i, j in pattern}))
+            subs = self.lookup((cs, ct, pattern), cs, merged)
+        else:
+            subs = self.lookup((cs, ct, ()), cs, ct)
+
+        if subs is None:
+            return None
+
+        back = {n: v for v, n in names.items()}
+        memo = dict()
+        # in the order unifier() would list the bindings
+        return Subst(subs={v: substitute(subs[names[v]], back, memo) for v in s.vars | t.vars if names[v] in subs})
+
+    # unifies s with t standardized apart, the variables of t in a bank of
+    # their own; `rename` names the variables of t that would clash with
+    # those of s (in the clause around s) and may not stay as they are.
+    # The pair of Substs for the variables of s and of t (including the
+    # renaming), or None
+    def apart(self, s, t, rename):
+        cs, vs = variant(s, "<")
+        ct, vt = variant(t, ">")
+        subs = self.lookup((cs, ct, ()), cs, ct)
+        if subs is None:
             return None
-    
-    if isinstance(t1, Function) and isinstance(t2, Function):
-        if t1.label == t2.label and len(t1.childs) == len(t2.childs):
-            for pair in zip(t1.childs, t2.childs):
-                dset = ds(*pair)
 
-                if bool(dset):
-                    return dset
-        
+        names = [rename.get(v, v) for v in vt]
+        back = {canonical_var("<", i): v for i, v in enumerate(vs)}
+        back.update((canonical_var(">", j), v) for j, v in enumerate(names))
+        memo = dict()
+
+        s1 = {v: substitute(subs[canonical_var("<", i)], back, memo) for i, v in enumerate(vs) if canonical_var("<", i) in subs}
+        s2 = dict(rename)
+        for j, v in enumerate(vt):
+            c = canonical_var(">", j)
+            s2[v] = substitute(subs[c], back, memo) if c in subs else names[j]
+        return Subst(subs=s1), Subst(subs=s2)
+
+
+mgu_cache = MguCache()
+
+
+def mgu(s, t):
+    return mgu_cache(s, t)
+
+
+def mgu_apart(s, t, rename):
+    return mgu_cache.apart(s, t, rename)
+
+
+# finds a mgu for a set of Literals
+def unify(m):
+    m = list(m)
+    if not m:
+        return Subst()
+
+    st = stats.current
+    st.count("unify")
+    b = Bindings()
+    if not unify_pairs([(m[0], l) for l in m[1:]], b):
+        return None
+
+    sigma = b.subst(frozenset().union(*(l.vars for l in m)))
+    if sigma is not None:
+        st.count("unify_ok")
+    return sigma
+
+
+
+# one-sided unification: binds variables of s only, so that s under the
+# bindings becomes t; undo to a mark on failure
+def match(s, t, b):
+    stack = [(s, t)]
+
+    while stack:
+        s, t = stack.pop()
+
+        if isinstance(s, Var):
+            bound = b.parent.get(s)
+            if bound is None:
+                b.bind(s, t)
+            elif bound is not t:
+                return False
+        elif not s.vars:
+            if s is not t:
+                return False
+        elif isinstance(s, (Function, Relation)) and same_head(s, t):
+            stack.extend(zip(s.childs, t.childs))
+        else:
+            return False
 
-    return None
+    return True